@@ -0,0 +1,231 @@
+import argparse
+import json
+from pathlib import Path
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from shared.clients.connect_client import ConnectClient
+from shared.logger import logger
+from shared.test_helpers.synthetic_instance import SyntheticInstance, generate_instance
+from shared.utils import FLOW_NAMES, format_table
+
+REPEATS = 5
+BASELINE_FILE = Path(__file__).parent.joinpath("baselines", "instance_lookups.json")
+
+# How much slower or larger a lookup can be than the baseline before it's reported, as timings vary between runs and machines
+TOLERANCE = 0.25
+
+
+def get_lookups(
+  instance: SyntheticInstance,
+) -> list[tuple[str, Callable[[ConnectClient], object]]]:
+  """Choose the lookups to benchmark, with targets spread through the generated listings.
+
+  Args:
+      instance (SyntheticInstance): The generated instance
+
+  Returns:
+      list[tuple[str, Callable[[ConnectClient], object]]]: The name and function of each lookup
+  """
+  usernames = instance.usernames
+  spread_usernames = [usernames[len(usernames) * step // 5] for step in range(5)]
+
+  return [
+    (
+      "_get_summary (5 users)",
+      lambda client: client._get_summary(
+        "list_users", "UserSummaryList", "Username", spread_usernames
+      ),
+    ),
+    (
+      "_get_summary (missing user)",
+      lambda client: client._get_summary(
+        "list_users", "UserSummaryList", "Username", "missing"
+      ),
+    ),
+    (
+      "get_flow_summaries",
+      lambda client: client.get_flow_summaries(list(FLOW_NAMES.values())),
+    ),
+    (
+      "get_phone_number_summaries",
+      lambda client: client.get_phone_number_summaries(
+        [instance.phone_numbers[len(instance.phone_numbers) // 2]]
+      ),
+    ),
+    (
+      "assign_user_to_routing_profile",
+      lambda client: client.assign_user_to_routing_profile(
+        usernames[-1], instance.routing_profile_names[-1]
+      ),
+    ),
+  ]
+
+
+def measure(
+  client: ConnectClient, lookup: Callable[[ConnectClient], object], repeats: int
+) -> dict[str, float]:
+  """Measure the AWS calls, time and peak memory of a lookup.
+
+  Args:
+      client (ConnectClient): The client, sending its calls to the fake
+      lookup (Callable[[ConnectClient], object]): The lookup
+      repeats (int): The number of times to time the lookup
+
+  Returns:
+      dict[str, float]: The number of AWS calls (i.e. pages fetched), the best time in seconds, and the peak memory in MiB
+  """
+  calls = client.api_calls.total()
+  lookup(client)
+  calls = client.api_calls.total() - calls
+
+  durations = []
+  for _ in range(repeats):
+    start = time.perf_counter()
+    lookup(client)
+    durations.append(time.perf_counter() - start)
+
+  # Traced separately, as tracing slows every allocation down
+  tracemalloc.start()
+  lookup(client)
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+
+  return {"calls": calls, "seconds": min(durations), "peak_mib": peak / 2**20}
+
+
+def compare(
+  results: dict[str, dict[str, float]],
+  baseline: dict[str, dict[str, float]],
+  tolerance: float = TOLERANCE,
+) -> tuple[list[str], list[str]]:
+  """Compare the lookups to the baseline.
+
+  The number of calls is deterministic, so any increase is a regression, while the time and memory vary between runs so are only reported beyond the tolerance.
+
+  Args:
+      results (dict[str, dict[str, float]]): The measurements of each lookup
+      baseline (dict[str, dict[str, float]]): The baseline measurements of each lookup
+      tolerance (float, optional): The allowed increase in time and memory, as a fraction. Defaults to TOLERANCE.
+
+  Returns:
+      tuple[list[str], list[str]]: A description of each increase in calls, and of each lookup that's slower or larger than the tolerance
+  """
+  regressions: list[str] = []
+  slowdowns: list[str] = []
+
+  for name, result in results.items():
+    if name not in baseline:
+      continue
+
+    expected = baseline[name]
+    if result["calls"] > expected["calls"]:
+      regressions.append(
+        f"{name}: {result['calls']:.0f} calls, was {expected['calls']:.0f}"
+      )
+    for key, unit in [("seconds", "s"), ("peak_mib", " MiB")]:
+      if result[key] > expected[key] * (1 + tolerance):
+        slowdowns.append(
+          f"{name}: {result[key]:.3f}{unit}, was {expected[key]:.3f}{unit}"
+        )
+
+  return regressions, slowdowns
+
+
+def benchmark(
+  repeats: int = REPEATS,
+  baseline_file: Path = BASELINE_FILE,
+  update_baseline: bool = False,
+  **instance_options: Any,
+) -> list[str]:
+  """Measure the lookups against a large generated instance, and compare them to the baseline.
+
+  Args:
+      repeats (int, optional): The number of times to time each lookup. Defaults to REPEATS.
+      baseline_file (Path, optional): The baseline results. Defaults to BASELINE_FILE.
+      update_baseline (bool, optional): Whether to replace the baseline with these results. Defaults to False.
+      **instance_options (Any): Options for the generated instance, e.g. users or latency
+
+  Returns:
+      list[str]: A description of each lookup that makes more calls than the baseline
+  """
+  start = time.perf_counter()
+  instance = generate_instance(**instance_options)
+  logger.info(
+    f"Generated {len(instance.usernames)} users, {len(instance.flow_names)} flows, {len(instance.phone_numbers)} phone numbers and {len(instance.routing_profile_names)} routing profiles in {time.perf_counter() - start:.1f}s"
+  )
+
+  results: dict[str, dict[str, float]] = {}
+
+  with instance.fake.patch():
+    client = ConnectClient(instance.fake.instance["InstanceAlias"])
+    for name, lookup in get_lookups(instance):
+      results[name] = measure(client, lookup, repeats)
+
+  baseline = (
+    json.loads(baseline_file.read_text())["results"] if baseline_file.exists() else {}
+  )
+
+  rows = [["Lookup", "Calls", "Time (ms)", "Peak (MiB)", "Baseline (ms)"]]
+  for name, result in results.items():
+    rows.append(
+      [
+        name,
+        f"{result['calls']:.0f}",
+        f"{result['seconds'] * 1e3:.1f}",
+        f"{result['peak_mib']:.2f}",
+        f"{baseline[name]['seconds'] * 1e3:.1f}" if name in baseline else "-",
+      ]
+    )
+  logger.info("Lookups against a large instance:\n" + format_table(rows))
+
+  if update_baseline:
+    baseline_file.parent.mkdir(exist_ok=True, parents=True)
+    baseline_file.write_text(
+      json.dumps(
+        {
+          "instance": {
+            "users": len(instance.usernames),
+            "flows": len(instance.flow_names),
+            "phone_numbers": len(instance.phone_numbers),
+            "routing_profiles": len(instance.routing_profile_names),
+          },
+          "results": results,
+        },
+        indent=2,
+      )
+      + "\n"
+    )
+    logger.info(f"Baseline written to {baseline_file}")
+    return []
+
+  regressions, slowdowns = compare(results, baseline)
+  for slowdown in slowdowns:
+    logger.warning(f"Slower than the baseline: {slowdown}")
+  for regression in regressions:
+    logger.error(f"More calls than the baseline: {regression}")
+
+  return regressions
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+    description="Benchmark the Connect lookups against a large generated instance"
+  )
+  parser.add_argument(
+    "--update-baseline",
+    action="store_true",
+    help="Replace the baseline with the results of this run",
+  )
+  parser.add_argument(
+    "--latency",
+    type=float,
+    default=0,
+    help="The simulated latency of each AWS call, in seconds",
+  )
+  args = parser.parse_args()
+
+  if benchmark(update_baseline=args.update_baseline, latency=args.latency):
+    sys.exit(1)
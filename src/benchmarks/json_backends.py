@@ -0,0 +1,65 @@
+from typing import Any
+
+from benchmarks.render_flows import time_per_call
+from benchmarks.templatise import create_synthetic_flow
+from shared.json_backend import BACKENDS, StdlibBackend
+from shared.logger import logger
+from shared.utils import FLOW_CONTENT_DIRECTORY, format_table
+
+ITERATIONS = 200
+LARGE_FLOW_ACTIONS = 5000
+LARGE_FLOW_ITERATIONS = 10
+
+
+def time_backends(description: str, text: str, iterations: int) -> list[list[str]]:
+  """Time parsing and serialising a document with each JSON backend.
+
+  Args:
+      description (str): A description of the document
+      text (str): The document
+      iterations (int): The number of calls to time for each operation
+
+  Returns:
+      list[list[str]]: A table row for each backend
+  """
+  content: Any = StdlibBackend().loads(text)
+  rows = []
+
+  for name, backend_type in BACKENDS.items():
+    backend = backend_type()
+    rows.append(
+      [
+        description,
+        name,
+        f"{time_per_call(lambda: backend.loads(text), iterations):.1f}",
+        f"{time_per_call(lambda: backend.dumps(content, indent=True), iterations):.1f}",
+        f"{time_per_call(lambda: backend.dumps(content), iterations):.1f}",
+      ]
+    )
+
+  return rows
+
+
+def benchmark(iterations: int = ITERATIONS) -> None:
+  """Compare the JSON backends on the flow files and a large synthetic flow.
+
+  Args:
+      iterations (int, optional): The number of calls to time for each operation on the flow files. Defaults to ITERATIONS.
+  """
+  rows = [["Flow", "Backend", "Parse (us)", "Pretty (us)", "Compact (us)"]]
+
+  for path in sorted(FLOW_CONTENT_DIRECTORY.glob("*.json")):
+    rows += time_backends(path.stem, path.read_text(), iterations)
+
+  large_flow = StdlibBackend().dumps(
+    create_synthetic_flow(LARGE_FLOW_ACTIONS), indent=True
+  )
+  rows += time_backends(
+    f"Large ({LARGE_FLOW_ACTIONS} actions)", large_flow, LARGE_FLOW_ITERATIONS
+  )
+
+  logger.info("JSON time per flow:\n" + format_table(rows))
+
+
+if __name__ == "__main__":
+  benchmark()
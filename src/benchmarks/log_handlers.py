@@ -0,0 +1,90 @@
+import os
+import statistics
+import time
+from typing import TextIO
+
+from shared.logger import create_logger, flush_logger, logger
+from shared.utils import format_table
+
+LINES = 10000
+RATE = 10000.0
+BENCHMARK_LOGGER_NAME = "benchmark"
+
+# Each logger configuration, as (description, structured, asynchronous)
+CONFIGURATIONS = [
+  ("Text", False, False),
+  ("JSON", True, False),
+  ("Text, async", False, True),
+  ("JSON, async", True, True),
+]
+
+
+def time_log_calls(
+  structured: bool, asynchronous: bool, lines: int, rate: float, stream: TextIO
+) -> list[float]:
+  """Time each call to a logger, logging at a steady rate.
+
+  Args:
+      structured (bool): Whether the logger writes JSON
+      asynchronous (bool): Whether the logger writes on a background thread
+      lines (int): The number of lines to log
+      rate (float): The number of lines to log per second
+      stream (TextIO): Where to write the records
+
+  Returns:
+      list[float]: The time taken by each call, in microseconds
+  """
+  benchmark_logger = create_logger(
+    BENCHMARK_LOGGER_NAME,
+    structured=structured,
+    asynchronous=asynchronous,
+    stream=stream,
+  )
+  benchmark_logger.propagate = False
+
+  interval = 1 / rate
+  durations: list[float] = []
+  next_time = time.perf_counter()
+
+  for line in range(lines):
+    # Busy wait, as sleeping isn't precise enough at this rate
+    while time.perf_counter() < next_time:
+      pass
+    next_time += interval
+
+    start = time.perf_counter()
+    benchmark_logger.info(
+      "Dispatched contact %s to %s", line, "CallbackOutbound", extra={"line": line}
+    )
+    durations.append((time.perf_counter() - start) * 1e6)
+
+  flush_logger(BENCHMARK_LOGGER_NAME)
+
+  return durations
+
+
+def benchmark(lines: int = LINES, rate: float = RATE) -> None:
+  """Compare the per-call overhead of each logger configuration at a steady logging rate.
+
+  Args:
+      lines (int, optional): The number of lines to log with each configuration. Defaults to LINES.
+      rate (float, optional): The number of lines to log per second. Defaults to RATE.
+  """
+  rows = [["Logger", "Mean (us)", "p99 (us)"]]
+
+  with open(os.devnull, "w") as devnull:
+    for description, structured, asynchronous in CONFIGURATIONS:
+      durations = time_log_calls(structured, asynchronous, lines, rate, devnull)
+      rows.append(
+        [
+          description,
+          f"{statistics.fmean(durations):.1f}",
+          f"{statistics.quantiles(durations, n=100)[98]:.1f}",
+        ]
+      )
+
+  logger.info(f"Log call overhead at {rate:.0f} lines/s:\n" + format_table(rows))
+
+
+if __name__ == "__main__":
+  benchmark()
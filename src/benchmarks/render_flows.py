@@ -0,0 +1,145 @@
+import jinja2
+import json
+import timeit
+from typing import Any, Callable
+
+from deploy.flow_template import FlowTemplate, load_flow_template
+from deploy.parameters import get_flow_environment
+from shared.logger import logger
+from shared.utils import FLOW_CONTENT_DIRECTORY, FLOW_NAMES, format_table
+
+ITERATIONS = 500
+LARGE_FLOW_ACTIONS = 5000
+LARGE_FLOW_ITERATIONS = 20
+RESOURCES = {
+  "CallbackQueue": "arn:aws:connect:region:account:instance/id/queue/queue-id",
+  "CallbackAgentWhisper": "arn:aws:connect:region:account:instance/id/contact-flow/flow-id",
+}
+
+
+def time_per_call(function: Callable[[], object], iterations: int) -> float:
+  """Measure the best average time of a function call over a few repeats.
+
+  Args:
+      function (Callable[[], object]): The function to time
+      iterations (int): The number of calls in each repeat
+
+  Returns:
+      float: The time per call, in microseconds
+  """
+  return min(timeit.repeat(function, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def render_uncached(flow_name: str) -> str:
+  """Render a flow the original way, with a new environment that parses the template on every call.
+
+  Args:
+      flow_name (str): The name of the flow
+
+  Returns:
+      str: The rendered flow content
+  """
+  env = jinja2.Environment(loader=jinja2.FileSystemLoader(FLOW_CONTENT_DIRECTORY))
+  return env.get_template(f"{flow_name}.json").render(resources=RESOURCES)
+
+
+def render_cached(flow_name: str) -> str:
+  """Render a flow with the shared environment.
+
+  Args:
+      flow_name (str): The name of the flow
+
+  Returns:
+      str: The rendered flow content
+  """
+  return (
+    get_flow_environment().get_template(f"{flow_name}.json").render(resources=RESOURCES)
+  )
+
+
+def render_structural(flow_name: str) -> str:
+  """Render a flow with the structural renderer.
+
+  Args:
+      flow_name (str): The name of the flow
+
+  Returns:
+      str: The rendered flow content
+  """
+  return load_flow_template(flow_name).render(RESOURCES)
+
+
+def create_large_flow(actions: int) -> str:
+  """Create templated flow content with many actions that reference resources.
+
+  Args:
+      actions (int): The number of actions
+
+  Returns:
+      str: The templated flow content, as a JSON string
+  """
+  content: dict[str, Any] = {
+    "Version": "2019-10-30",
+    "StartAction": "action-0",
+    "Metadata": {
+      "ActionMetadata": {
+        f"action-{index}": {
+          "position": {"x": index, "y": index},
+          "queue": {"id": "{{resources['CallbackQueue']}}", "text": "Callback Queue"},
+        }
+        for index in range(actions)
+      }
+    },
+    "Actions": [
+      {
+        "Identifier": f"action-{index}",
+        "Type": "UpdateContactTargetQueue",
+        "Parameters": {"QueueId": "{{resources['CallbackQueue']}}"},
+        "Transitions": {"NextAction": f"action-{index + 1}"},
+      }
+      for index in range(actions)
+    ],
+  }
+
+  return json.dumps(content, indent=2)
+
+
+def benchmark(iterations: int = ITERATIONS) -> None:
+  """Compare the render time of each flow with and without the shared environment, and with the structural renderer.
+
+  Args:
+      iterations (int, optional): The number of renders to time per flow. Defaults to ITERATIONS.
+  """
+  rows = [["Flow", "Uncached (us)", "Cached (us)", "Structural (us)"]]
+
+  for flow_name in FLOW_NAMES.values():
+    uncached = time_per_call(lambda: render_uncached(flow_name), iterations)
+    cached = time_per_call(lambda: render_cached(flow_name), iterations)
+    structural = time_per_call(lambda: render_structural(flow_name), iterations)
+    rows.append([flow_name, f"{uncached:.1f}", f"{cached:.1f}", f"{structural:.1f}"])
+
+  # Large flows, with the templates prepared up front
+  large_flow = create_large_flow(LARGE_FLOW_ACTIONS)
+  jinja2_template = jinja2.Environment().from_string(large_flow)
+  structural_template = FlowTemplate("large", large_flow)
+
+  cached = time_per_call(
+    lambda: jinja2_template.render(resources=RESOURCES), LARGE_FLOW_ITERATIONS
+  )
+  structural = time_per_call(
+    lambda: structural_template.render(RESOURCES), LARGE_FLOW_ITERATIONS
+  )
+  rows.append(
+    [
+      f"Large ({LARGE_FLOW_ACTIONS} actions)",
+      "",
+      f"{cached:.1f}",
+      f"{structural:.1f}",
+    ]
+  )
+
+  logger.info("Render time per flow:\n" + format_table(rows))
+
+
+if __name__ == "__main__":
+  benchmark()
@@ -0,0 +1,135 @@
+import copy
+import sys
+import time
+from typing import Any, Callable
+
+from export.templatise import create_template_value, templatise_content
+from shared.logger import logger
+from shared.utils import format_table
+
+ACTION_COUNTS = [1000, 10000, 50000]
+QUEUE_ARN = "arn:aws:connect:region:account:instance/instance-id/queue/queue-id"
+FLOW_ARN = "arn:aws:connect:region:account:instance/instance-id/contact-flow/flow-id"
+
+
+def create_synthetic_flow(actions: int) -> dict[str, Any]:
+  """Create exported flow content with many actions that reference resources by ARN.
+
+  Args:
+      actions (int): The number of actions
+
+  Returns:
+      dict[str, Any]: The parsed flow content
+  """
+  return {
+    "Version": "2019-10-30",
+    "StartAction": "action-0",
+    "Metadata": {
+      "entryPointPosition": {"x": 0, "y": 0},
+      "ActionMetadata": {
+        f"action-{index}": {
+          "position": {"x": index, "y": index},
+          "queue": {"id": QUEUE_ARN, "text": "Callback Queue"},
+          "contactFlow": {"id": FLOW_ARN, "text": "CallbackAgentWhisper"},
+        }
+        for index in range(actions)
+      },
+      "Annotations": [],
+    },
+    "Actions": [
+      {
+        "Identifier": f"action-{index}",
+        "Type": "UpdateContactTargetQueue",
+        "Parameters": {"QueueId": QUEUE_ARN, "EventHooks": {"AgentWhisper": FLOW_ARN}},
+        "Transitions": {"NextAction": f"action-{index + 1}", "Errors": []},
+      }
+      for index in range(actions)
+    ],
+  }
+
+
+def recursive_templatise(content: Any) -> dict[str, str]:
+  """The original two-pass recursive templatiser, for comparison.
+
+  Args:
+      content (Any): The parsed contact flow content, which is updated in place
+
+  Returns:
+      dict[str, str]: A map of resource ARNs to common names
+  """
+  arn_map: dict[str, str] = {}
+
+  def collect(node: Any) -> None:
+    if isinstance(node, dict):
+      if "id" in node and "text" in node:
+        arn_map[node["id"]] = node["text"]
+        return
+      for child in node.values():
+        collect(child)
+    elif isinstance(node, list):
+      for child in node:
+        collect(child)
+
+  def replace(parent: Any, node: Any) -> None:
+    if isinstance(node, str) and node in arn_map:
+      key = list(parent.keys())[list(parent.values()).index(node)]
+      parent[key] = create_template_value(arn_map[node])
+    elif isinstance(node, dict):
+      for child in list(node.values()):
+        replace(node, child)
+    elif isinstance(node, list):
+      for child in node:
+        replace(node, child)
+
+  collect(content)
+  replace(None, content)
+
+  return arn_map
+
+
+def time_templatise(
+  templatiser: Callable[[Any], object], content: dict[str, Any]
+) -> float:
+  """Time a templatiser on a copy of the flow content.
+
+  Args:
+      templatiser (Callable[[Any], object]): The templatiser
+      content (dict[str, Any]): The parsed flow content
+
+  Returns:
+      float: The time taken, in milliseconds
+  """
+  content = copy.deepcopy(content)
+
+  start = time.perf_counter()
+  templatiser(content)
+
+  return (time.perf_counter() - start) * 1e3
+
+
+def benchmark(action_counts: list[int] = ACTION_COUNTS) -> None:
+  """Compare the single-pass and original templatisers on synthetic flows of increasing size.
+
+  Args:
+      action_counts (list[int], optional): The number of actions in each synthetic flow. Defaults to ACTION_COUNTS.
+  """
+  rows = [["Actions", "Recursive (ms)", "Single-pass (ms)"]]
+
+  for actions in action_counts:
+    content = create_synthetic_flow(actions)
+    rows.append(
+      [
+        str(actions),
+        f"{time_templatise(recursive_templatise, content):.1f}",
+        f"{time_templatise(templatise_content, content):.1f}",
+      ]
+    )
+
+  logger.info(
+    f"Templatise time (recursion limit {sys.getrecursionlimit()}):\n"
+    + format_table(rows)
+  )
+
+
+if __name__ == "__main__":
+  benchmark()
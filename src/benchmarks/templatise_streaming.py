@@ -0,0 +1,95 @@
+from pathlib import Path
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks.templatise import create_synthetic_flow
+from export.templatise import templatise_content, templatise_file
+from shared import json_backend
+from shared.logger import logger
+from shared.utils import format_table
+
+ACTION_COUNTS = [1000, 10000, 30000]
+
+
+def measure(function: Callable[[], object]) -> tuple[float, float]:
+  """Measure the time and peak memory allocated by a function.
+
+  Args:
+      function (Callable[[], object]): The function
+
+  Returns:
+      tuple[float, float]: The time taken, in seconds, and the peak memory, in MiB
+  """
+  tracemalloc.start()
+  start = time.perf_counter()
+
+  function()
+
+  duration = time.perf_counter() - start
+  _, peak = tracemalloc.get_traced_memory()
+  tracemalloc.stop()
+
+  return duration, peak / 2**20
+
+
+def templatise_in_memory(inpath: Path, outpath: Path) -> None:
+  """Templatise a flow file by loading it, as templatise_flow does by default.
+
+  Args:
+      inpath (Path): The exported flow file
+      outpath (Path): The file to write the templatised flow to
+  """
+  with open(inpath) as infile:
+    content = json_backend.loads(infile.read())
+
+  templatise_content(content)
+
+  with open(outpath, "w") as outfile:
+    outfile.write(json_backend.dumps(content, indent=True))
+
+
+def benchmark(action_counts: list[int] = ACTION_COUNTS) -> None:
+  """Compare the time and peak memory of loading and streaming synthetic flow files of increasing size.
+
+  Args:
+      action_counts (list[int], optional): The number of actions in each synthetic flow. Defaults to ACTION_COUNTS.
+  """
+  rows = [
+    [
+      "Actions",
+      "File (MiB)",
+      "Load (s)",
+      "Load peak (MiB)",
+      "Stream (s)",
+      "Stream peak (MiB)",
+    ]
+  ]
+
+  with tempfile.TemporaryDirectory() as directory:
+    inpath = Path(directory, "flow.json")
+    outpath = Path(directory, "templatised.json")
+
+    for actions in action_counts:
+      inpath.write_text(json_backend.dumps(create_synthetic_flow(actions), indent=True))
+
+      load_time, load_peak = measure(lambda: templatise_in_memory(inpath, outpath))
+      stream_time, stream_peak = measure(lambda: templatise_file(inpath, outpath))
+
+      rows.append(
+        [
+          str(actions),
+          f"{inpath.stat().st_size / 2**20:.1f}",
+          f"{load_time:.2f}",
+          f"{load_peak:.1f}",
+          f"{stream_time:.2f}",
+          f"{stream_peak:.1f}",
+        ]
+      )
+
+  logger.info("Templatise time and memory per flow:\n" + format_table(rows))
+
+
+if __name__ == "__main__":
+  benchmark()
@@ -0,0 +1,63 @@
+import pytest
+from pytest_mock import MockerFixture
+from typing import Iterator
+
+from shared.test_helpers.fake_aws import FakeAws
+from shared.test_helpers.helpers import MOCK_PARAMETERS
+from shared.utils import FLOW_NAMES, ROUTING_PROFILE_NAME
+
+
+@pytest.fixture
+def mock_parameters(mocker: MockerFixture) -> dict[str, str]:
+  """Use the mock parameters instead of the .env file.
+
+  Args:
+      mocker (MockerFixture): The mocker
+
+  Returns:
+      dict[str, str]: The parameters
+  """
+  mocker.patch("dotenv.dotenv_values", return_value=MOCK_PARAMETERS)
+  return MOCK_PARAMETERS
+
+
+@pytest.fixture
+def fake_aws() -> Iterator[FakeAws]:
+  """Send the calls of every AWS client created to an in-process fake of Connect and CloudFormation.
+
+  Returns:
+      Iterator[FakeAws]: The fake, with an empty instance
+  """
+  with FakeAws().patch() as fake:
+    yield fake
+
+
+@pytest.fixture
+def fake_instance(
+  mocker: MockerFixture, mock_parameters: dict[str, str], fake_aws: FakeAws
+) -> FakeAws:
+  """Send the calls of every AWS client created to a fake instance with the resources named in the mock parameters and the system's flows.
+
+  Args:
+      mocker (MockerFixture): The mocker
+      mock_parameters (dict[str, str]): The parameters
+      fake_aws (FakeAws): The fake
+
+  Returns:
+      FakeAws: The fake, with the instance resources
+  """
+  # Stacks complete by the next poll, so don't wait between polls
+  mocker.patch("shared.clients.cloudformation_client.time.sleep")
+
+  fake_aws.add_phone_number(mock_parameters["PrivateNumber"])
+  fake_aws.add_phone_number(mock_parameters["PublicNumber"])
+  fake_aws.add_user(mock_parameters["AgentUsername"])
+  for routing_profile_name in [
+    mock_parameters["DefaultRoutingProfile"],
+    ROUTING_PROFILE_NAME,
+  ]:
+    fake_aws.add_routing_profile(routing_profile_name)
+  for flow_name in FLOW_NAMES.values():
+    fake_aws.add_flow(flow_name)
+
+  return fake_aws
@@ -0,0 +1,248 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+import time
+
+from shared.clients.connect_client import ConnectClient
+from shared.logger import logger
+from shared.rate_limiter import RateLimiter
+from shared.utils import (
+  Parameters,
+  ROUTING_PROFILE_NAME,
+  format_table,
+  read_parameters,
+)
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RATE = 5.0
+
+ASSIGNED = "ASSIGNED"
+NOT_FOUND = "NOT_FOUND"
+FAILED = "FAILED"
+
+
+class AssignmentResult:
+  """The outcome of assigning a single agent to a routing profile."""
+
+  username: str
+  status: str
+  error: Exception | None
+
+  def __init__(
+    self, username: str, status: str, error: Exception | None = None
+  ) -> None:
+    """Constructor.
+
+    Args:
+        username (str): The username of the agent
+        status (str): The outcome, one of ASSIGNED, NOT_FOUND or FAILED
+        error (Exception | None, optional): The error raised by the assignment. Defaults to None.
+    """
+    self.username = username
+    self.status = status
+    self.error = error
+
+
+def read_usernames(path: Path) -> list[str]:
+  """Read a list of usernames from a file, one per line, ignoring blank lines and # comments.
+
+  Args:
+      path (Path): The file of usernames
+
+  Returns:
+      list[str]: The usernames, in file order without duplicates
+  """
+  usernames: dict[str, None] = {}
+
+  for line in path.read_text().splitlines():
+    username = line.strip()
+    if username and not username.startswith("#"):
+      usernames[username] = None
+
+  return list(usernames)
+
+
+def assign_agent(
+  connect_client: ConnectClient,
+  username: str,
+  user_id: str,
+  routing_profile_id: str,
+  rate_limiter: RateLimiter,
+) -> AssignmentResult:
+  """Assign a single agent to a routing profile, capturing any error so it doesn't affect the other agents.
+
+  Args:
+      connect_client (ConnectClient): The Connect client
+      username (str): The username of the agent
+      user_id (str): The ID of the agent
+      routing_profile_id (str): The ID of the routing profile
+      rate_limiter (RateLimiter): Limits the rate of requests shared between threads
+
+  Returns:
+      AssignmentResult: The outcome of the assignment
+  """
+  rate_limiter.wait()
+
+  try:
+    connect_client.update_user_routing_profile(user_id, routing_profile_id)
+  except Exception as ex:
+    logger.error(f"Failed to assign {username}: {ex}")
+    return AssignmentResult(username, FAILED, ex)
+
+  return AssignmentResult(username, ASSIGNED)
+
+
+def assign_agents(
+  connect_client: ConnectClient,
+  usernames: list[str],
+  routing_profile_name: str,
+  max_workers: int = DEFAULT_MAX_WORKERS,
+  rate: float = DEFAULT_RATE,
+) -> list[AssignmentResult]:
+  """Assign many agents to a routing profile concurrently.
+
+  The users are resolved in a single pass over the instance users and the routing profile is resolved once, so the only per-agent request is the assignment itself.
+
+  Args:
+      connect_client (ConnectClient): The Connect client
+      usernames (list[str]): The usernames of the agents
+      routing_profile_name (str): The name of the routing profile
+      max_workers (int, optional): The maximum number of concurrent requests. Defaults to DEFAULT_MAX_WORKERS.
+      rate (float, optional): The maximum number of requests per second. Defaults to DEFAULT_RATE.
+
+  Raises:
+      ValueError: The routing profile doesn't exist
+
+  Returns:
+      list[AssignmentResult]: The outcome for each agent, in the same order as the usernames
+  """
+  routing_profile = connect_client.get_routing_profile_summary(routing_profile_name)
+  if routing_profile is None:
+    raise ValueError(f"Routing profile {routing_profile_name} doesn't exist")
+
+  users = connect_client.get_user_summaries(usernames)
+  rate_limiter = RateLimiter(rate)
+
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    futures = [
+      executor.submit(
+        assign_agent,
+        connect_client,
+        username,
+        user["Id"],
+        routing_profile["Id"],
+        rate_limiter,
+      )
+      if user
+      else None
+      for username, user in zip(usernames, users)
+    ]
+
+    return [
+      future.result() if future else AssignmentResult(username, NOT_FOUND)
+      for username, future in zip(usernames, futures)
+    ]
+
+
+def format_assignments(results: list[AssignmentResult]) -> str:
+  """Format the agent assignment outcomes as a table.
+
+  Args:
+      results (list[AssignmentResult]): The outcome for each agent
+
+  Returns:
+      str: The formatted table
+  """
+  return format_table(
+    [["Username", "Status", "Error"]]
+    + [[result.username, result.status, str(result.error or "")] for result in results]
+  )
+
+
+def onboard(
+  usernames_file: Path,
+  routing_profile_name: str = ROUTING_PROFILE_NAME,
+  parameters: Parameters | None = None,
+  max_workers: int = DEFAULT_MAX_WORKERS,
+  rate: float = DEFAULT_RATE,
+) -> bool:
+  """Assign the agents listed in a file to a routing profile.
+
+  Args:
+      usernames_file (Path): The file of usernames, one per line
+      routing_profile_name (str, optional): The name of the routing profile. Defaults to ROUTING_PROFILE_NAME.
+      parameters (Parameters | None, optional): The system parameters. Defaults to None, which reads them from the .env file.
+      max_workers (int, optional): The maximum number of concurrent requests. Defaults to DEFAULT_MAX_WORKERS.
+      rate (float, optional): The maximum number of requests per second. Defaults to DEFAULT_RATE.
+
+  Returns:
+      bool: True if every agent was assigned, False otherwise
+  """
+  if not parameters:
+    parameters = read_parameters()
+
+  usernames = read_usernames(usernames_file)
+  connect_client = ConnectClient(parameters["InstanceAlias"], parameters["Region"])
+
+  logger.info(f"Assigning {len(usernames)} agents to {routing_profile_name}")
+  start = time.perf_counter()
+
+  results = assign_agents(
+    connect_client, usernames, routing_profile_name, max_workers, rate
+  )
+
+  unassigned = len([result for result in results if result.status != ASSIGNED])
+  logger.info(
+    f"Assignment complete in {time.perf_counter() - start:.1f}s, {unassigned} not assigned:\n"
+    + format_assignments(results)
+  )
+
+  return unassigned == 0
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+    description="Assign the agents listed in a file to a routing profile"
+  )
+  parser.add_argument(
+    "usernames_file", type=Path, help="A file of agent usernames, one per line"
+  )
+  profile = parser.add_mutually_exclusive_group()
+  profile.add_argument(
+    "--routing-profile",
+    default=ROUTING_PROFILE_NAME,
+    help="The name of the routing profile to assign the agents to",
+  )
+  profile.add_argument(
+    "--default",
+    action="store_true",
+    help="Return the agents to the default routing profile from the .env file",
+  )
+  parser.add_argument(
+    "--max-workers",
+    type=int,
+    default=DEFAULT_MAX_WORKERS,
+    help="The maximum number of concurrent requests",
+  )
+  parser.add_argument(
+    "--rate",
+    type=float,
+    default=DEFAULT_RATE,
+    help="The maximum number of requests per second",
+  )
+  args = parser.parse_args()
+
+  parameters = read_parameters()
+  routing_profile_name = (
+    parameters["DefaultRoutingProfile"] if args.default else args.routing_profile
+  )
+
+  if not onboard(
+    args.usernames_file,
+    routing_profile_name,
+    parameters,
+    args.max_workers,
+    args.rate,
+  ):
+    sys.exit(1)
@@ -0,0 +1,32 @@
+import jinja2
+from pathlib import Path
+
+from shared.logger import logger
+from shared.utils import FLOW_CONTENT_DIRECTORY, FLOW_TEMPLATE_MODULE_DIRECTORY
+
+
+def compile_flows(
+  template_directory: Path = FLOW_CONTENT_DIRECTORY,
+  module_directory: Path = FLOW_TEMPLATE_MODULE_DIRECTORY,
+) -> None:
+  """Precompile the jinja2-templated contact flow content into python modules, so rendering doesn't need to parse the templates.
+
+  Args:
+      template_directory (Path, optional): The directory of the flow templates. Defaults to FLOW_CONTENT_DIRECTORY.
+      module_directory (Path, optional): The directory to write the modules to. Defaults to FLOW_TEMPLATE_MODULE_DIRECTORY.
+  """
+  logger.info("Compiling flow templates...")
+
+  env = jinja2.Environment(loader=jinja2.FileSystemLoader(template_directory))
+  env.compile_templates(
+    module_directory,
+    filter_func=lambda name: name.endswith(".json"),
+    zip=None,
+    ignore_errors=False,
+  )
+
+  logger.info(f"Flow templates compiled to {module_directory}")
+
+
+if __name__ == "__main__":
+  compile_flows()
@@ -1,119 +1,38 @@
-import jinja2
-from mypy_boto3_cloudformation.type_defs import ParameterTypeDef
+import argparse
 from pathlib import Path
-import re
 
+from deploy.package import TEMPLATE_BODY_LIMIT, check_size, record_flow_versions
+from deploy.parameters import create_stack_parameters
+from deploy.plan import plan
+from deploy.publish import publish_flows
 from shared.clients.cloudformation_client import CloudformationClient
-from shared.clients.connect_client import ConnectClient
+from shared.context import RunContext
 from shared.logger import logger
+from shared.metrics import report_metrics
+from shared.profiler import profiled
+from shared.version_store import VersionStore
 from shared.utils import (
-  FLOW_CONTENT_DIRECTORY,
   CALLBACK_FLOW_STACK_CONFIG,
   WHISPER_FLOW_STACK_CONFIG,
   InstanceConfig,
   StackConfig,
   MAIN_STACK_CONFIG,
-  read_parameters,
+  STACK_CONFIGS,
+  VERSION_STORE_DIRECTORY,
+  Parameters,
 )
 
-CAMELCASE_SPLIT_REGEX = r"([A-Z])"
 
-
-def render_flows(
-  flow_names: list[str], resources: dict[str, str]
-) -> list[ParameterTypeDef]:
-  """Renders the jinja2-templated contact flow content, replacing name values with ARNs.
-
-  Args:
-      flow_names (list[str]): List of flows to render, by name
-      resources (dict[str, str]): Map of resource ARNs to common names
-
-  Returns:
-      list[ParameterTypeDef]: A list of cloudformation parameters containing the rendered contact flow content.
-  """
-  env = jinja2.Environment(loader=jinja2.FileSystemLoader(FLOW_CONTENT_DIRECTORY))
-
-  content_parameters: list[ParameterTypeDef] = []
-
-  for flow_name in flow_names:
-    template = env.get_template(flow_name + ".json")
-    rendered = template.render(resources=resources)
-    content_parameters.append(
-      {"ParameterKey": f"{flow_name}Content", "ParameterValue": rendered}
-    )
-
-  return content_parameters
-
-
-def create_stack_parameters(
-  client: CloudformationClient,
-  instance_config: InstanceConfig,
-  template: str,
-  previous_stack_resources: dict[str, str] = {},
-) -> list[ParameterTypeDef]:
-  """General function to create the cloudformation parameters from instance configuration, rendered contact flows, or other stack's resources.
-
-  Args:
-      client (CloudformationClient): The cloudformation client
-      instance_config (InstanceConfig): Connect instance configuration, for instance-specific parameters
-      template (str): The cloudformation template, used to retrieve the parameters
-      previous_stack_resources (dict[str, str], optional): Resources from earlier stack deployments, as a map of name to ARN. Defaults to {}.
+def read_stack_templates() -> dict[str, str]:
+  """Read the cloudformation template of each stack, so they can be shared between deployments.
 
   Returns:
-      list[ParameterTypeDef]: A list of cloudformation parameters containing the combined parameters.
+      dict[str, str]: The template bodies, by stack name
   """
-  parsed_template = client.validate(template)
-  template_parameters: list[ParameterTypeDef] = []
-
-  flow_content_parameters = []
-
-  # Check which parameters the stack needs
-  for parameter in parsed_template["Parameters"]:
-    # Retrieve the relevant values from the instance config
-    # Requires the format as "FieldNameAttribute", camelcased.  E.g. PublicNumberArn converts to instance_config.public_number["Arn"]
-    *name_tokens, attribute = re.sub(
-      CAMELCASE_SPLIT_REGEX, r" \1", parameter["ParameterKey"]
-    ).split()
-
-    name_without_attribute = "".join(name_tokens)
-
-    if attribute == "Content":
-      # Requires rendering flow content, will be done together at the end
-      flow_content_parameters.append(name_without_attribute)
-    else:
-      value: str
-
-      if name_without_attribute in previous_stack_resources:
-        value = previous_stack_resources[name_without_attribute]
-      else:
-        # Basic instance attribute config
-        field_name = "_".join([token.lower() for token in name_tokens])
-
-        # May be on the instance config or from the main stack
-        field = instance_config.__getattribute__(field_name)
-
-        # Handle case where summary field is "<Prefix>Id" or "<Prefix>Arn"
-        for key in field.keys():
-          if key.endswith(attribute):
-            attribute = key
-            break
-
-        value = field[attribute]
-
-      # Add the stack parameter
-      template_parameters.append(
-        {
-          "ParameterKey": parameter["ParameterKey"],
-          "ParameterValue": value,
-        }
-      )
-
-  if flow_content_parameters:
-    template_parameters += render_flows(
-      flow_content_parameters, previous_stack_resources
-    )
-
-  return template_parameters
+  return {
+    stack_config.stack_name: Path(stack_config.stack_template_file).read_text()
+    for stack_config in STACK_CONFIGS
+  }
 
 
 def deploy_stack(
@@ -121,6 +40,10 @@ def deploy_stack(
   stack_config: StackConfig,
   instance_config: InstanceConfig,
   previous_stack_resources: dict[str, str] = {},
+  template: str | None = None,
+  layout: bool = True,
+  version_store: VersionStore | None = None,
+  renderer: str = "jinja2",
 ) -> dict[str, str]:
   """Deploy a single cloudformation stack.
 
@@ -129,59 +52,161 @@ def deploy_stack(
       stack_config (StackConfig): Stack-specific configuration, including the name and location of the template
       instance_config (InstanceConfig): Connect instance configuration
       previous_stack_resources (dict[str, str], optional): Resources from earlier stack deployments, as a map of name to ARN. Defaults to {}.
+      template (str | None, optional): The cloudformation template. Defaults to None, which reads it from the stack's template file.
+      layout (bool, optional): Whether to keep the flow editor layout metadata in the flow content. Defaults to True.
+      version_store (VersionStore | None, optional): Records the deployed flow content. Defaults to None.
+      renderer (str, optional): The flow renderer, "jinja2" or "structural". Defaults to "jinja2".
 
   Returns:
       dict[str, str]: Resources from this stack, as a map of name to ARN
   """
-  template = Path(stack_config.stack_template_file).read_text()
+  if template is None:
+    template = Path(stack_config.stack_template_file).read_text()
+
+  check_size(
+    f"{stack_config.stack_name} template", len(template.encode()), TEMPLATE_BODY_LIMIT
+  )
 
   parameters = create_stack_parameters(
-    client, instance_config, template, previous_stack_resources
+    client, instance_config, template, previous_stack_resources, layout, renderer
   )
 
   client.deploy_stack(stack_config, template, parameters)
 
+  if version_store:
+    record_flow_versions(version_store, parameters, "deploy")
+
   return client.get_stack_resource_mapping(stack_config.stack_name)
 
 
-def deploy() -> None:
-  """Deploys all the system's cloudformation stacks."""
-  # Read parameters
-  parameters = read_parameters()
+def deploy(
+  parameters: Parameters | None = None,
+  stack_templates: dict[str, str] = {},
+  layout: bool = True,
+  version_store: VersionStore | None = None,
+  context: RunContext | None = None,
+  renderer: str = "jinja2",
+) -> None:
+  """Deploys all the system's cloudformation stacks.
+
+  Args:
+      parameters (Parameters | None, optional): The system parameters. Defaults to None, which reads them from the .env file.
+      stack_templates (dict[str, str], optional): Preloaded cloudformation templates, by stack name. Defaults to {}, which reads them from the template files.
+      layout (bool, optional): Whether to keep the flow editor layout metadata in the flow content. Defaults to True.
+      version_store (VersionStore | None, optional): Records the deployed flow content. Defaults to None.
+      context (RunContext | None, optional): The state shared with the other phases of the run, which receives the deployed resources. Defaults to None, which creates one from the parameters.
+      renderer (str, optional): The flow renderer, "jinja2" or "structural". Defaults to "jinja2".
+  """
+  if context is None:
+    context = RunContext(parameters)
 
   # Retrieve instance config
   logger.info("Retrieving instance config...")
-  connect_client = ConnectClient(parameters["InstanceAlias"])
-  phone_numbers = connect_client.get_phone_number_summaries(
-    [parameters["PrivateNumber"], parameters["PublicNumber"]]
-  )
-  instance_config = InstanceConfig(connect_client.instance, *phone_numbers)
-
-  cloudformation_client = CloudformationClient()
+  instance_config = context.instance_config
+  cloudformation_client = context.cloudformation_client
 
   logger.info("Deploying stacks")
 
   created_resources = deploy_stack(
-    cloudformation_client, WHISPER_FLOW_STACK_CONFIG, instance_config
+    cloudformation_client,
+    WHISPER_FLOW_STACK_CONFIG,
+    instance_config,
+    template=stack_templates.get(WHISPER_FLOW_STACK_CONFIG.stack_name),
+    layout=layout,
+    version_store=version_store,
+    renderer=renderer,
   )
 
   # Build the main stack
   created_resources.update(
     deploy_stack(
-      cloudformation_client, MAIN_STACK_CONFIG, instance_config, created_resources
+      cloudformation_client,
+      MAIN_STACK_CONFIG,
+      instance_config,
+      created_resources,
+      stack_templates.get(MAIN_STACK_CONFIG.stack_name),
+      layout,
+      version_store,
+      renderer,
     )
   )
 
   # Build the callback flow stack
-  deploy_stack(
-    cloudformation_client,
-    CALLBACK_FLOW_STACK_CONFIG,
-    instance_config,
-    created_resources,
+  created_resources.update(
+    deploy_stack(
+      cloudformation_client,
+      CALLBACK_FLOW_STACK_CONFIG,
+      instance_config,
+      created_resources,
+      stack_templates.get(CALLBACK_FLOW_STACK_CONFIG.stack_name),
+      layout,
+      version_store,
+      renderer,
+    )
   )
+  context.resources.update(created_resources)
 
   logger.info("Deploy complete")
 
 
 if __name__ == "__main__":
-  deploy()
+  parser = argparse.ArgumentParser(description="Deploy the system's stacks")
+  mode = parser.add_mutually_exclusive_group()
+  mode.add_argument(
+    "--flows-only",
+    action="store_true",
+    help="Only publish changed contact flow content, bypassing the stack deployments",
+  )
+  mode.add_argument(
+    "--plan",
+    action="store_true",
+    help="Show which stacks and parameters would change, without deploying",
+  )
+  parser.add_argument(
+    "--strip-layout",
+    action="store_true",
+    help="Remove the flow editor layout metadata from the contact flow content",
+  )
+  parser.add_argument(
+    "--renderer",
+    choices=["jinja2", "structural"],
+    default="jinja2",
+    help="Render the contact flow content with jinja2, or with the structural renderer, which fails on any missing resources",
+  )
+  parser.add_argument(
+    "--wait",
+    action="store_true",
+    help="With --flows-only, wait for the flow stack updates to complete",
+  )
+  parser.add_argument(
+    "--no-versions",
+    action="store_true",
+    help="Don't record the deployed flows in the version store",
+  )
+  parser.add_argument(
+    "--profile",
+    action="store_true",
+    help="Profile the run, writing a report to output/profiles",
+  )
+  args = parser.parse_args()
+
+  version_store = None if args.no_versions else VersionStore(VERSION_STORE_DIRECTORY)
+
+  with profiled("deploy", args.profile):
+    if args.flows_only:
+      publish_flows(
+        layout=not args.strip_layout,
+        version_store=version_store,
+        wait=args.wait,
+        renderer=args.renderer,
+      )
+    elif args.plan:
+      plan(layout=not args.strip_layout, renderer=args.renderer)
+    else:
+      deploy(
+        layout=not args.strip_layout,
+        version_store=version_store,
+        renderer=args.renderer,
+      )
+
+  report_metrics()
@@ -0,0 +1,165 @@
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import sys
+import time
+
+from deploy import deploy
+from shared.logger import logger
+from shared.utils import Parameters, format_table, read_parameters
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class FleetResult:
+  """The outcome of deploying to a single fleet target."""
+
+  target: str
+  duration: float
+  error: Exception | None
+
+  def __init__(self, target: str, duration: float, error: Exception | None) -> None:
+    """Constructor.
+
+    Args:
+        target (str): A description of the target, i.e. the instance alias and region
+        duration (float): The time taken to deploy, in seconds
+        error (Exception | None): The error raised by the deployment, or None if it succeeded
+    """
+    self.target = target
+    self.duration = duration
+    self.error = error
+
+  @property
+  def succeeded(self) -> bool:
+    """Whether the deployment succeeded.
+
+    Returns:
+        bool: True if the deployment succeeded, False otherwise
+    """
+    return self.error is None
+
+
+def describe_target(parameters: Parameters) -> str:
+  """Create a readable description of a fleet target.
+
+  Args:
+      parameters (Parameters): The target's system parameters
+
+  Returns:
+      str: The description, as "<alias> (<region>)"
+  """
+  return f"{parameters['InstanceAlias']} ({parameters['Region'] or 'default'})"
+
+
+def deploy_target(
+  parameters: Parameters, stack_templates: dict[str, str]
+) -> FleetResult:
+  """Deploy the stacks to a single target, capturing any error so it doesn't affect the other targets.
+
+  Args:
+      parameters (Parameters): The target's system parameters
+      stack_templates (dict[str, str]): The shared cloudformation templates, by stack name
+
+  Returns:
+      FleetResult: The outcome of the deployment
+  """
+  target = describe_target(parameters)
+  error: Exception | None = None
+
+  logger.info(f"Starting deployment to {target}")
+  start = time.perf_counter()
+
+  try:
+    deploy.deploy(parameters, stack_templates)
+  except Exception as ex:
+    logger.error(f"Deployment to {target} failed: {ex}")
+    error = ex
+
+  return FleetResult(target, time.perf_counter() - start, error)
+
+
+def deploy_fleet(
+  targets: list[Parameters], max_workers: int = DEFAULT_MAX_WORKERS
+) -> list[FleetResult]:
+  """Deploy the stacks to each target concurrently.
+
+  Args:
+      targets (list[Parameters]): The system parameters of each target
+      max_workers (int, optional): The maximum number of concurrent deployments. Defaults to DEFAULT_MAX_WORKERS.
+
+  Returns:
+      list[FleetResult]: The outcome of each deployment, in the same order as the targets
+  """
+  # Templates are identical for every target, so only read them once
+  stack_templates = deploy.read_stack_templates()
+
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    return list(
+      executor.map(lambda target: deploy_target(target, stack_templates), targets)
+    )
+
+
+def format_results(results: list[FleetResult]) -> str:
+  """Format the fleet deployment outcomes as a table.
+
+  Args:
+      results (list[FleetResult]): The outcome of each deployment
+
+  Returns:
+      str: The formatted table
+  """
+  return format_table(
+    [["Target", "Status", "Duration", "Error"]]
+    + [
+      [
+        result.target,
+        "SUCCEEDED" if result.succeeded else "FAILED",
+        f"{result.duration:.1f}s",
+        str(result.error or ""),
+      ]
+      for result in results
+    ]
+  )
+
+
+def fleet(env_files: list[str], max_workers: int = DEFAULT_MAX_WORKERS) -> bool:
+  """Deploy the stacks to each instance described by the given .env files.
+
+  Args:
+      env_files (list[str]): The .env files of each target
+      max_workers (int, optional): The maximum number of concurrent deployments. Defaults to DEFAULT_MAX_WORKERS.
+
+  Returns:
+      bool: True if every deployment succeeded, False otherwise
+  """
+  targets = [read_parameters(env_file) for env_file in env_files]
+
+  logger.info(f"Starting fleet deployment to {len(targets)} targets")
+  start = time.perf_counter()
+
+  results = deploy_fleet(targets, max_workers)
+
+  failed = len([result for result in results if not result.succeeded])
+  logger.info(
+    f"Fleet deployment complete in {time.perf_counter() - start:.1f}s, {failed} failed:\n"
+    + format_results(results)
+  )
+
+  return failed == 0
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+    description="Deploy the stacks to multiple Connect instances concurrently"
+  )
+  parser.add_argument("env_files", nargs="+", help="The .env file of each target")
+  parser.add_argument(
+    "--max-workers",
+    type=int,
+    default=DEFAULT_MAX_WORKERS,
+    help="The maximum number of concurrent deployments",
+  )
+  args = parser.parse_args()
+
+  if not fleet(args.env_files, args.max_workers):
+    sys.exit(1)
@@ -0,0 +1,122 @@
+import functools
+import json
+import re
+from typing import Any, Iterator
+
+from shared import json_backend
+from shared.utils import FLOW_CONTENT_DIRECTORY
+
+PLACEHOLDER_REGEX = re.compile(r"\{\{resources\['([^'\]]+)'\]\}\}")
+TEMPLATE_SYNTAX_REGEX = re.compile(r"\{\{|\{%|\{#")
+
+
+class MissingResourceError(Exception):
+  """Raised when a flow template references resources that weren't provided."""
+
+
+def find_placeholders(node: Any, path: str = "") -> Iterator[tuple[str, str]]:
+  """Find the resource placeholders in parsed flow content.
+
+  Args:
+      node (Any): The flow content, or a node within it
+      path (str, optional): The JSON pointer of the node. Defaults to "", i.e. the root.
+
+  Yields:
+      Iterator[tuple[str, str]]: The resource name and JSON pointer of each placeholder
+  """
+  if isinstance(node, dict):
+    for key, child in node.items():
+      yield from find_placeholders(child, f"{path}/{key}")
+  elif isinstance(node, list):
+    for index, child in enumerate(node):
+      yield from find_placeholders(child, f"{path}/{index}")
+  elif isinstance(node, str):
+    for match in PLACEHOLDER_REGEX.finditer(node):
+      yield match.group(1), path
+
+
+class FlowTemplate:
+  """A templated contact flow, prepared once so that it can be rendered by splicing resource ARNs into the raw content."""
+
+  name: str
+  segments: list[str]
+  resource_names: list[str]
+  paths: dict[str, list[str]]
+
+  def __init__(self, name: str, content: str) -> None:
+    """Constructor.
+
+    Args:
+        name (str): The name of the flow
+        content (str): The templated flow content, as a JSON string
+
+    Raises:
+        ValueError: The content contains template syntax other than resource placeholders
+    """
+    self.name = name
+
+    # Alternating raw content and resource names, starting and ending with content
+    tokens = PLACEHOLDER_REGEX.split(content)
+    self.segments = tokens[::2]
+    self.resource_names = tokens[1::2]
+
+    for segment in self.segments:
+      if TEMPLATE_SYNTAX_REGEX.search(segment):
+        raise ValueError(
+          f"Flow {name} contains template syntax other than resource placeholders"
+        )
+
+    # Record where each resource is used, for error reporting
+    self.paths = {}
+    for resource_name, path in find_placeholders(json_backend.loads(content)):
+      self.paths.setdefault(resource_name, []).append(path)
+
+  def render(self, resources: dict[str, str]) -> str:
+    """Render the flow content with the given resources.
+
+    Args:
+        resources (dict[str, str]): Map of resource names to ARNs
+
+    Raises:
+        MissingResourceError: A placeholder references a resource that wasn't provided
+
+    Returns:
+        str: The rendered flow content, as a JSON string
+    """
+    missing = [
+      name for name in dict.fromkeys(self.resource_names) if name not in resources
+    ]
+    if missing:
+      raise MissingResourceError(
+        f"Flow {self.name} references missing resources: "
+        + ", ".join(
+          f"{name} at {', '.join(self.paths.get(name, ['an object key']))}"
+          for name in missing
+        )
+      )
+
+    # Escape each value once, so it can't break out of the JSON string
+    values = {
+      name: json.dumps(resources[name])[1:-1]
+      for name in dict.fromkeys(self.resource_names)
+    }
+
+    parts = [""] * (len(self.segments) + len(self.resource_names))
+    parts[::2] = self.segments
+    parts[1::2] = [values[name] for name in self.resource_names]
+
+    return "".join(parts)
+
+
+@functools.cache
+def load_flow_template(flow_name: str) -> FlowTemplate:
+  """Load and prepare a templated contact flow, caching it for later renders.
+
+  Args:
+      flow_name (str): The name of the flow
+
+  Returns:
+      FlowTemplate: The prepared template
+  """
+  with open(FLOW_CONTENT_DIRECTORY.joinpath(f"{flow_name}.json")) as infile:
+    return FlowTemplate(flow_name, infile.read())
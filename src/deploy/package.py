@@ -0,0 +1,104 @@
+from mypy_boto3_cloudformation.type_defs import ParameterTypeDef
+from typing import Any
+
+from shared import json_backend
+from shared.logger import logger
+from shared.version_store import VersionStore
+
+LAYOUT_METADATA_KEYS = ["position", "entryPointPosition"]
+
+# Cloudformation quotas, in bytes
+PARAMETER_VALUE_LIMIT = 4096
+TEMPLATE_BODY_LIMIT = 51200
+
+# Warn when a value reaches this proportion of its limit
+SIZE_WARNING_THRESHOLD = 0.9
+
+
+def strip_layout(node: Any) -> Any:
+  """Copy flow content without the metadata that only affects its layout in the flow editor.
+
+  Args:
+      node (Any): The flow content, or a node within it
+
+  Returns:
+      Any: The copied content
+  """
+  if isinstance(node, dict):
+    return {
+      key: strip_layout(value)
+      for key, value in node.items()
+      if key not in LAYOUT_METADATA_KEYS
+    }
+
+  if isinstance(node, list):
+    return [strip_layout(child) for child in node]
+
+  return node
+
+
+def check_size(description: str, size: int, limit: int) -> None:
+  """Log a warning if a size is approaching or over its limit.
+
+  Args:
+      description (str): A description of what was measured
+      size (int): The size, in bytes
+      limit (int): The limit, in bytes
+  """
+  if size > limit:
+    logger.warning(f"{description} is {size} bytes, over the limit of {limit}")
+  elif size >= limit * SIZE_WARNING_THRESHOLD:
+    logger.warning(f"{description} is {size} bytes, close to the limit of {limit}")
+
+
+def package_flows(
+  content_parameters: list[ParameterTypeDef], layout: bool = True
+) -> list[ParameterTypeDef]:
+  """Compact rendered contact flow content parameters, to reduce the size of stack deployments.
+
+  Args:
+      content_parameters (list[ParameterTypeDef]): The rendered contact flow content parameters
+      layout (bool, optional): Whether to keep the flow editor layout metadata. Defaults to True.
+
+  Returns:
+      list[ParameterTypeDef]: The packaged contact flow content parameters
+  """
+  packaged_parameters: list[ParameterTypeDef] = []
+
+  for parameter in content_parameters:
+    content = json_backend.loads(parameter["ParameterValue"])
+    if not layout:
+      content = strip_layout(content)
+
+    packaged = json_backend.dumps(content)
+    size = len(packaged.encode())
+
+    logger.info(
+      f"Packaged {parameter['ParameterKey']} from {len(parameter['ParameterValue'].encode())} to {size} bytes"
+    )
+    check_size(parameter["ParameterKey"], size, PARAMETER_VALUE_LIMIT)
+
+    packaged_parameters.append(
+      {"ParameterKey": parameter["ParameterKey"], "ParameterValue": packaged}
+    )
+
+  return packaged_parameters
+
+
+def record_flow_versions(
+  version_store: VersionStore, parameters: list[ParameterTypeDef], source: str
+) -> None:
+  """Record the flow content in stack parameters in the version store.
+
+  Args:
+      version_store (VersionStore): The version store
+      parameters (list[ParameterTypeDef]): The stack parameters, of which only the flow content is recorded
+      source (str): What produced the versions, e.g. "deploy"
+  """
+  for parameter in parameters:
+    if parameter["ParameterKey"].endswith("Content"):
+      version_store.put(
+        parameter["ParameterKey"].removesuffix("Content"),
+        json_backend.loads(parameter["ParameterValue"]),
+        source,
+      )
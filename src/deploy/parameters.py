@@ -0,0 +1,171 @@
+import functools
+import jinja2
+from mypy_boto3_cloudformation.type_defs import ParameterTypeDef
+from pathlib import Path
+import re
+
+from deploy.flow_template import load_flow_template
+from deploy.package import package_flows
+from shared.clients.cloudformation_client import CloudformationClient
+from shared.logger import logger
+from shared.utils import (
+  FLOW_CONTENT_DIRECTORY,
+  FLOW_TEMPLATE_MODULE_DIRECTORY,
+  InstanceConfig,
+)
+
+CAMELCASE_SPLIT_REGEX = r"([A-Z])"
+
+
+def flow_template_modules_current(
+  template_directory: Path = FLOW_CONTENT_DIRECTORY,
+  module_directory: Path = FLOW_TEMPLATE_MODULE_DIRECTORY,
+) -> bool:
+  """Check whether every flow template has a precompiled module that is newer than the template.
+
+  Args:
+      template_directory (Path, optional): The directory of the flow templates. Defaults to FLOW_CONTENT_DIRECTORY.
+      module_directory (Path, optional): The directory of the precompiled modules. Defaults to FLOW_TEMPLATE_MODULE_DIRECTORY.
+
+  Returns:
+      bool: True if the precompiled modules can be used, False otherwise
+  """
+  for template_path in template_directory.glob("*.json"):
+    module_path = module_directory.joinpath(
+      jinja2.ModuleLoader.get_module_filename(template_path.name)
+    )
+
+    if (
+      not module_path.exists()
+      or module_path.stat().st_mtime < template_path.stat().st_mtime
+    ):
+      return False
+
+  return True
+
+
+@functools.cache
+def get_flow_environment() -> jinja2.Environment:
+  """Retrieve the shared jinja2 environment for rendering flow templates, creating it on the first call.
+
+  Precompiled template modules are used if they're up to date, otherwise the templates are parsed from disk with their bytecode cached between runs.
+
+  Returns:
+      jinja2.Environment: The jinja2 environment
+  """
+  if flow_template_modules_current():
+    return jinja2.Environment(
+      loader=jinja2.ModuleLoader(FLOW_TEMPLATE_MODULE_DIRECTORY)
+    )
+
+  logger.debug("Precompiled flow templates are missing or out of date")
+
+  return jinja2.Environment(
+    loader=jinja2.FileSystemLoader(FLOW_CONTENT_DIRECTORY),
+    bytecode_cache=jinja2.FileSystemBytecodeCache(),
+  )
+
+
+def render_flows(
+  flow_names: list[str], resources: dict[str, str], renderer: str = "jinja2"
+) -> list[ParameterTypeDef]:
+  """Renders the templated contact flow content, replacing name values with ARNs.
+
+  Args:
+      flow_names (list[str]): List of flows to render, by name
+      resources (dict[str, str]): Map of resource ARNs to common names
+      renderer (str, optional): "jinja2" to render them as jinja2 templates, or "structural" to splice the ARNs into the prepared templates, failing on any missing resources. Defaults to "jinja2".
+
+  Returns:
+      list[ParameterTypeDef]: A list of cloudformation parameters containing the rendered contact flow content.
+  """
+  content_parameters: list[ParameterTypeDef] = []
+
+  for flow_name in flow_names:
+    if renderer == "jinja2":
+      template = get_flow_environment().get_template(flow_name + ".json")
+      rendered = template.render(resources=resources)
+    else:
+      rendered = load_flow_template(flow_name).render(resources)
+
+    content_parameters.append(
+      {"ParameterKey": f"{flow_name}Content", "ParameterValue": rendered}
+    )
+
+  return content_parameters
+
+
+def create_stack_parameters(
+  client: CloudformationClient,
+  instance_config: InstanceConfig,
+  template: str,
+  previous_stack_resources: dict[str, str] = {},
+  layout: bool = True,
+  renderer: str = "jinja2",
+) -> list[ParameterTypeDef]:
+  """General function to create the cloudformation parameters from instance configuration, rendered contact flows, or other stack's resources.
+
+  Args:
+      client (CloudformationClient): The cloudformation client
+      instance_config (InstanceConfig): Connect instance configuration, for instance-specific parameters
+      template (str): The cloudformation template, used to retrieve the parameters
+      previous_stack_resources (dict[str, str], optional): Resources from earlier stack deployments, as a map of name to ARN. Defaults to {}.
+      layout (bool, optional): Whether to keep the flow editor layout metadata in the flow content. Defaults to True.
+      renderer (str, optional): The flow renderer, "jinja2" or "structural". Defaults to "jinja2".
+
+  Returns:
+      list[ParameterTypeDef]: A list of cloudformation parameters containing the combined parameters.
+  """
+  parsed_template = client.validate(template)
+  template_parameters: list[ParameterTypeDef] = []
+
+  flow_content_parameters = []
+
+  # Check which parameters the stack needs
+  for parameter in parsed_template["Parameters"]:
+    # Retrieve the relevant values from the instance config
+    # Requires the format as "FieldNameAttribute", camelcased.  E.g. PublicNumberArn converts to instance_config.public_number["Arn"]
+    *name_tokens, attribute = re.sub(
+      CAMELCASE_SPLIT_REGEX, r" \1", parameter["ParameterKey"]
+    ).split()
+
+    name_without_attribute = "".join(name_tokens)
+
+    if attribute == "Content":
+      # Requires rendering flow content, will be done together at the end
+      flow_content_parameters.append(name_without_attribute)
+    else:
+      value: str
+
+      if name_without_attribute in previous_stack_resources:
+        value = previous_stack_resources[name_without_attribute]
+      else:
+        # Basic instance attribute config
+        field_name = "_".join([token.lower() for token in name_tokens])
+
+        # May be on the instance config or from the main stack
+        field = instance_config.__getattribute__(field_name)
+
+        # Handle case where summary field is "<Prefix>Id" or "<Prefix>Arn"
+        for key in field.keys():
+          if key.endswith(attribute):
+            attribute = key
+            break
+
+        value = field[attribute]
+
+      # Add the stack parameter
+      template_parameters.append(
+        {
+          "ParameterKey": parameter["ParameterKey"],
+          "ParameterValue": value,
+        }
+      )
+
+  if flow_content_parameters:
+    template_parameters += package_flows(
+      render_flows(flow_content_parameters, previous_stack_resources, renderer),
+      layout,
+    )
+
+  return template_parameters
@@ -0,0 +1,232 @@
+from pathlib import Path
+
+from deploy.package import strip_layout
+from deploy.parameters import create_stack_parameters
+from shared import json_backend
+from shared.clients.cloudformation_client import CloudformationClient
+from shared.context import RunContext
+from shared.logger import logger
+from shared.utils import (
+  STACK_CONFIGS,
+  InstanceConfig,
+  Parameters,
+  StackConfig,
+  format_table,
+)
+
+
+class StackPlan:
+  """The planned changes to a single stack."""
+
+  stack_name: str
+  exists: bool
+  template_changed: bool
+  changed_parameters: list[str]
+  layout_parameters: list[str]
+
+  def __init__(
+    self,
+    stack_name: str,
+    exists: bool,
+    template_changed: bool = False,
+    changed_parameters: list[str] = [],
+    layout_parameters: list[str] = [],
+  ) -> None:
+    """Constructor.
+
+    Args:
+        stack_name (str): The name of the stack
+        exists (bool): Whether the stack has already been deployed
+        template_changed (bool, optional): Whether the template differs from the deployed template. Defaults to False.
+        changed_parameters (list[str], optional): The keys of the parameters that will change. Defaults to [].
+        layout_parameters (list[str], optional): The keys of the flow content parameters that only differ in layout metadata. Defaults to [].
+    """
+    self.stack_name = stack_name
+    self.exists = exists
+    self.template_changed = template_changed
+    self.changed_parameters = changed_parameters
+    self.layout_parameters = layout_parameters
+
+  @property
+  def action(self) -> str:
+    """The deployment action required for the stack.
+
+    Returns:
+        str: "CREATE", "UPDATE", or "SKIP" if there are no changes other than the flow layout
+    """
+    if not self.exists:
+      return "CREATE"
+
+    if self.template_changed or self.changed_parameters:
+      return "UPDATE"
+
+    return "SKIP"
+
+
+def compare_flow_content(deployed: str, rendered: str) -> str:
+  """Compare the deployed content of a flow with newly rendered content.
+
+  Args:
+      deployed (str): The deployed flow content, as a JSON string
+      rendered (str): The rendered flow content, as a JSON string
+
+  Returns:
+      str: "UNCHANGED", "LAYOUT" if only the layout metadata differs, or "CHANGED"
+  """
+  deployed_content = json_backend.loads(deployed)
+  rendered_content = json_backend.loads(rendered)
+
+  if deployed_content == rendered_content:
+    return "UNCHANGED"
+
+  if strip_layout(deployed_content) == strip_layout(rendered_content):
+    return "LAYOUT"
+
+  return "CHANGED"
+
+
+def plan_stack(
+  client: CloudformationClient,
+  stack_config: StackConfig,
+  instance_config: InstanceConfig,
+  template: str,
+  previous_stack_resources: dict[str, str] = {},
+  layout: bool = True,
+  renderer: str = "jinja2",
+) -> StackPlan:
+  """Compare a stack's deployed template and parameters with those that would be deployed.
+
+  Args:
+      client (CloudformationClient): The cloudformation client
+      stack_config (StackConfig): Stack-specific configuration
+      instance_config (InstanceConfig): Connect instance configuration
+      template (str): The cloudformation template
+      previous_stack_resources (dict[str, str], optional): Resources from the stack's dependencies, as a map of name to ARN. Defaults to {}.
+      layout (bool, optional): Whether to keep the flow editor layout metadata in the flow content. Defaults to True.
+      renderer (str, optional): The flow renderer, "jinja2" or "structural". Defaults to "jinja2".
+
+  Returns:
+      StackPlan: The planned changes to the stack
+  """
+  if client.get_stack_summary(stack_config.stack_name) is None:
+    return StackPlan(stack_config.stack_name, False)
+
+  deployed_parameters = client.get_stack_parameters(stack_config.stack_name)
+  parameters = create_stack_parameters(
+    client, instance_config, template, previous_stack_resources, layout, renderer
+  )
+
+  changed_parameters: list[str] = []
+  layout_parameters: list[str] = []
+
+  for parameter in parameters:
+    key = parameter["ParameterKey"]
+    value = parameter["ParameterValue"]
+
+    if key not in deployed_parameters:
+      changed_parameters.append(key)
+    elif key.endswith("Content"):
+      comparison = compare_flow_content(deployed_parameters[key], value)
+      if comparison == "CHANGED":
+        changed_parameters.append(key)
+      elif comparison == "LAYOUT":
+        layout_parameters.append(key)
+    elif deployed_parameters[key] != value:
+      changed_parameters.append(key)
+
+  return StackPlan(
+    stack_config.stack_name,
+    True,
+    client.get_stack_template(stack_config.stack_name) != template,
+    changed_parameters,
+    layout_parameters,
+  )
+
+
+def format_plan(plans: list[StackPlan]) -> str:
+  """Format the stack plans as a table.
+
+  Args:
+      plans (list[StackPlan]): The planned changes to each stack
+
+  Returns:
+      str: The formatted table
+  """
+  rows = [["Stack", "Action", "Changes"]]
+
+  for stack_plan in plans:
+    changes = ["Template"] if stack_plan.template_changed else []
+    changes += stack_plan.changed_parameters
+    changes += [f"{key} (layout only)" for key in stack_plan.layout_parameters]
+    rows.append([stack_plan.stack_name, stack_plan.action, ", ".join(changes)])
+
+  return format_table(rows)
+
+
+def plan(
+  parameters: Parameters | None = None,
+  layout: bool = True,
+  context: RunContext | None = None,
+  renderer: str = "jinja2",
+) -> list[StackPlan]:
+  """Determine which stacks, and which of their parameters, would change in a deployment.
+
+  Dependent stacks are compared using the currently deployed resources of their dependencies, so they're only planned for an update if a referenced resource has actually changed.
+
+  Args:
+      parameters (Parameters | None, optional): The system parameters. Defaults to None, which reads them from the .env file.
+      layout (bool, optional): Whether to keep the flow editor layout metadata in the flow content. Defaults to True.
+      context (RunContext | None, optional): The state shared with the other phases of the run. Defaults to None, which creates one from the parameters.
+      renderer (str, optional): The flow renderer, "jinja2" or "structural". Defaults to "jinja2".
+
+  Returns:
+      list[StackPlan]: The planned changes to each stack, in deployment order
+  """
+  if context is None:
+    context = RunContext(parameters)
+
+  logger.info("Retrieving instance config...")
+  instance_config = context.instance_config
+  cloudformation_client = context.cloudformation_client
+
+  logger.info("Planning deployment...")
+
+  plans: dict[str, StackPlan] = {}
+  resources: dict[str, str] = {}
+
+  for stack_config in STACK_CONFIGS:
+    # The resources of new dependencies are unknown, so the stack will need to be deployed after them
+    created_dependencies = [
+      dependency.stack_name
+      for dependency in stack_config.dependencies
+      if plans[dependency.stack_name].action == "CREATE"
+    ]
+
+    if created_dependencies:
+      plans[stack_config.stack_name] = StackPlan(
+        stack_config.stack_name,
+        cloudformation_client.get_stack_summary(stack_config.stack_name) is not None,
+        changed_parameters=[
+          f"Resources from {stack_name}" for stack_name in created_dependencies
+        ],
+      )
+      continue
+
+    plans[stack_config.stack_name] = plan_stack(
+      cloudformation_client,
+      stack_config,
+      instance_config,
+      Path(stack_config.stack_template_file).read_text(),
+      resources,
+      layout,
+      renderer,
+    )
+
+    if plans[stack_config.stack_name].exists:
+      resources.update(
+        cloudformation_client.get_stack_resource_mapping(stack_config.stack_name)
+      )
+
+  logger.info("Deployment plan:\n" + format_plan(list(plans.values())))
+
+  return list(plans.values())
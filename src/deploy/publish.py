@@ -0,0 +1,147 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from deploy.package import package_flows, record_flow_versions
+from deploy.parameters import render_flows
+from shared import json_backend
+from shared.clients.connect_client import ConnectClient
+from shared.context import RunContext
+from shared.logger import logger
+from shared.version_store import VersionStore
+from shared.utils import (
+  CALLBACK_FLOW_STACK_CONFIG,
+  STACK_CONFIGS,
+  WHISPER_FLOW_STACK_CONFIG,
+  Parameters,
+)
+
+DEFAULT_MAX_WORKERS = 4
+
+FLOW_STACK_CONFIGS = [WHISPER_FLOW_STACK_CONFIG, CALLBACK_FLOW_STACK_CONFIG]
+
+
+def publish_flow(
+  connect_client: ConnectClient, flow_name: str, flow_arn: str, content: str
+) -> bool:
+  """Publish the content of a contact flow if it differs from the live content.
+
+  Args:
+      connect_client (ConnectClient): The connect client
+      flow_name (str): The name of the flow
+      flow_arn (str): The ARN of the flow
+      content (str): The rendered content of the flow
+
+  Returns:
+      bool: True if the flow was updated, False if it was already up to date
+  """
+  live_content = connect_client.get_contact_flow(flow_arn)["Content"]
+
+  # Compare structurally, as the live content won't have the same formatting
+  if json_backend.loads(live_content) == json_backend.loads(content):
+    logger.info(f"Flow {flow_name} is up to date")
+    return False
+
+  logger.info(f"Publishing flow {flow_name}...")
+  connect_client.update_contact_flow_content(flow_arn, content)
+
+  return True
+
+
+def publish_flows(
+  parameters: Parameters | None = None,
+  max_workers: int = DEFAULT_MAX_WORKERS,
+  layout: bool = True,
+  version_store: VersionStore | None = None,
+  context: RunContext | None = None,
+  wait: bool = False,
+  renderer: str = "jinja2",
+) -> list[str]:
+  """Publish changed contact flow content directly, bypassing the slower stack deployments.
+
+  The flow stacks are then updated with the new content in the background, so that cloudformation doesn't drift from the live flows.  The next publish waits for any of these updates that are still in progress, and fails if one didn't complete.
+
+  Args:
+      parameters (Parameters | None, optional): The system parameters. Defaults to None, which reads them from the .env file.
+      max_workers (int, optional): The maximum number of flows to publish concurrently. Defaults to DEFAULT_MAX_WORKERS.
+      layout (bool, optional): Whether to keep the flow editor layout metadata in the flow content. Defaults to True.
+      version_store (VersionStore | None, optional): Records the published flow content. Defaults to None.
+      context (RunContext | None, optional): The state shared with the other phases of the run. Defaults to None, which creates one from the parameters.
+      wait (bool, optional): Whether to wait for the stack updates to complete, failing if any of them don't. Defaults to False.
+      renderer (str, optional): The flow renderer, "jinja2" or "structural". Defaults to "jinja2".
+
+  Returns:
+      list[str]: The names of the flows that were published
+  """
+  if context is None:
+    context = RunContext(parameters)
+
+  connect_client = context.connect_client
+  cloudformation_client = context.cloudformation_client
+
+  # Flow ARNs, and the resources referenced by the flow content, come from the existing stacks
+  logger.info("Retrieving stack resources...")
+  resources: dict[str, str] = {}
+  for stack_config in STACK_CONFIGS:
+    resources.update(
+      cloudformation_client.get_stack_resource_mapping(stack_config.stack_name)
+    )
+  context.resources.update(resources)
+
+  flow_names = [
+    flow_name
+    for stack_config in FLOW_STACK_CONFIGS
+    for flow_name in stack_config.flow_names
+  ]
+  content_parameters = package_flows(
+    render_flows(flow_names, resources, renderer), layout
+  )
+
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    published = list(
+      executor.map(
+        lambda flow_name, content_parameter: publish_flow(
+          connect_client,
+          flow_name,
+          resources[flow_name],
+          content_parameter["ParameterValue"],
+        ),
+        flow_names,
+        content_parameters,
+      )
+    )
+
+  published_flows = [
+    flow_name for flow_name, changed in zip(flow_names, published) if changed
+  ]
+
+  if version_store:
+    record_flow_versions(
+      version_store,
+      [
+        content_parameter
+        for flow_name, content_parameter in zip(flow_names, content_parameters)
+        if flow_name in published_flows
+      ],
+      "publish",
+    )
+
+  # Reconcile the stacks with the published content
+  updating_stacks: list[str] = []
+  for stack_config in FLOW_STACK_CONFIGS:
+    stack_parameters = [
+      content_parameter
+      for flow_name, content_parameter in zip(flow_names, content_parameters)
+      if flow_name in stack_config.flow_names and flow_name in published_flows
+    ]
+
+    if stack_parameters and cloudformation_client.update_stack_parameters(
+      stack_config.stack_name, stack_parameters, wait
+    ):
+      updating_stacks.append(stack_config.stack_name)
+
+  logger.info(f"Publish complete, {len(published_flows)} flows updated")
+  if updating_stacks and not wait:
+    logger.info(
+      f"Updates of {', '.join(updating_stacks)} continue in the background, pass --wait to wait for them"
+    )
+
+  return published_flows
@@ -1,34 +1,53 @@
+import argparse
+
 from deploy import deploy
-from shared.clients.connect_client import ConnectClient
+from shared.context import RunContext
 from shared.logger import logger
-from shared.utils import FLOW_NAMES, read_parameters, ROUTING_PROFILE_NAME
+from shared.metrics import report_metrics
+from shared.profiler import profiled
+from shared.utils import FLOW_NAMES, ROUTING_PROFILE_NAME
+
 
+def setup(context: RunContext | None = None) -> None:
+  """Setup the system, deploying the stacks and assigning resources accordingly.
 
-def setup() -> None:
-  """Setup the system, deploying the stacks and assigning resources accordingly."""
-  parameters = read_parameters()
+  Args:
+      context (RunContext | None, optional): The state shared between the phases of the run. Defaults to None, which creates one from the .env file.
+  """
+  if context is None:
+    context = RunContext()
 
   logger.info("Starting setup")
 
-  # Perform the deployment
-  deploy.deploy()
+  # Perform the deployment, which resolves the instance config and the new flows for the assignments
+  deploy.deploy(context=context)
 
   logger.info("Assigning phone number to contact flow")
 
-  connect_client = ConnectClient(parameters["InstanceAlias"])
-
   # Assign the contact flow phone number
-  connect_client.assign_contact_flow_number(
-    FLOW_NAMES["inbound"], parameters["PrivateNumber"]
+  context.assign_contact_flow_number(
+    FLOW_NAMES["inbound"], context.parameters["PrivateNumber"]
   )
 
   # Move the user to the routing profile
-  connect_client.assign_user_to_routing_profile(
-    parameters["AgentUsername"], ROUTING_PROFILE_NAME
+  context.assign_user_to_routing_profile(
+    context.parameters["AgentUsername"], ROUTING_PROFILE_NAME
   )
 
   logger.info("Setup complete")
 
 
 if __name__ == "__main__":
-  setup()
+  parser = argparse.ArgumentParser(
+    description="Deploy the system's stacks and assign its resources"
+  )
+  parser.add_argument(
+    "--profile",
+    action="store_true",
+    help="Profile the run, writing a report to output/profiles",
+  )
+  args = parser.parse_args()
+
+  with profiled("setup", args.profile):
+    setup()
+  report_metrics()
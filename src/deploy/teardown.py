@@ -1,27 +1,175 @@
-from shared.clients import connect_client
+import argparse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import sys
+import time
+
+from shared.clients.cloudformation_client import CloudformationClient
+from shared.context import RunContext
 from shared.logger import logger
-from shared.utils import read_parameters
+from shared.profiler import profiled
+from shared.utils import STACK_CONFIGS, StackConfig
+
+DEFAULT_MAX_WORKERS = 4
+
+
+def get_dependents(stack_configs: list[StackConfig]) -> dict[str, list[str]]:
+  """Find the stacks that reference each stack, which must be deleted before it.
+
+  Args:
+      stack_configs (list[StackConfig]): The stacks
+
+  Returns:
+      dict[str, list[str]]: The names of the dependent stacks, by stack name
+  """
+  dependents: dict[str, list[str]] = {
+    stack_config.stack_name: [] for stack_config in stack_configs
+  }
+
+  for stack_config in stack_configs:
+    for dependency in stack_config.dependencies:
+      dependents[dependency.stack_name].append(stack_config.stack_name)
+
+  return dependents
+
+
+def delete_stacks(
+  client: CloudformationClient,
+  stack_configs: list[StackConfig] = STACK_CONFIGS,
+  max_workers: int = DEFAULT_MAX_WORKERS,
+) -> list[str]:
+  """Delete stacks in reverse dependency order, deleting independent stacks concurrently.
+
+  Each stack is deleted as soon as every stack that references it has been deleted.  If a deletion fails, the stacks it depends on are kept.
+
+  Args:
+      client (CloudformationClient): The cloudformation client
+      stack_configs (list[StackConfig], optional): The stacks to delete. Defaults to STACK_CONFIGS.
+      max_workers (int, optional): The maximum number of concurrent deletions. Defaults to DEFAULT_MAX_WORKERS.
+
+  Returns:
+      list[str]: The names of the stacks that weren't deleted
+  """
+  dependents = get_dependents(stack_configs)
+  remaining = {
+    stack_name: len(stack_dependents)
+    for stack_name, stack_dependents in dependents.items()
+  }
+  dependencies = {
+    stack_config.stack_name: [
+      dependency.stack_name for dependency in stack_config.dependencies
+    ]
+    for stack_config in stack_configs
+  }
+
+  failed: list[str] = []
+
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    futures: dict[Future[bool], str] = {}
+
+    def start(stack_name: str) -> None:
+      futures[executor.submit(client.delete_stack, stack_name)] = stack_name
+
+    for stack_name, count in remaining.items():
+      if not count:
+        start(stack_name)
 
+    while futures:
+      done, _ = wait(futures, return_when=FIRST_COMPLETED)
 
-def teardown() -> None:
-  """Teardown the system, unassigning resources.  Note: doesn't delete the stacks."""
-  parameters = read_parameters()
+      for future in done:
+        stack_name = futures.pop(future)
+
+        try:
+          future.result()
+        except Exception as ex:
+          logger.error(f"Failed to delete {stack_name}: {ex}")
+          failed.append(stack_name)
+          continue
+
+        # Start any dependencies that are no longer referenced
+        for dependency in dependencies[stack_name]:
+          remaining[dependency] -= 1
+          if not remaining[dependency]:
+            start(dependency)
+
+  # Stacks that were never started are still referenced by a failed stack
+  return [
+    stack_config.stack_name
+    for stack_config in stack_configs
+    if stack_config.stack_name in failed or remaining[stack_config.stack_name]
+  ]
+
+
+def teardown(
+  context: RunContext | None = None,
+  delete: bool = False,
+  max_workers: int = DEFAULT_MAX_WORKERS,
+) -> bool:
+  """Teardown the system, unassigning resources and optionally deleting the stacks.
+
+  Args:
+      context (RunContext | None, optional): The state shared between the phases of the run. Defaults to None, which creates one from the .env file.
+      delete (bool, optional): Whether to also delete the stacks. Defaults to False.
+      max_workers (int, optional): The maximum number of concurrent stack deletions. Defaults to DEFAULT_MAX_WORKERS.
+
+  Returns:
+      bool: True if the teardown succeeded, False if any stacks couldn't be deleted
+  """
+  if context is None:
+    context = RunContext()
 
   logger.info("Starting teardown")
 
   logger.info("Unassigning phone number from contact flow")
 
   # Unassign the contact flow phone number
-  client = connect_client.ConnectClient(parameters["InstanceAlias"])
-  client.unassign_contact_flow_number(parameters["PrivateNumber"])
+  context.unassign_contact_flow_number(context.parameters["PrivateNumber"])
 
   # Move the user to the default routing profile
-  client.assign_user_to_routing_profile(
-    parameters["AgentUsername"], parameters["DefaultRoutingProfile"]
+  context.assign_user_to_routing_profile(
+    context.parameters["AgentUsername"], context.parameters["DefaultRoutingProfile"]
   )
 
+  if delete:
+    logger.info("Deleting stacks")
+    start = time.perf_counter()
+
+    remaining = delete_stacks(context.cloudformation_client, max_workers=max_workers)
+    if remaining:
+      logger.error(f"Stacks not deleted: {', '.join(remaining)}")
+      return False
+
+    logger.info(f"Stacks deleted in {time.perf_counter() - start:.1f}s")
+
   logger.info("Teardown complete")
 
+  return True
+
 
 if __name__ == "__main__":
-  teardown()
+  parser = argparse.ArgumentParser(
+    description="Unassign the system's resources, and optionally delete the stacks"
+  )
+  parser.add_argument(
+    "--delete-stacks",
+    action="store_true",
+    help="Also delete the stacks, in reverse dependency order",
+  )
+  parser.add_argument(
+    "--max-workers",
+    type=int,
+    default=DEFAULT_MAX_WORKERS,
+    help="The maximum number of concurrent stack deletions",
+  )
+  parser.add_argument(
+    "--profile",
+    action="store_true",
+    help="Profile the run, writing a report to output/profiles",
+  )
+  args = parser.parse_args()
+
+  with profiled("teardown", args.profile):
+    succeeded = teardown(delete=args.delete_stacks, max_workers=args.max_workers)
+
+  if not succeeded:
+    sys.exit(1)
@@ -0,0 +1,101 @@
+from pathlib import Path
+import pytest
+from pytest_mock import MockerFixture
+from typing import cast
+
+from deploy.agents import (
+  ASSIGNED,
+  FAILED,
+  NOT_FOUND,
+  AssignmentResult,
+  assign_agents,
+  format_assignments,
+  onboard,
+  read_usernames,
+)
+from shared.test_helpers.helpers import MockConnectClient, patch_client
+from shared.clients import connect_client
+
+
+def test_read_usernames(tmp_path: Path) -> None:
+  path = tmp_path.joinpath("usernames.txt")
+  path.write_text("# Callback team\nagent1\n\n  agent2  \nagent1\n")
+
+  assert read_usernames(path) == ["agent1", "agent2"]
+
+
+def test_assign_agents() -> None:
+  mock_client = MockConnectClient("alias")
+
+  results = assign_agents(
+    cast(connect_client.ConnectClient, mock_client),
+    ["agent1", "missing", "broken", "agent2"],
+    "Callback Routing Profile",
+    max_workers=2,
+    rate=1000,
+  )
+
+  assert [(result.username, result.status) for result in results] == [
+    ("agent1", ASSIGNED),
+    ("missing", NOT_FOUND),
+    ("broken", FAILED),
+    ("agent2", ASSIGNED),
+  ]
+  assert str(results[2].error) == "update failed"
+
+  # Users and the routing profile are each resolved once for the whole batch
+  assert mock_client.calls.count("get_user_summaries") == 1
+  assert mock_client.calls.count("get_routing_profile_summary") == 1
+  assert mock_client.calls.count("update_user_routing_profile") == 2
+
+
+def test_assign_agents_missing_routing_profile() -> None:
+  mock_client = MockConnectClient("alias")
+
+  with pytest.raises(ValueError, match="Routing profile missing doesn't exist"):
+    assign_agents(
+      cast(connect_client.ConnectClient, mock_client), ["agent1", "agent2"], "missing"
+    )
+
+  # Nobody is assigned
+  assert "update_user_routing_profile" not in mock_client.calls
+
+
+def test_format_assignments() -> None:
+  table = format_assignments(
+    [
+      AssignmentResult("agent1", ASSIGNED),
+      AssignmentResult("broken", FAILED, Exception("update failed")),
+    ]
+  )
+
+  assert table.splitlines() == [
+    "Username  Status    Error",
+    "agent1    ASSIGNED",
+    "broken    FAILED    update failed",
+  ]
+
+
+def test_onboard(mocker: MockerFixture, tmp_path: Path) -> None:
+  mock_parameters = {
+    "InstanceAlias": "alias",
+    "PrivateNumber": "private",
+    "PublicNumber": "public",
+    "AgentUsername": "agent",
+    "CustomerNumber": "customer",
+    "DefaultRoutingProfile": "routing",
+  }
+
+  mocker.patch("dotenv.dotenv_values", return_value=mock_parameters)
+
+  mock_client = MockConnectClient("alias")
+  patch_client(mocker, connect_client.ConnectClient, mock_client)
+
+  path = tmp_path.joinpath("usernames.txt")
+  path.write_text("agent1\nagent2\n")
+
+  assert onboard(path, "routing")
+
+  path.write_text("agent1\nmissing\n")
+
+  assert not onboard(path)
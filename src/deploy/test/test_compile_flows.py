@@ -0,0 +1,38 @@
+import jinja2
+from pathlib import Path
+
+from deploy.compile_flows import compile_flows
+from deploy.parameters import flow_template_modules_current, get_flow_environment
+from shared.utils import FLOW_CONTENT_DIRECTORY, FLOW_NAMES
+
+
+def test_compile_flows(tmp_path: Path) -> None:
+  assert not flow_template_modules_current(FLOW_CONTENT_DIRECTORY, tmp_path)
+
+  compile_flows(FLOW_CONTENT_DIRECTORY, tmp_path)
+
+  assert len(list(tmp_path.glob("*.py"))) == len(FLOW_NAMES)
+  assert flow_template_modules_current(FLOW_CONTENT_DIRECTORY, tmp_path)
+
+  # Compiled templates render the same content as the originals
+  compiled_env = jinja2.Environment(loader=jinja2.ModuleLoader(tmp_path))
+  source_env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(FLOW_CONTENT_DIRECTORY)
+  )
+  resources = {"CallbackQueue": "queue arn", "CallbackAgentWhisper": "flow arn"}
+
+  for flow_name in FLOW_NAMES.values():
+    assert compiled_env.get_template(f"{flow_name}.json").render(
+      resources=resources
+    ) == source_env.get_template(f"{flow_name}.json").render(resources=resources)
+
+
+def test_get_flow_environment() -> None:
+  get_flow_environment.cache_clear()
+
+  env = get_flow_environment()
+
+  assert get_flow_environment() is env
+  assert "queue arn" in env.get_template("CallbackOutbound.json").render(
+    resources={"CallbackQueue": "queue arn"}
+  )
@@ -4,10 +4,13 @@ from pytest_mock import MockerFixture
 from typing import cast
 
 from deploy.deploy import deploy, deploy_stack
+from shared.test_helpers.fake_aws import FakeAws
 from shared.test_helpers.helpers import (
   MockCloudformationClient,
   MockConnectClient,
+  assert_call_budget,
   not_raises,
+  patch_client,
 )
 from mypy_boto3_connect.type_defs import (
   InstanceSummaryTypeDef,
@@ -80,15 +83,11 @@ def test_deploy(mocker: MockerFixture) -> None:
   mocker.patch("dotenv.dotenv_values", return_value=mock_parameters)
 
   mock_cloudformation_client = MockCloudformationClient(False)
-  mocker.patch.object(
-    cloudformation_client.CloudformationClient,
-    "__new__",
-    return_value=mock_cloudformation_client,
+  patch_client(
+    mocker, cloudformation_client.CloudformationClient, mock_cloudformation_client
   )
   mock_connect_client = MockConnectClient("alias")
-  mocker.patch.object(
-    connect_client.ConnectClient, "__new__", return_value=mock_connect_client
-  )
+  patch_client(mocker, connect_client.ConnectClient, mock_connect_client)
 
   mocker.patch.object(Path, "read_text", return_value="template body")
 
@@ -97,3 +96,18 @@ def test_deploy(mocker: MockerFixture) -> None:
 
   assert len(mock_cloudformation_client.calls) == 10
   assert mock_connect_client.calls == ["__init__", "get_phone_number_summaries"]
+
+
+def test_deploy_call_budget(fake_instance: FakeAws) -> None:
+  deploy()
+
+  # The instance config is looked up once, and each of the 3 stacks is validated, deployed then mapped
+  assert_call_budget(
+    fake_instance, "connect", 2, {"ListInstances": 1, "ListPhoneNumbersV2": 1}
+  )
+  assert_call_budget(
+    fake_instance,
+    "cloudformation",
+    18,
+    {"ValidateTemplate": 3, "CreateStack": 3, "ListStackResources": 3},
+  )
@@ -0,0 +1,80 @@
+from pathlib import Path
+from pytest_mock import MockerFixture
+from typing import cast
+
+from deploy import deploy
+from deploy.fleet import FleetResult, deploy_fleet, fleet, format_results
+from shared.utils import Parameters
+
+
+def mock_parameters(alias: str, region: str | None) -> Parameters:
+  return cast(
+    Parameters,
+    {
+      "InstanceAlias": alias,
+      "PrivateNumber": "private",
+      "PublicNumber": "public",
+      "Region": region,
+    },
+  )
+
+
+def mock_deploy(parameters: Parameters, stack_templates: dict[str, str]) -> None:
+  assert set(stack_templates.values()) == {"template body"}
+  if parameters["InstanceAlias"] == "broken":
+    raise Exception("deploy failed")
+
+
+def test_deploy_fleet(mocker: MockerFixture) -> None:
+  mock_read = mocker.patch.object(Path, "read_text", return_value="template body")
+  mock_deploy_fn = mocker.patch.object(deploy, "deploy", side_effect=mock_deploy)
+
+  results = deploy_fleet(
+    [
+      mock_parameters("alias1", "us-east-1"),
+      mock_parameters("broken", "ap-southeast-2"),
+      mock_parameters("alias2", None),
+    ],
+    max_workers=2,
+  )
+
+  # Templates are read once for the whole fleet
+  assert mock_read.call_count == 3
+  assert mock_deploy_fn.call_count == 3
+
+  assert [result.target for result in results] == [
+    "alias1 (us-east-1)",
+    "broken (ap-southeast-2)",
+    "alias2 (default)",
+  ]
+  assert [result.succeeded for result in results] == [True, False, True]
+  assert str(results[1].error) == "deploy failed"
+
+
+def test_format_results() -> None:
+  table = format_results(
+    [
+      FleetResult("alias1 (us-east-1)", 12.34, None),
+      FleetResult("broken (default)", 1.0, Exception("deploy failed")),
+    ]
+  )
+
+  assert table.splitlines() == [
+    "Target              Status     Duration  Error",
+    "alias1 (us-east-1)  SUCCEEDED  12.3s",
+    "broken (default)    FAILED     1.0s      deploy failed",
+  ]
+
+
+def test_fleet(mocker: MockerFixture) -> None:
+  mocker.patch.object(Path, "read_text", return_value="template body")
+  mocker.patch.object(deploy, "deploy", side_effect=mock_deploy)
+  mock_dotenv = mocker.patch(
+    "dotenv.dotenv_values",
+    side_effect=lambda env_file: dict(mock_parameters(env_file, "")),
+  )
+
+  assert fleet(["alias1", "alias2"])
+  assert mock_dotenv.call_count == 2
+
+  assert not fleet(["alias1", "broken"])
@@ -0,0 +1,81 @@
+import jinja2
+import pytest
+
+from deploy.flow_template import (
+  FlowTemplate,
+  MissingResourceError,
+  find_placeholders,
+  load_flow_template,
+)
+from deploy.parameters import render_flows
+from shared.utils import FLOW_CONTENT_DIRECTORY, FLOW_NAMES
+
+RESOURCES = {"CallbackQueue": "queue arn", "CallbackAgentWhisper": "flow arn"}
+
+
+def test_find_placeholders() -> None:
+  content = {
+    "meta": {"id": "{{resources['Queue']}}", "text": "Queue"},
+    "actions": [{"foo": "bar"}, {"flow": "{{resources['Flow']}}"}],
+  }
+
+  assert list(find_placeholders(content)) == [
+    ("Queue", "/meta/id"),
+    ("Flow", "/actions/1/flow"),
+  ]
+
+
+def test_flow_template_render() -> None:
+  template = FlowTemplate(
+    "flow 1",
+    '{"a": "{{resources[\'Queue\']}}", "b": ["{{resources[\'Queue\']}}", "c"]}',
+  )
+
+  assert template.paths == {"Queue": ["/a", "/b/0"]}
+  assert (
+    template.render({"Queue": "queue arn"})
+    == '{"a": "queue arn", "b": ["queue arn", "c"]}'
+  )
+
+  # Values are escaped, so can't break the JSON
+  assert template.render({"Queue": 'a"b'}) == '{"a": "a\\"b", "b": ["a\\"b", "c"]}'
+
+
+def test_flow_template_missing_resource() -> None:
+  template = FlowTemplate("flow 1", '{"a": "{{resources[\'Queue\']}}"}')
+
+  with pytest.raises(MissingResourceError, match="Queue at /a"):
+    template.render({"Other": "arn"})
+
+
+def test_flow_template_unsupported_syntax() -> None:
+  with pytest.raises(ValueError):
+    FlowTemplate("flow 1", '{"a": "{{ other }}"}')
+
+
+def test_load_flow_template() -> None:
+  template = load_flow_template("CallbackOutbound")
+
+  assert load_flow_template("CallbackOutbound") is template
+  assert set(template.paths) == {"CallbackQueue", "CallbackAgentWhisper"}
+
+
+def test_render_flows_matches_jinja2() -> None:
+  env = jinja2.Environment(loader=jinja2.FileSystemLoader(FLOW_CONTENT_DIRECTORY))
+  flow_names = list(FLOW_NAMES.values())
+
+  structural = render_flows(flow_names, RESOURCES, "structural")
+
+  assert structural == render_flows(flow_names, RESOURCES)
+  assert [parameter["ParameterValue"] for parameter in structural] == [
+    env.get_template(f"{flow_name}.json").render(resources=RESOURCES)
+    for flow_name in flow_names
+  ]
+
+
+def test_render_flows_renderer() -> None:
+  # jinja2 is the default, which leaves missing resources for CloudFormation to reject
+  assert render_flows(["CallbackOutbound"], {})[0]["ParameterValue"]
+
+  with pytest.raises(MissingResourceError, match="CallbackQueue"):
+    render_flows(["CallbackOutbound"], {}, "structural")
@@ -0,0 +1,94 @@
+import json
+import logging
+from pathlib import Path
+import pytest
+from mypy_boto3_cloudformation.type_defs import ParameterTypeDef
+
+from deploy.package import (
+  PARAMETER_VALUE_LIMIT,
+  check_size,
+  package_flows,
+  record_flow_versions,
+  strip_layout,
+)
+from deploy.parameters import render_flows
+from shared.version_store import VersionStore
+
+
+def test_strip_layout() -> None:
+  content = {
+    "Metadata": {
+      "entryPointPosition": {"x": 1, "y": 2},
+      "ActionMetadata": {"action": {"position": {"x": 3, "y": 4}, "foo": "bar"}},
+    },
+    "Actions": [{"Identifier": "action"}],
+  }
+
+  assert strip_layout(content) == {
+    "Metadata": {"ActionMetadata": {"action": {"foo": "bar"}}},
+    "Actions": [{"Identifier": "action"}],
+  }
+
+
+def test_check_size(caplog: pytest.LogCaptureFixture) -> None:
+  with caplog.at_level(logging.WARNING):
+    check_size("small", 100, 1000)
+    check_size("close", 950, 1000)
+    check_size("over", 1001, 1000)
+
+  assert [record.getMessage() for record in caplog.records] == [
+    "close is 950 bytes, close to the limit of 1000",
+    "over is 1001 bytes, over the limit of 1000",
+  ]
+
+
+def test_package_flows(caplog: pytest.LogCaptureFixture) -> None:
+  rendered = render_flows(
+    ["CallbackOutbound"],
+    {"CallbackQueue": "queue arn", "CallbackAgentWhisper": "flow arn"},
+  )
+
+  packaged = package_flows(rendered)
+  value = packaged[0]["ParameterValue"]
+
+  assert packaged[0]["ParameterKey"] == "CallbackOutboundContent"
+  assert value.startswith('{"Version":"2019-10-30",')
+  assert json.loads(value) == json.loads(rendered[0]["ParameterValue"])
+  assert len(value) < len(rendered[0]["ParameterValue"])
+
+  stripped = package_flows(rendered, layout=False)[0]["ParameterValue"]
+
+  assert json.loads(stripped) == strip_layout(json.loads(value))
+  assert len(stripped) < len(value)
+
+  # Oversized flows are reported
+  large: list[ParameterTypeDef] = [
+    {
+      "ParameterKey": "LargeContent",
+      "ParameterValue": json.dumps({"Actions": ["x" * PARAMETER_VALUE_LIMIT]}),
+    }
+  ]
+
+  with caplog.at_level(logging.WARNING):
+    package_flows(large)
+
+  assert "over the limit" in caplog.text
+
+
+def test_record_flow_versions(tmp_path: Path) -> None:
+  version_store = VersionStore(tmp_path)
+
+  # Deploying the same content again doesn't record another version
+  for _ in range(2):
+    record_flow_versions(
+      version_store,
+      [
+        {"ParameterKey": "InstanceArn", "ParameterValue": "instance arn"},
+        {"ParameterKey": "CallbackInboundContent", "ParameterValue": '{"a": 1}'},
+      ],
+      "deploy",
+    )
+
+  assert list(version_store.index) == [("flow", "CallbackInbound")]
+  (timestamp,) = version_store.versions("CallbackInbound")
+  assert version_store.get("CallbackInbound", timestamp) == '{"a":1}'
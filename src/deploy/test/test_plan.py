@@ -0,0 +1,145 @@
+import json
+from pathlib import Path
+from pytest_mock import MockerFixture
+from typing import cast
+
+from deploy.parameters import render_flows
+from deploy.plan import (
+  StackPlan,
+  compare_flow_content,
+  format_plan,
+  plan,
+  plan_stack,
+)
+from deploy.test.test_deploy import instance_config
+from shared.test_helpers.helpers import (
+  MockCloudformationClient,
+  MockConnectClient,
+  patch_client,
+)
+from shared.clients import cloudformation_client, connect_client
+from shared.utils import StackConfig
+
+
+def deployed_parameters(inbound_content: str) -> dict[str, str]:
+  return {
+    "InstanceArn": "instance arn",
+    "PrivateNumberArn": "private arn",
+    "PublicNumberArn": "public arn",
+    "CallbackInboundContent": inbound_content,
+  }
+
+
+def test_compare_flow_content() -> None:
+  content = '{"Metadata": {"position": {"x": 1}}, "Actions": ["foo"]}'
+
+  assert compare_flow_content(content, json.dumps(json.loads(content))) == "UNCHANGED"
+  assert (
+    compare_flow_content(
+      content, '{"Metadata": {"position": {"x": 2}}, "Actions": ["foo"]}'
+    )
+    == "LAYOUT"
+  )
+  assert (
+    compare_flow_content(
+      content, '{"Metadata": {"position": {"x": 1}}, "Actions": ["bar"]}'
+    )
+    == "CHANGED"
+  )
+
+
+def test_plan_stack(mocker: MockerFixture) -> None:
+  mock_client = MockCloudformationClient()
+  client = cast(cloudformation_client.CloudformationClient, mock_client)
+  stack_config = StackConfig("stack1", "template location 1")
+
+  rendered = render_flows(["CallbackInbound"], {})[0]["ParameterValue"]
+
+  # Deployed without the flow content
+  stack_plan = plan_stack(client, stack_config, instance_config(), "template body")
+  assert stack_plan.action == "UPDATE"
+  assert not stack_plan.template_changed
+  assert stack_plan.changed_parameters == ["CallbackInboundContent"]
+
+  # Deployed with the same flow content
+  mocker.patch.object(
+    mock_client, "get_stack_parameters", return_value=deployed_parameters(rendered)
+  )
+  stack_plan = plan_stack(client, stack_config, instance_config(), "template body")
+  assert stack_plan.action == "SKIP"
+  assert stack_plan.changed_parameters == []
+  assert stack_plan.layout_parameters == []
+
+  # Deployed with a different flow layout
+  moved = json.loads(rendered)
+  moved["Metadata"]["entryPointPosition"]["x"] += 100
+  mocker.patch.object(
+    mock_client,
+    "get_stack_parameters",
+    return_value=deployed_parameters(json.dumps(moved)),
+  )
+  stack_plan = plan_stack(client, stack_config, instance_config(), "template body")
+  assert stack_plan.action == "SKIP"
+  assert stack_plan.layout_parameters == ["CallbackInboundContent"]
+
+  # Not yet deployed
+  mocker.patch.object(mock_client, "get_stack_summary", return_value=None)
+  stack_plan = plan_stack(client, stack_config, instance_config(), "template body")
+  assert stack_plan.action == "CREATE"
+
+
+def test_format_plan() -> None:
+  table = format_plan(
+    [
+      StackPlan("stack1", False),
+      StackPlan("stack2", True, True, ["Key1"], ["Key2Content"]),
+      StackPlan("stack3", True),
+    ]
+  )
+
+  assert table.splitlines() == [
+    "Stack   Action  Changes",
+    "stack1  CREATE",
+    "stack2  UPDATE  Template, Key1, Key2Content (layout only)",
+    "stack3  SKIP",
+  ]
+
+
+def test_plan(mocker: MockerFixture) -> None:
+  mock_parameters = {
+    "InstanceAlias": "alias",
+    "PrivateNumber": "private",
+    "PublicNumber": "public",
+    "AgentUsername": "agent",
+    "CustomerNumber": "customer",
+    "DefaultRoutingProfile": "routing",
+  }
+
+  mocker.patch("dotenv.dotenv_values", return_value=mock_parameters)
+  mocker.patch.object(Path, "read_text", return_value="template body")
+
+  mock_cloudformation_client = MockCloudformationClient(False)
+  patch_client(
+    mocker, cloudformation_client.CloudformationClient, mock_cloudformation_client
+  )
+  mock_connect_client = MockConnectClient("alias")
+  patch_client(mocker, connect_client.ConnectClient, mock_connect_client)
+
+  plans = plan()
+
+  assert [stack_plan.action for stack_plan in plans] == ["UPDATE"] * 3
+  assert mock_connect_client.calls == ["__init__", "get_phone_number_summaries"]
+
+  # A new stack means its dependents need to be deployed after it
+  mocker.patch.object(
+    mock_cloudformation_client,
+    "get_stack_summary",
+    side_effect=lambda stack_name: (
+      None if stack_name == "sicq-whisper-flow-stack" else {"StackName": stack_name}
+    ),
+  )
+
+  plans = plan()
+
+  assert [stack_plan.action for stack_plan in plans] == ["CREATE", "UPDATE", "UPDATE"]
+  assert plans[1].changed_parameters == ["Resources from sicq-whisper-flow-stack"]
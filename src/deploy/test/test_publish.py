@@ -0,0 +1,86 @@
+from pytest_mock import MockerFixture
+from typing import cast
+
+from deploy.publish import publish_flow, publish_flows
+from shared.test_helpers.helpers import (
+  MockCloudformationClient,
+  MockConnectClient,
+  patch_client,
+)
+from shared.clients import cloudformation_client, connect_client
+
+
+def test_publish_flow() -> None:
+  mock_client = MockConnectClient("alias")
+  client = cast(connect_client.ConnectClient, mock_client)
+
+  # Same structure, different formatting
+  assert not publish_flow(
+    client, "CallbackInbound", "flow arn", '{\n  "Message": "mock flow content"\n}'
+  )
+  assert publish_flow(client, "CallbackInbound", "flow arn", '{"Message": "changed"}')
+
+  assert mock_client.calls == [
+    "__init__",
+    "get_contact_flow",
+    "get_contact_flow",
+    "update_contact_flow_content",
+  ]
+
+
+def test_publish_flows(mocker: MockerFixture) -> None:
+  mock_parameters = {
+    "InstanceAlias": "alias",
+    "PrivateNumber": "private",
+    "PublicNumber": "public",
+    "AgentUsername": "agent",
+    "CustomerNumber": "customer",
+    "DefaultRoutingProfile": "routing",
+  }
+
+  mocker.patch("dotenv.dotenv_values", return_value=mock_parameters)
+
+  mock_cloudformation_client = MockCloudformationClient(False)
+  patch_client(
+    mocker, cloudformation_client.CloudformationClient, mock_cloudformation_client
+  )
+  mocker.patch.object(
+    mock_cloudformation_client,
+    "get_stack_resource_mapping",
+    return_value={
+      "CallbackInbound": "flow arn",
+      "CallbackOutbound": "flow arn",
+      "CallbackAgentWhisper": "flow arn",
+      "CallbackOutboundWhisper": "flow arn",
+      "CallbackQueue": "queue arn",
+    },
+  )
+  mock_update = mocker.patch.object(
+    mock_cloudformation_client, "update_stack_parameters"
+  )
+
+  mock_connect_client = MockConnectClient("alias")
+  patch_client(mocker, connect_client.ConnectClient, mock_connect_client)
+
+  assert publish_flows() == [
+    "CallbackAgentWhisper",
+    "CallbackOutboundWhisper",
+    "CallbackInbound",
+    "CallbackOutbound",
+  ]
+
+  assert mock_connect_client.calls.count("get_contact_flow") == 4
+  assert mock_connect_client.calls.count("update_contact_flow_content") == 4
+
+  # Each flow stack is reconciled with its own flows
+  assert [call.args[0] for call in mock_update.call_args_list] == [
+    "sicq-whisper-flow-stack",
+    "sicq-callback-flow-stack",
+  ]
+  # The updates continue in the background by default
+  assert [call.args[2] for call in mock_update.call_args_list] == [False, False]
+  assert [
+    parameter["ParameterKey"] for parameter in mock_update.call_args_list[1].args[1]
+  ] == ["CallbackInboundContent", "CallbackOutboundContent"]
+  assert '"{{' not in mock_update.call_args_list[1].args[1][1]["ParameterValue"]
+  assert "queue arn" in mock_update.call_args_list[1].args[1][1]["ParameterValue"]
@@ -1,31 +1,104 @@
+from pathlib import Path
 from pytest_mock import MockerFixture
 
 from deploy import deploy
 from deploy.setup import setup
-from shared.test_helpers.helpers import MockConnectClient, not_raises
-from shared.clients import connect_client
+from shared.test_helpers.fake_aws import FakeAws
+from shared.test_helpers.helpers import (
+  MockCloudformationClient,
+  MockConnectClient,
+  assert_call_budget,
+  not_raises,
+  patch_client,
+)
+from shared.clients import cloudformation_client, connect_client
 
+MOCK_PARAMETERS = {
+  "InstanceAlias": "alias",
+  "PrivateNumber": "private",
+  "PublicNumber": "public",
+  "AgentUsername": "agent",
+  "CustomerNumber": "customer",
+  "DefaultRoutingProfile": "routing",
+}
 
-def test_setup(mocker: MockerFixture) -> None:
-  mock_parameters = {
-    "InstanceAlias": "alias",
-    "PrivateNumber": "private",
-    "PublicNumber": "public",
-    "AgentUsername": "agent",
-    "CustomerNumber": "customer",
-    "DefaultRoutingProfile": "routing",
-  }
 
+def test_setup(mocker: MockerFixture) -> None:
   mock_client = MockConnectClient("alias")
 
-  mocker.patch("dotenv.dotenv_values", return_value=mock_parameters)
-  mocker.patch.object(deploy, "deploy", return_value=mock_parameters)
-  mocker.patch.object(connect_client.ConnectClient, "__new__", return_value=mock_client)
+  mocker.patch("dotenv.dotenv_values", return_value=MOCK_PARAMETERS)
+  mocker.patch.object(deploy, "deploy")
+  patch_client(mocker, connect_client.ConnectClient, mock_client)
+  mocker.patch.object(
+    mock_client,
+    "get_flow_summaries",
+    return_value=[{"Name": "CallbackInbound", "Arn": "flow arn"}],
+  )
 
   with not_raises():
     setup()
     assert mock_client.calls == [
       "__init__",
-      "assign_contact_flow_number",
-      "assign_user_to_routing_profile",
+      "get_phone_number_summaries",
+      "associate_phone_number_flow",
+      "get_user_summaries",
+      "get_routing_profile_summary",
+      "update_user_routing_profile",
     ]
+
+
+def test_setup_call_count(mocker: MockerFixture) -> None:
+  mocker.patch("dotenv.dotenv_values", return_value=MOCK_PARAMETERS)
+  mocker.patch.object(Path, "read_text", return_value="template body")
+
+  mock_cloudformation_client = MockCloudformationClient(False)
+  mock_new_cloudformation = patch_client(
+    mocker, cloudformation_client.CloudformationClient, mock_cloudformation_client
+  )
+  mock_mapping = mocker.patch.object(
+    mock_cloudformation_client,
+    "get_stack_resource_mapping",
+    return_value={"CallbackInbound": "flow arn"},
+  )
+
+  mock_connect_client = MockConnectClient("alias")
+  mock_new_connect = patch_client(
+    mocker, connect_client.ConnectClient, mock_connect_client
+  )
+
+  with not_raises():
+    setup()
+
+  # Each client is created once, and every Connect resource is resolved exactly once, including the new inbound flow which comes from the deployed stack
+  assert mock_new_cloudformation.call_count == 1
+  assert mock_new_connect.call_count == 1
+  assert mock_connect_client.calls == [
+    "__init__",
+    "get_phone_number_summaries",
+    "associate_phone_number_flow",
+    "get_user_summaries",
+    "get_routing_profile_summary",
+    "update_user_routing_profile",
+  ]
+  assert (
+    mock_cloudformation_client.calls == ["__init__"] + ["validate", "deploy_stack"] * 3
+  )
+  assert mock_mapping.call_count == 3
+
+
+def test_setup_call_budget(fake_instance: FakeAws) -> None:
+  setup()
+
+  # The deployed inbound flow is reused rather than listing the flows
+  assert_call_budget(
+    fake_instance,
+    "connect",
+    6,
+    {
+      "ListContactFlows": 0,
+      "ListPhoneNumbersV2": 1,
+      "ListUsers": 1,
+      "ListRoutingProfiles": 1,
+    },
+  )
+  assert_call_budget(fake_instance, "cloudformation", 18, {"ListStackResources": 3})
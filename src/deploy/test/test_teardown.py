@@ -1,30 +1,129 @@
 from pytest_mock import MockerFixture
+from typing import cast
 
-from deploy.teardown import teardown
-from shared.test_helpers.helpers import MockConnectClient, not_raises
-from shared.clients import connect_client
+from deploy.deploy import deploy
+from deploy.teardown import delete_stacks, get_dependents, teardown
+from shared.test_helpers.fake_aws import FakeAws
+from shared.test_helpers.helpers import (
+  MockCloudformationClient,
+  MockConnectClient,
+  assert_call_budget,
+  not_raises,
+  patch_client,
+)
+from shared.clients import cloudformation_client, connect_client
+from shared.utils import STACK_CONFIGS, StackConfig
 
+MOCK_PARAMETERS = {
+  "InstanceAlias": "alias",
+  "PrivateNumber": "private",
+  "PublicNumber": "public",
+  "AgentUsername": "agent",
+  "CustomerNumber": "customer",
+  "DefaultRoutingProfile": "routing",
+}
 
-def test_teardown(mocker: MockerFixture) -> None:
-  mock_parameters = {
-    "InstanceAlias": "alias",
-    "PrivateNumber": "private",
-    "PublicNumber": "public",
-    "AgentUsername": "agent",
-    "CustomerNumber": "customer",
-    "DefaultRoutingProfile": "routing",
-  }
 
+def test_teardown(mocker: MockerFixture) -> None:
   mock_client = MockConnectClient("alias")
 
-  mocker.patch("dotenv.dotenv_values", return_value=mock_parameters)
+  mocker.patch("dotenv.dotenv_values", return_value=MOCK_PARAMETERS)
 
-  mocker.patch.object(connect_client.ConnectClient, "__new__", return_value=mock_client)
+  patch_client(mocker, connect_client.ConnectClient, mock_client)
 
   with not_raises():
-    teardown()
+    assert teardown()
     assert mock_client.calls == [
       "__init__",
-      "unassign_contact_flow_number",
-      "assign_user_to_routing_profile",
+      "get_phone_number_summaries",
+      "disassociate_phone_number_flow",
+      "get_user_summaries",
+      "get_routing_profile_summary",
+      "update_user_routing_profile",
     ]
+
+
+def test_teardown_delete_stacks(mocker: MockerFixture) -> None:
+  mocker.patch("dotenv.dotenv_values", return_value=MOCK_PARAMETERS)
+  patch_client(mocker, connect_client.ConnectClient, MockConnectClient("alias"))
+  mock_cloudformation_client = MockCloudformationClient()
+  patch_client(
+    mocker, cloudformation_client.CloudformationClient, mock_cloudformation_client
+  )
+
+  assert teardown(delete=True)
+
+  # Dependent stacks are deleted first
+  assert mock_cloudformation_client.calls == [
+    "__init__",
+    "delete_stack sicq-callback-flow-stack",
+    "delete_stack sicq-main-stack",
+    "delete_stack sicq-whisper-flow-stack",
+  ]
+
+
+def test_get_dependents() -> None:
+  assert get_dependents(STACK_CONFIGS) == {
+    "sicq-whisper-flow-stack": ["sicq-main-stack", "sicq-callback-flow-stack"],
+    "sicq-main-stack": ["sicq-callback-flow-stack"],
+    "sicq-callback-flow-stack": [],
+  }
+
+
+def test_delete_stacks() -> None:
+  base = StackConfig("base", "template")
+  left = StackConfig("left", "template", dependencies=[base])
+  right = StackConfig("right", "template", dependencies=[base])
+  top = StackConfig("top", "template", dependencies=[left, right])
+
+  mock_client = MockCloudformationClient()
+
+  assert (
+    delete_stacks(
+      cast(cloudformation_client.CloudformationClient, mock_client),
+      [base, left, right, top],
+    )
+    == []
+  )
+
+  # The independent stacks are deleted between their dependents and dependencies
+  assert mock_client.calls[1] == "delete_stack top"
+  assert set(mock_client.calls[2:4]) == {"delete_stack left", "delete_stack right"}
+  assert mock_client.calls[4] == "delete_stack base"
+
+
+def test_delete_stacks_failure() -> None:
+  base = StackConfig("base", "template")
+  broken = StackConfig("broken", "template", dependencies=[base])
+  other = StackConfig("other", "template")
+
+  mock_client = MockCloudformationClient()
+
+  # Stacks referenced by a failed stack are kept
+  assert delete_stacks(
+    cast(cloudformation_client.CloudformationClient, mock_client),
+    [base, broken, other],
+  ) == ["base", "broken"]
+  assert mock_client.calls == ["__init__", "delete_stack other"]
+
+
+def test_teardown_call_budget(fake_instance: FakeAws) -> None:
+  deploy()
+  fake_instance.calls.clear()
+  fake_instance.service_calls.clear()
+
+  assert teardown(delete=True)
+
+  assert_call_budget(
+    fake_instance,
+    "connect",
+    6,
+    {"ListPhoneNumbersV2": 1, "ListUsers": 1, "ListRoutingProfiles": 1},
+  )
+  # Each stack is deleted once
+  assert_call_budget(
+    fake_instance,
+    "cloudformation",
+    4 * len(STACK_CONFIGS),
+    {"DeleteStack": len(STACK_CONFIGS)},
+  )
@@ -0,0 +1,122 @@
+import re
+
+ARN_REGEX = re.compile(r"arn:aws[\w-]*:[\w-]+:[\w-]*:\d*:[\w\-/:.]+")
+
+# A character that can be part of an ARN, so an ARN next to one is only part of a longer ARN
+ARN_CHARACTER_REGEX = re.compile(r"[\w\-/:.]")
+
+
+class ArnMatcher:
+  """An Aho-Corasick automaton that finds every occurrence of a set of ARNs in a string in a single pass."""
+
+  transitions: list[dict[str, int]]
+  failures: list[int]
+  outputs: list[list[str]]
+  prefixes: set[str]
+
+  def __init__(self, arns: list[str]) -> None:
+    """Constructor.
+
+    Args:
+        arns (list[str]): The ARNs to match
+    """
+    self.transitions = [{}]
+    self.failures = [0]
+    self.outputs = [[]]
+
+    # Build the trie
+    for arn in arns:
+      if not arn:
+        continue
+
+      state = 0
+      for char in arn:
+        if char not in self.transitions[state]:
+          self.transitions.append({})
+          self.failures.append(0)
+          self.outputs.append([])
+          self.transitions[state][char] = len(self.transitions) - 1
+        state = self.transitions[state][char]
+      self.outputs[state].append(arn)
+
+    # Link each state to its longest proper suffix in the trie, breadth first
+    queue = list(self.transitions[0].values())
+    for state in queue:
+      for char, next_state in self.transitions[state].items():
+        failure = self.failures[state]
+        while failure and char not in self.transitions[failure]:
+          failure = self.failures[failure]
+        self.failures[next_state] = self.transitions[failure].get(char, 0)
+        self.outputs[next_state] = (
+          self.outputs[next_state] + self.outputs[self.failures[next_state]]
+        )
+        queue.append(next_state)
+
+    # Strings can only match if they contain the start of an ARN, which is much quicker to check
+    self.prefixes = {arn[:4] for arn in arns if arn}
+
+  def find(self, text: str) -> list[tuple[int, str]]:
+    """Find the non-overlapping occurrences of the ARNs, preferring the leftmost and then longest match.
+
+    An occurrence must start and end at an ARN boundary, so an ARN isn't matched within a longer ARN it's a prefix or suffix of.
+
+    Args:
+        text (str): The string to search
+
+    Returns:
+        list[tuple[int, str]]: The start index and ARN of each occurrence
+    """
+    if not any(prefix in text for prefix in self.prefixes):
+      return []
+
+    matches: list[tuple[int, str]] = []
+
+    state = 0
+    for index, char in enumerate(text):
+      while state and char not in self.transitions[state]:
+        state = self.failures[state]
+      state = self.transitions[state].get(char, 0)
+
+      if self.outputs[state] and (
+        index + 1 < len(text) and ARN_CHARACTER_REGEX.match(text[index + 1])
+      ):
+        continue
+
+      for arn in self.outputs[state]:
+        start = index - len(arn) + 1
+        if start and ARN_CHARACTER_REGEX.match(text[start - 1]):
+          continue
+        matches.append((start, arn))
+
+    occurrences: list[tuple[int, str]] = []
+    end = 0
+    for start, arn in sorted(matches, key=lambda match: (match[0], -len(match[1]))):
+      if start >= end:
+        occurrences.append((start, arn))
+        end = start + len(arn)
+
+    return occurrences
+
+  def replace(self, text: str, replacements: dict[str, str]) -> tuple[str, list[str]]:
+    """Replace every occurrence of the ARNs in a string.
+
+    Args:
+        text (str): The string to search
+        replacements (dict[str, str]): The replacement for each ARN
+
+    Returns:
+        tuple[str, list[str]]: The updated string, and the ARNs that were replaced
+    """
+    occurrences = self.find(text)
+    if not occurrences:
+      return text, []
+
+    parts: list[str] = []
+    end = 0
+    for start, arn in occurrences:
+      parts.append(text[end:start])
+      parts.append(replacements[arn])
+      end = start + len(arn)
+    parts.append(text[end:])
+
+    return "".join(parts), [arn for _, arn in occurrences]
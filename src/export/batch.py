@@ -0,0 +1,215 @@
+import argparse
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+import hashlib
+from pathlib import Path
+import sys
+import time
+from typing import TypedDict
+
+from export.templatise import (
+  TEMPLATISER_VERSION,
+  TemplatiseResult,
+  templatise_content,
+  templatise_file,
+)
+from shared import json_backend
+from shared.logger import logger
+from shared.utils import (
+  INSTANCE_EXPORT_DIRECTORY,
+  INSTANCE_TEMPLATE_DIRECTORY,
+  create_logical_id,
+)
+
+MANIFEST_FILE_NAME = "templatise_manifest.json"
+
+
+class BatchManifestEntry(TypedDict):
+  """The manifest record of a templatised flow."""
+
+  InputHash: str
+  Version: int
+  ArnMap: dict[str, str]
+
+
+def templatise_path(
+  inpath: Path, outpath: Path, stream: bool = False
+) -> TemplatiseResult:
+  """Templatise an exported flow file.
+
+  Args:
+      inpath (Path): The exported flow file
+      outpath (Path): The file to write the templatised flow to
+      stream (bool, optional): Whether to stream the file rather than loading it. Defaults to False.
+
+  Returns:
+      TemplatiseResult: The ARN map and a report of the replacements
+  """
+  if stream:
+    return templatise_file(inpath, outpath)
+
+  with open(inpath) as infile:
+    content = json_backend.loads(infile.read())
+
+  result = templatise_content(content)
+
+  with open(outpath, "w") as outfile:
+    outfile.write(json_backend.dumps(content, indent=True))
+
+  return result
+
+
+def find_collisions(
+  arn_maps: dict[str, dict[str, str]],
+) -> dict[str, dict[str, list[str]]]:
+  """Find different resources that would be given the same logical ID in templates.
+
+  Args:
+      arn_maps (dict[str, dict[str, str]]): The map of ARNs to common names found in each flow, by flow
+
+  Returns:
+      dict[str, dict[str, list[str]]]: The flows that reference each of the colliding ARNs, by logical ID
+  """
+  logical_ids: dict[str, dict[str, list[str]]] = {}
+
+  for flow, arn_map in arn_maps.items():
+    for arn, name in arn_map.items():
+      logical_ids.setdefault(create_logical_id(name), {}).setdefault(arn, []).append(
+        flow
+      )
+
+  return {logical_id: arns for logical_id, arns in logical_ids.items() if len(arns) > 1}
+
+
+def templatise_batch(
+  input_directory: Path,
+  output_directory: Path,
+  max_workers: int | None = None,
+  stream: bool = False,
+) -> tuple[dict[str, dict[str, list[str]]], list[str]]:
+  """Templatise every exported flow in a directory across a process pool, skipping flows that haven't changed since the last batch.
+
+  A flow that fails to templatise is logged and left out of the manifest, so it's tried again in the next batch, while the other flows carry on.
+
+  Args:
+      input_directory (Path): The directory of exported flow files
+      output_directory (Path): The directory to write the templatised flows to
+      max_workers (int | None, optional): The maximum number of processes. Defaults to None, which uses one per CPU.
+      stream (bool, optional): Whether to stream the files rather than loading them. Defaults to False.
+
+  Returns:
+      tuple[dict[str, dict[str, list[str]]], list[str]]: The flows that reference each of the colliding ARNs, by logical ID, and the flows that failed to templatise
+  """
+  output_directory.mkdir(exist_ok=True, parents=True)
+
+  manifest_path = output_directory.joinpath(MANIFEST_FILE_NAME)
+  manifest: dict[str, BatchManifestEntry] = {}
+  if manifest_path.exists():
+    with open(manifest_path) as infile:
+      manifest = json_backend.loads(infile.read())
+
+  start = time.perf_counter()
+
+  # Work out which flows have changed since they were last templatised
+  pending: dict[str, str] = {}
+  updated_manifest: dict[str, BatchManifestEntry] = {}
+
+  for inpath in sorted(input_directory.glob("*.json")):
+    input_hash = hashlib.sha256(inpath.read_bytes()).hexdigest()
+    entry = manifest.get(inpath.name)
+
+    if (
+      entry
+      and entry["InputHash"] == input_hash
+      and entry["Version"] == TEMPLATISER_VERSION
+      and output_directory.joinpath(inpath.name).exists()
+    ):
+      updated_manifest[inpath.name] = entry
+    else:
+      pending[inpath.name] = input_hash
+
+  logger.info(
+    f"Templatising {len(pending)} flows, skipping {len(updated_manifest)} unchanged"
+  )
+
+  failed: list[str] = []
+
+  try:
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+      futures: dict[Future[TemplatiseResult], str] = {
+        executor.submit(
+          templatise_path,
+          input_directory.joinpath(name),
+          output_directory.joinpath(name),
+          stream,
+        ): name
+        for name in pending
+      }
+
+      for future in as_completed(futures):
+        name = futures[future]
+        try:
+          result = future.result()
+        except Exception as ex:
+          logger.error(f"Failed to templatise {name}: {ex}")
+          failed.append(name)
+          continue
+
+        result.log(name)
+        updated_manifest[name] = {
+          "InputHash": pending[name],
+          "Version": TEMPLATISER_VERSION,
+          "ArnMap": result.arn_map,
+        }
+  finally:
+    # Record the flows that finished even if the batch is interrupted, so they're skipped next time
+    with open(manifest_path, "w") as outfile:
+      outfile.write(json_backend.dumps(updated_manifest, indent=True, sort_keys=True))
+
+  # Check the combined ARN maps, including the skipped flows
+  collisions = find_collisions(
+    {name: entry["ArnMap"] for name, entry in updated_manifest.items()}
+  )
+  for logical_id, arns in collisions.items():
+    logger.error(
+      f"Different resources would share the logical ID {logical_id}: "
+      + "; ".join(f"{arn} in {', '.join(flows)}" for arn, flows in arns.items())
+    )
+
+  logger.info(
+    f"Batch templatise complete in {time.perf_counter() - start:.1f}s, {len(collisions)} logical ID collisions, {len(failed)} failed"
+  )
+
+  return collisions, sorted(failed)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+    description="Templatise a directory of exported flows in parallel"
+  )
+  parser.add_argument(
+    "input_directory",
+    nargs="?",
+    type=Path,
+    default=INSTANCE_EXPORT_DIRECTORY.joinpath("flows"),
+    help="The directory of exported flows. Defaults to the flows exported by export --all",
+  )
+  parser.add_argument(
+    "output_directory",
+    nargs="?",
+    type=Path,
+    default=INSTANCE_TEMPLATE_DIRECTORY,
+    help="The directory to write the templatised flows to",
+  )
+  parser.add_argument("--max-workers", type=int, help="The maximum number of processes")
+  parser.add_argument(
+    "--stream",
+    action="store_true",
+    help="Stream each file rather than loading it, for very large flows",
+  )
+  args = parser.parse_args()
+
+  collisions, failed = templatise_batch(
+    args.input_directory, args.output_directory, args.max_workers, args.stream
+  )
+  if collisions or failed:
+    sys.exit(1)
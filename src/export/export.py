@@ -1,55 +1,550 @@
-import json
+import argparse
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+import hashlib
+from mypy_boto3_connect.type_defs import (
+  ContactFlowModuleSummaryTypeDef,
+  ContactFlowSummaryTypeDef,
+)
+from pathlib import Path
+import re
+import sys
+import threading
+import time
+from typing import Any, Callable, Mapping, TypedDict
 
+from export.templatise import save_templatised_flow
+from shared import json_backend
 from shared.clients.connect_client import ConnectClient
 from shared.logger import logger
-from shared.utils import FLOW_EXPORT_DIRECTORY, FLOW_NAMES, read_parameters
+from shared.metrics import report_metrics
+from shared.profiler import profiled
+from shared.rate_limiter import RateLimiter
+from shared.version_store import FLOW, MODULE, VersionStore
+from shared.utils import (
+  FLOW_EXPORT_DIRECTORY,
+  FLOW_NAMES,
+  INSTANCE_EXPORT_DIRECTORY,
+  VERSION_STORE_DIRECTORY,
+  Parameters,
+  read_parameters,
+)
 
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_RATE = 5.0
+PROGRESS_INTERVAL = 50
+MANIFEST_FILE_NAME = "manifest.json"
 
-def export_flow(connect_client: ConnectClient, flow_name: str, flow_arn: str) -> None:
+# Export outcomes
+SKIPPED = "SKIPPED"
+UNCHANGED = "UNCHANGED"
+WRITTEN = "WRITTEN"
+
+UNSAFE_FILE_NAME_REGEX = re.compile(r"[^\w\-. ]")
+
+
+class ManifestEntry(TypedDict):
+  """The manifest record of an exported flow or module."""
+
+  Name: str
+  File: str
+  LastModified: str | None
+  ContentHash: str
+
+
+class ExportManifest:
+  """A record of exported flows and modules, so that unchanged ones can be skipped when exporting again."""
+
+  path: Path
+  entries: dict[str, ManifestEntry]
+  lock: threading.Lock
+
+  def __init__(self, path: Path) -> None:
+    """Constructor.
+
+    Args:
+        path (Path): The manifest file, which is read if it already exists
+    """
+    self.path = path
+    self.entries = {}
+    self.lock = threading.Lock()
+
+    if path.exists():
+      with open(path) as infile:
+        self.entries = json_backend.loads(infile.read())
+
+  def get(self, arn: str) -> ManifestEntry | None:
+    """Retrieve the record of an exported resource.
+
+    Args:
+        arn (str): The ARN of the flow or module
+
+    Returns:
+        ManifestEntry | None: The record, or None if it hasn't been exported before
+    """
+    return self.entries.get(arn)
+
+  def update(self, arn: str, entry: ManifestEntry) -> None:
+    """Record an exported resource.
+
+    Args:
+        arn (str): The ARN of the flow or module
+        entry (ManifestEntry): The record
+    """
+    with self.lock:
+      self.entries[arn] = entry
+
+  def save(self) -> None:
+    """Write the manifest file."""
+    with open(self.path, "w") as outfile:
+      outfile.write(json_backend.dumps(self.entries, indent=True, sort_keys=True))
+
+
+def create_file_name(name: str) -> str:
+  """Create a safe file name for an exported resource, as Connect allows characters in names that aren't valid in paths.
+
+  Args:
+      name (str): The name of the flow or module
+
+  Returns:
+      str: The file name
+  """
+  return UNSAFE_FILE_NAME_REGEX.sub("_", name) + ".json"
+
+
+def create_unique_file_name(summary: Mapping[str, Any], used: set[str]) -> str:
+  """Create a safe file name for an exported resource that no other resource in the same directory has.
+
+  Different names can have the same safe file name (e.g. "A/B" and "A:B"), in which case the later one has a short ID suffix so neither overwrites the other.  Names are compared case insensitively, as some file systems are.
+
+  Args:
+      summary (Mapping[str, Any]): The summary of the resource from its listing
+      used (set[str]): The lowercase file names already taken in the directory, which is updated
+
+  Returns:
+      str: The file name
+  """
+  file_name = create_file_name(summary["Name"])
+
+  if file_name.lower() in used:
+    resource_id = summary.get("Id") or summary["Arn"].rsplit("/", 1)[-1]
+    unique_file_name = create_file_name(f"{summary['Name']}_{resource_id[:8]}")
+    if unique_file_name.lower() in used:
+      unique_file_name = create_file_name(f"{summary['Name']}_{resource_id}")
+
+    logger.warning(
+      f"{summary['Name']} has the same file name as another resource, {file_name}, so it's exported to {unique_file_name}"
+    )
+    file_name = unique_file_name
+
+  used.add(file_name.lower())
+  return file_name
+
+
+def get_last_modified(resource: Mapping[str, Any]) -> str | None:
+  """Get the last modified time of a flow or module, if the response includes it.
+
+  Args:
+      resource (Mapping[str, Any]): The summary or description of the resource
+
+  Returns:
+      str | None: The last modified time in ISO format, or None if it isn't known
+  """
+  last_modified = resource.get("LastModifiedTime")
+  return last_modified.isoformat() if last_modified else None
+
+
+def export_resource(
+  fetch: Callable[[str], Mapping[str, Any]],
+  manifest: ExportManifest,
+  outpath: Path,
+  summary: Mapping[str, Any],
+  rate_limiter: RateLimiter | None = None,
+  version_store: VersionStore | None = None,
+  resource_type: str = FLOW,
+) -> str:
+  """Export a flow or module's content to a file, unless the manifest shows it's unchanged.
+
+  Args:
+      fetch (Callable[[str], Mapping[str, Any]]): Retrieves the details of the resource from its ARN
+      manifest (ExportManifest): The record of previously exported resources
+      outpath (Path): The file to write
+      summary (Mapping[str, Any]): The summary of the resource from its listing
+      rate_limiter (RateLimiter | None, optional): Limits the rate of requests shared by all the workers. Defaults to None.
+      version_store (VersionStore | None, optional): Records each fetched version. Defaults to None.
+      resource_type (str, optional): The type of resource in the version store, FLOW or MODULE. Defaults to FLOW.
+
+  Returns:
+      str: SKIPPED if it wasn't fetched, UNCHANGED if it was fetched but not written, otherwise WRITTEN
+  """
+  entry = manifest.get(summary["Arn"])
+  last_modified = get_last_modified(summary)
+
+  # The Connect listings don't say when a flow or module was last modified, so in practice every resource is fetched and the manifest only avoids rewriting unchanged files
+  if (
+    entry
+    and last_modified
+    and entry["LastModified"] == last_modified
+    and outpath.exists()
+  ):
+    return SKIPPED
+
+  if rate_limiter:
+    rate_limiter.wait()
+  resource = fetch(summary["Arn"])
+
+  # Loading and dumping allows us to format the file for better readability
+  parsed_content = json_backend.loads(resource["Content"])
+  if version_store:
+    version_store.put(
+      summary["Name"], parsed_content, "export", resource_type=resource_type
+    )
+
+  content = json_backend.dumps(parsed_content, indent=True)
+  content_hash = hashlib.sha256(content.encode()).hexdigest()
+
+  outcome = UNCHANGED
+  if not (entry and entry["ContentHash"] == content_hash and outpath.exists()):
+    with open(outpath, "w") as outfile:
+      outfile.write(content)
+    outcome = WRITTEN
+
+  manifest.update(
+    summary["Arn"],
+    {
+      "Name": summary["Name"],
+      "File": outpath.name,
+      "LastModified": last_modified or get_last_modified(resource),
+      "ContentHash": content_hash,
+    },
+  )
+
+  return outcome
+
+
+def format_outcomes(outcomes: Counter[str]) -> str:
+  """Summarise the outcomes of an export.
+
+  Args:
+      outcomes (Counter[str]): The number of resources with each outcome
+
+  Returns:
+      str: The summary
+  """
+  return (
+    f"{outcomes[WRITTEN] + outcomes[UNCHANGED]} fetched, "
+    + f"{outcomes[WRITTEN]} written, "
+    + f"{outcomes[UNCHANGED]} unchanged, "
+    + f"{outcomes[SKIPPED]} skipped"
+  )
+
+
+def export_flow(
+  connect_client: ConnectClient,
+  manifest: ExportManifest,
+  flow_summary: ContactFlowSummaryTypeDef,
+  directory: Path = FLOW_EXPORT_DIRECTORY,
+  rate_limiter: RateLimiter | None = None,
+  version_store: VersionStore | None = None,
+  file_name: str | None = None,
+) -> str:
   """Exports a flow's content to a file.
 
   Args:
       connect_client (ConnectClient): The connect client
-      flow_name (str): The name of the flow to export
-      flow_arn (str): The ARN of the flow to export
+      manifest (ExportManifest): The record of previously exported resources
+      flow_summary (ContactFlowSummaryTypeDef): The summary of the flow to export
+      directory (Path, optional): The directory to export to. Defaults to FLOW_EXPORT_DIRECTORY.
+      rate_limiter (RateLimiter | None, optional): Limits the rate of requests shared by all the workers. Defaults to None.
+      version_store (VersionStore | None, optional): Records each fetched version. Defaults to None.
+      file_name (str | None, optional): The file to export to in the directory. Defaults to None, which creates it from the name.
+
+  Returns:
+      str: The outcome of the export
   """
-  logger.info(f"Exporting flow {flow_name}...")
+  return export_resource(
+    connect_client.get_contact_flow,
+    manifest,
+    directory.joinpath(file_name or create_file_name(flow_summary["Name"])),
+    flow_summary,
+    rate_limiter,
+    version_store,
+  )
+
 
-  # Retrieve the flow
-  flow = connect_client.get_contact_flow(flow_arn)
+def export_flow_module(
+  connect_client: ConnectClient,
+  manifest: ExportManifest,
+  module_summary: ContactFlowModuleSummaryTypeDef,
+  directory: Path,
+  rate_limiter: RateLimiter | None = None,
+  version_store: VersionStore | None = None,
+  file_name: str | None = None,
+) -> str:
+  """Exports a flow module's content to a file.
 
-  # Separate out the content and save it to a file
-  content = flow.pop("Content")
+  Args:
+      connect_client (ConnectClient): The connect client
+      manifest (ExportManifest): The record of previously exported resources
+      module_summary (ContactFlowModuleSummaryTypeDef): The summary of the module to export
+      directory (Path): The directory to export to
+      rate_limiter (RateLimiter | None, optional): Limits the rate of requests shared by all the workers. Defaults to None.
+      version_store (VersionStore | None, optional): Records each fetched version. Defaults to None.
+      file_name (str | None, optional): The file to export to in the directory. Defaults to None, which creates it from the name.
 
-  outpath = FLOW_EXPORT_DIRECTORY.joinpath(f"{flow_name}.json")
-  with open(outpath, "w") as outfile:
-    # Loading and dumping allows us to format the file for better readability
-    json.dump(json.loads(content), outfile, indent=2)
+  Returns:
+      str: The outcome of the export
+  """
+  return export_resource(
+    connect_client.get_contact_flow_module,
+    manifest,
+    directory.joinpath(file_name or create_file_name(module_summary["Name"])),
+    module_summary,
+    rate_limiter,
+    version_store,
+    MODULE,
+  )
 
-  logger.info("Flow export complete")
 
+def export(version_store: VersionStore | None = None) -> None:
+  """Retrieve contact flow details and export all of them to files.
 
-def export() -> None:
-  """Retrieve contact flow details and export all of them to files."""
+  Args:
+      version_store (VersionStore | None, optional): Records each exported version. Defaults to None.
+  """
   parameters = read_parameters()
 
   # Create the target directories
   FLOW_EXPORT_DIRECTORY.mkdir(exist_ok=True, parents=True)
 
-  connect_client = ConnectClient(parameters["InstanceAlias"])
-
-  # Map the ids
-  flow_summary_list = connect_client.get_flow_summaries(list(FLOW_NAMES.values()))
-  flow_arns: dict[str, str] = {}
-  for flow_summary in flow_summary_list:
-    flow_arns[flow_summary["Name"]] = flow_summary["Arn"]
+  connect_client = ConnectClient(parameters["InstanceAlias"], parameters["Region"])
+  manifest = ExportManifest(FLOW_EXPORT_DIRECTORY.joinpath(MANIFEST_FILE_NAME))
 
   # Export each flow
-  for flow_name in FLOW_NAMES.values():
-    export_flow(connect_client, flow_name, flow_arns[flow_name])
+  outcomes: Counter[str] = Counter()
+  for flow_summary in connect_client.get_flow_summaries(list(FLOW_NAMES.values())):
+    logger.info(f"Exporting flow {flow_summary['Name']}...")
+    outcomes[
+      export_flow(
+        connect_client,
+        manifest,
+        flow_summary,
+        FLOW_EXPORT_DIRECTORY,
+        version_store=version_store,
+      )
+    ] += 1
+
+  manifest.save()
+
+  logger.info(f"Export completed successfully: {format_outcomes(outcomes)}")
+
+
+def export_templatised(
+  parameters: Parameters | None = None,
+  max_workers: int = DEFAULT_MAX_WORKERS,
+  keep_exports: bool = False,
+  version_store: VersionStore | None = None,
+) -> None:
+  """Export the contact flows and templatise them in memory, without reading back intermediate files.
+
+  The flows are fetched concurrently, and each one is templatised as soon as it arrives while the others are still being fetched.
+
+  Args:
+      parameters (Parameters | None, optional): The system parameters. Defaults to None, which reads them from the .env file.
+      max_workers (int, optional): The maximum number of concurrent requests. Defaults to DEFAULT_MAX_WORKERS.
+      keep_exports (bool, optional): Whether to also write the exported flows before they're templatised. Defaults to False.
+      version_store (VersionStore | None, optional): Records each exported version. Defaults to None.
+  """
+  if parameters is None:
+    parameters = read_parameters()
+
+  if keep_exports:
+    FLOW_EXPORT_DIRECTORY.mkdir(exist_ok=True, parents=True)
+
+  connect_client = ConnectClient(parameters["InstanceAlias"], parameters["Region"])
+  flow_summaries = connect_client.get_flow_summaries(list(FLOW_NAMES.values()))
+
+  def fetch_content(flow_arn: str) -> Any:
+    return json_backend.loads(connect_client.get_contact_flow(flow_arn)["Content"])
+
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    futures = {
+      executor.submit(fetch_content, flow_summary["Arn"]): flow_summary["Name"]
+      for flow_summary in flow_summaries
+    }
+
+    for future in as_completed(futures):
+      flow_name = futures[future]
+      content = future.result()
+      logger.info(f"Exported flow {flow_name}, templatising...")
+
+      # Record the export first, as templatising updates the content in place
+      if version_store:
+        version_store.put(flow_name, content, "export")
 
-  logger.info("Export completed successfully")
+      if keep_exports:
+        with open(FLOW_EXPORT_DIRECTORY.joinpath(f"{flow_name}.json"), "w") as outfile:
+          outfile.write(json_backend.dumps(content, indent=True))
+
+      save_templatised_flow(flow_name, content)
+
+  logger.info("Export and templatise completed successfully")
+
+
+def export_all(
+  parameters: Parameters | None = None,
+  max_workers: int = DEFAULT_MAX_WORKERS,
+  rate: float = DEFAULT_RATE,
+  version_store: VersionStore | None = None,
+) -> list[str]:
+  """Export every contact flow and flow module in the instance to files.
+
+  Resources are fetched concurrently as the listings are paged through, and each file is written as soon as its content arrives.
+
+  Args:
+      parameters (Parameters | None, optional): The system parameters. Defaults to None, which reads them from the .env file.
+      max_workers (int, optional): The maximum number of concurrent requests. Defaults to DEFAULT_MAX_WORKERS.
+      rate (float, optional): The maximum number of requests per second. Defaults to DEFAULT_RATE.
+      version_store (VersionStore | None, optional): Records each exported version. Defaults to None.
+
+  Returns:
+      list[str]: The names of the flows and modules that failed to export
+  """
+  if parameters is None:
+    parameters = read_parameters()
+
+  flow_directory = INSTANCE_EXPORT_DIRECTORY.joinpath("flows")
+  module_directory = INSTANCE_EXPORT_DIRECTORY.joinpath("modules")
+  flow_directory.mkdir(exist_ok=True, parents=True)
+  module_directory.mkdir(exist_ok=True, parents=True)
+
+  connect_client = ConnectClient(parameters["InstanceAlias"], parameters["Region"])
+  manifest = ExportManifest(INSTANCE_EXPORT_DIRECTORY.joinpath(MANIFEST_FILE_NAME))
+  rate_limiter = RateLimiter(rate)
+
+  logger.info(f"Exporting all flows and modules from {parameters['InstanceAlias']}")
+  start = time.perf_counter()
+
+  # The file names are chosen before the work is submitted, so no two workers write the same file
+  flow_file_names: set[str] = set()
+  module_file_names: set[str] = set()
+
+  with ThreadPoolExecutor(max_workers=max_workers) as executor:
+    futures: dict[Future[str], str] = {}
+
+    for flow in connect_client.list_contact_flows():
+      future = executor.submit(
+        export_flow,
+        connect_client,
+        manifest,
+        flow,
+        flow_directory,
+        rate_limiter,
+        version_store,
+        create_unique_file_name(flow, flow_file_names),
+      )
+      futures[future] = f"flow {flow['Name']}"
+
+    for module in connect_client.list_contact_flow_modules():
+      future = executor.submit(
+        export_flow_module,
+        connect_client,
+        manifest,
+        module,
+        module_directory,
+        rate_limiter,
+        version_store,
+        create_unique_file_name(module, module_file_names),
+      )
+      futures[future] = f"module {module['Name']}"
+
+    outcomes: Counter[str] = Counter()
+    failed: list[str] = []
+
+    for future in as_completed(futures):
+      try:
+        outcomes[future.result()] += 1
+      except Exception as ex:
+        logger.error(f"Failed to export {futures[future]}: {ex}")
+        failed.append(futures[future])
+
+      if (outcomes.total() + len(failed)) % PROGRESS_INTERVAL == 0:
+        logger.info(f"Exported {outcomes.total() + len(failed)} of {len(futures)}")
+
+  manifest.save()
+
+  # Skipped resources aren't fetched, so they're left out of the throughput
+  duration = time.perf_counter() - start
+  fetched = outcomes[WRITTEN] + outcomes[UNCHANGED]
+  logger.info(
+    f"Exported {outcomes.total()} flows and modules in {duration:.1f}s, "
+    + f"{fetched / duration:.1f} fetched per second: {format_outcomes(outcomes)}, {len(failed)} failed"
+  )
+
+  return failed
 
 
 if __name__ == "__main__":
-  export()
+  parser = argparse.ArgumentParser(description="Export contact flows to files")
+  mode = parser.add_mutually_exclusive_group()
+  mode.add_argument(
+    "--all",
+    action="store_true",
+    help="Export every contact flow and flow module in the instance. Every run describes every flow and module, as the listings don't say which have changed, but only rewrites the files that have",
+  )
+  mode.add_argument(
+    "--templatise",
+    action="store_true",
+    help="Templatise the flows in memory as they're exported, replacing the separate templatise script",
+  )
+  parser.add_argument(
+    "--keep-exports",
+    action="store_true",
+    help="Also write the exported flows when templatising them",
+  )
+  parser.add_argument(
+    "--max-workers",
+    type=int,
+    default=DEFAULT_MAX_WORKERS,
+    help="The maximum number of concurrent requests when exporting everything or templatising",
+  )
+  parser.add_argument(
+    "--rate",
+    type=float,
+    default=DEFAULT_RATE,
+    help="The maximum number of requests per second when exporting everything",
+  )
+  parser.add_argument(
+    "--no-versions",
+    action="store_true",
+    help="Don't record the exported flows in the version store",
+  )
+  parser.add_argument(
+    "--profile",
+    action="store_true",
+    help="Profile the run, writing a report to output/profiles",
+  )
+  args = parser.parse_args()
+
+  version_store = None if args.no_versions else VersionStore(VERSION_STORE_DIRECTORY)
+
+  failed: list[str] = []
+
+  with profiled("export", args.profile):
+    if args.templatise:
+      export_templatised(
+        max_workers=args.max_workers,
+        keep_exports=args.keep_exports,
+        version_store=version_store,
+      )
+    elif not args.all:
+      export(version_store)
+    else:
+      failed = export_all(
+        max_workers=args.max_workers, rate=args.rate, version_store=version_store
+      )
+
+  report_metrics()
+
+  if failed:
+    sys.exit(1)
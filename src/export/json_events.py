@@ -0,0 +1,182 @@
+import json
+from json.decoder import scanstring  # type: ignore[attr-defined]
+from json.encoder import encode_basestring_ascii
+import re
+from typing import Any, Callable, Iterator, TextIO
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# A delimiter, string or scalar, after any whitespace
+TOKEN_REGEX = re.compile(
+  r'[ \t\n\r]*(?:([{}\[\]:,])|"([^"\\]*(?:\\.[^"\\]*)*)"|([^ \t\n\r{}\[\]:,"]+))',
+  re.DOTALL,
+)
+NUMBER_REGEX = re.compile(r"-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?")
+LITERALS = {
+  "true": ("boolean", True),
+  "false": ("boolean", False),
+  "null": ("null", None),
+}
+
+
+def parse_scalar(token: str) -> tuple[str, Any]:
+  """Parse a number or literal token.
+
+  Args:
+      token (str): The token
+
+  Raises:
+      ValueError: The token isn't valid JSON
+
+  Returns:
+      tuple[str, Any]: The event type ("number", "boolean" or "null") and value
+  """
+  if token in LITERALS:
+    return LITERALS[token]
+
+  match = NUMBER_REGEX.fullmatch(token)
+  if not match:
+    raise ValueError(f"Invalid JSON token {token!r}")
+
+  return "number", float(token) if match.group(1) or match.group(2) else int(token)
+
+
+def iter_tokens(
+  infile: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[tuple[str, Any]]:
+  """Split a JSON document into tokens, reading it a chunk at a time.
+
+  Args:
+      infile (TextIO): The JSON document
+      chunk_size (int, optional): The number of characters to read at a time. Defaults to DEFAULT_CHUNK_SIZE.
+
+  Yields:
+      Iterator[tuple[str, Any]]: Each delimiter with no value, or "string", "number", "boolean" or "null" with the parsed value
+  """
+  buffer = ""
+  position = 0
+  eof = False
+
+  while True:
+    match = TOKEN_REGEX.match(buffer, position)
+
+    # Tokens may continue into the next chunk, so only take one that ends before the buffer does
+    if match is None or (match.end() == len(buffer) and not eof):
+      if eof:
+        if buffer[position:].strip():
+          raise ValueError(f"Invalid JSON at {buffer[position : position + 20]!r}")
+        return
+
+      chunk = infile.read(chunk_size)
+      buffer = buffer[position:] + chunk
+      position = 0
+      eof = not chunk
+      continue
+
+    position = match.end()
+    delimiter, string, scalar = match.groups()
+
+    if delimiter:
+      yield delimiter, None
+    elif string is not None:
+      # Only strings with escape sequences need decoding
+      yield "string", scanstring(string + '"', 0)[0] if "\\" in string else string
+    else:
+      yield parse_scalar(scalar)
+
+
+def iter_events(
+  infile: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[tuple[str, Any]]:
+  """Parse a JSON document into a stream of events, without holding the whole document in memory.
+
+  The document is assumed to be well-formed, e.g. an exported flow.
+
+  Args:
+      infile (TextIO): The JSON document
+      chunk_size (int, optional): The number of characters to read at a time. Defaults to DEFAULT_CHUNK_SIZE.
+
+  Yields:
+      Iterator[tuple[str, Any]]: Each event, one of "start_map", "map_key", "end_map", "start_array", "end_array", "string", "number", "boolean" or "null", with its value
+  """
+  # Whether each open container is an object
+  containers: list[bool] = []
+  expect_key = False
+
+  for token, value in iter_tokens(infile, chunk_size):
+    if token == "{":
+      containers.append(True)
+      expect_key = True
+      yield "start_map", None
+    elif token == "}":
+      containers.pop()
+      expect_key = False
+      yield "end_map", None
+    elif token == "[":
+      containers.append(False)
+      expect_key = False
+      yield "start_array", None
+    elif token == "]":
+      containers.pop()
+      yield "end_array", None
+    elif token == ",":
+      expect_key = bool(containers) and containers[-1]
+    elif token == ":":
+      continue
+    elif expect_key:
+      expect_key = False
+      yield "map_key", value
+    else:
+      yield token, value
+
+
+def write_events(
+  events: Iterator[tuple[str, Any]],
+  write: Callable[[str], object],
+  transform_string: Callable[[str], str] = lambda value: value,
+) -> None:
+  """Write a stream of events as JSON, formatted identically to json.dumps with an indent of 2.
+
+  Args:
+      events (Iterator[tuple[str, Any]]): The events
+      write (Callable[[str], object]): Writes a piece of the output
+      transform_string (Callable[[str], str], optional): Updates each string value, but not object keys. Defaults to leaving them unchanged.
+  """
+  # Whether each open container is an object, and the number of items in it so far
+  containers: list[list[Any]] = []
+
+  # The separator before an item at each depth, for the first item and the rest
+  first_separators = ["\n"]
+  separators = [",\n"]
+
+  def start_item() -> None:
+    container = containers[-1]
+    depth = len(containers)
+    if depth == len(separators):
+      first_separators.append("\n" + "  " * depth)
+      separators.append(",\n" + "  " * depth)
+    write(separators[depth] if container[1] else first_separators[depth])
+    container[1] += 1
+
+  for event, value in events:
+    if event == "map_key":
+      start_item()
+      write(encode_basestring_ascii(value) + ": ")
+      continue
+
+    # Values in objects follow their key, values in arrays need their own line
+    if containers and not containers[-1][0] and event[:4] != "end_":
+      start_item()
+
+    if event == "string":
+      write(encode_basestring_ascii(transform_string(value)))
+    elif event == "start_map" or event == "start_array":
+      write("{" if event == "start_map" else "[")
+      containers.append([event == "start_map", 0])
+    elif event == "end_map" or event == "end_array":
+      _, count = containers.pop()
+      if count:
+        write("\n" + "  " * len(containers))
+      write("}" if event == "end_map" else "]")
+    else:
+      write(json.dumps(value))
@@ -1,7 +1,12 @@
-import json
-from typing import Any, Callable
+import argparse
+from pathlib import Path
+from typing import Any, Iterable, Iterator
 
+from export.arn_matcher import ARN_REGEX, ArnMatcher
+from export.json_events import DEFAULT_CHUNK_SIZE, iter_events, write_events
+from shared import json_backend
 from shared.logger import logger
+from shared.profiler import profiled
 from shared.utils import (
   FLOW_CONTENT_DIRECTORY,
   FLOW_NAMES,
@@ -9,114 +14,295 @@ from shared.utils import (
   create_logical_id,
 )
 
+# Increment when the templatised output changes, so batch templatising redoes every flow
+TEMPLATISER_VERSION = 2
 
-# Recursive walker
-def walk_content(
-  parent: Any,
-  node: Any,
-  arn_map: dict[str, str],
-  operation: Callable[[Any, Any, dict[str, str]], bool],
-) -> None:
-  """Recursively calls a provided operation on each list/dict level of the contact flow content.
+
+def create_template_value(name: str) -> str:
+  """Create the jinja2 templated value that references a resource by name.
+
+  Args:
+      name (str): The common name of the resource
+
+  Returns:
+      str: The templated value
+  """
+  return "{{" + f"resources['{create_logical_id(name)}']" + "}}"
+
+
+class TemplatiseResult:
+  """The outcome of templatising contact flow content."""
+
+  arn_map: dict[str, str]
+  replacements: dict[str, int]
+  unresolved: list[str]
+
+  def __init__(
+    self,
+    arn_map: dict[str, str],
+    replacements: dict[str, int],
+    unresolved: list[str],
+  ) -> None:
+    """Constructor.
+
+    Args:
+        arn_map (dict[str, str]): A map of resource ARNs to common names
+        replacements (dict[str, int]): The number of occurrences of each ARN that were replaced
+        unresolved (list[str]): ARNs left in the content because they have no common name
+    """
+    self.arn_map = arn_map
+    self.replacements = replacements
+    self.unresolved = unresolved
+
+  def log(self, flow_name: str) -> None:
+    """Log a report of the replacements.
+
+    Args:
+        flow_name (str): The name of the templatised flow
+    """
+    for arn, count in self.replacements.items():
+      logger.info(
+        f"Replaced {count} occurrences of {create_template_value(self.arn_map[arn])} in {flow_name}"
+      )
+
+    for arn in self.unresolved:
+      logger.warning(f"Flow {flow_name} has a hardcoded ARN with no known name: {arn}")
+
+
+class ArnReplacer:
+  """Replaces known ARNs wherever they occur in string values, keeping count of the replacements."""
+
+  arn_map: dict[str, str]
+  templates: dict[str, str]
+  matcher: ArnMatcher
+  replacements: dict[str, int]
+  unresolved: dict[str, None]
+
+  def __init__(self, arn_map: dict[str, str]) -> None:
+    """Constructor.
+
+    Args:
+        arn_map (dict[str, str]): A map of resource ARNs to common names
+    """
+    self.arn_map = arn_map
+    self.templates = {arn: create_template_value(name) for arn, name in arn_map.items()}
+    self.matcher = ArnMatcher(list(self.templates))
+    self.replacements = {}
+    self.unresolved = {}
+
+  def replace(self, value: str) -> str:
+    """Replace the known ARNs in a string value with their templated values.
+
+    Args:
+        value (str): The string value
+
+    Returns:
+        str: The updated value
+    """
+    # Most ARNs are the whole value, so check that before searching within it
+    if value in self.templates:
+      self.replacements[value] = self.replacements.get(value, 0) + 1
+      return self.templates[value]
+
+    # Only strings containing an ARN need searching
+    if "arn:" not in value:
+      return value
+
+    value, replaced = self.matcher.replace(value, self.templates)
+    for arn in replaced:
+      self.replacements[arn] = self.replacements.get(arn, 0) + 1
+
+    for arn in ARN_REGEX.findall(value):
+      self.unresolved[arn] = None
+
+    return value
+
+  def result(self) -> TemplatiseResult:
+    """Report the replacements made so far.
+
+    Returns:
+        TemplatiseResult: The ARN map and a report of the replacements
+    """
+    return TemplatiseResult(self.arn_map, self.replacements, list(self.unresolved))
+
+
+def templatise_content(content: Any) -> TemplatiseResult:
+  """Replace ARNs in the contact flow content with jinja2 templated values using the resource's name.
+
+  The content is walked once, iteratively, collecting the resource names from nodes with "id" and "text" parameters and the location of every string value.  The ARNs are then replaced in place wherever they occur within the strings, and any other ARNs are reported.
 
   Args:
-      parent (Any): The parent node of the current node
-      node (Any): The current node of the content
-      arn_map (dict[str, str]): A map of resource ARNs to common names
-      operation (Callable[[Any, Any, dict[str, str]], bool]): An operation to perform on each list or dict item in the content
+      content (Any): The parsed contact flow content, which is updated in place
+
+  Returns:
+      TemplatiseResult: The ARN map and a report of the replacements
   """
-  # Recursively walk the contact flow
-  if isinstance(node, list):
-    # List: call on each child
-    if operation(parent, node, arn_map):
-      for child in node:
-        walk_content(node, child, arn_map, operation)
-  elif isinstance(node, dict):
-    if operation(parent, node, arn_map):
-      for child in node.values():
-        walk_content(node, child, arn_map, operation)
-  else:
-    operation(parent, node, arn_map)
-
-
-# Recursive walk operations
-def update_arn_map(_: Any, node: Any, arn_map: dict[str, str]) -> bool:
-  """An operation to update the ARN map from the flow content.
+  arn_map: dict[str, str] = {}
+
+  # The containers and keys of every string value
+  locations: list[tuple[Any, Any]] = []
+
+  nodes = [content]
+  while nodes:
+    node = nodes.pop()
+
+    children: Iterable[tuple[Any, Any]]
+    if isinstance(node, dict):
+      # Relevant ARNs are in a node with "id" and "text" parameters
+      if isinstance(node.get("id"), str) and "text" in node:
+        arn_map[node["id"]] = node["text"]
+      children = node.items()
+    elif isinstance(node, list):
+      children = enumerate(node)
+    else:
+      continue
+
+    for key, child in children:
+      if isinstance(child, str):
+        locations.append((node, key))
+      elif isinstance(child, (dict, list)):
+        nodes.append(child)
+
+  replacer = ArnReplacer(arn_map)
+
+  for container, key in locations:
+    container[key] = replacer.replace(container[key])
+
+  return replacer.result()
+
+
+def collect_arn_map(events: Iterator[tuple[str, Any]]) -> dict[str, str]:
+  """Collect the resource names from objects with "id" and "text" parameters in a stream of JSON events.
 
   Args:
-      _ (Any): The parent node (unused)
-      node (Any): The current node
-      arn_map (dict[str, str]): A map of resource ARNs to common names
+      events (Iterator[tuple[str, Any]]): The JSON events of the contact flow content
 
   Returns:
-      bool: True if the caller should continue down the content, False if it shouldn't
+      dict[str, str]: A map of resource ARNs to common names
   """
-  # Relevant ARNs are in a node with "id" and "text" parameters
-  if isinstance(node, dict) and "id" in node and "text" in node:
-    arn_map[node["id"]] = node["text"]
-    return False
+  arn_map: dict[str, str] = {}
+
+  # The "id" and "text" values of each open object, or None for arrays
+  containers: list[dict[str, Any] | None] = []
+  key = None
+
+  for event, value in events:
+    if event == "start_map":
+      containers.append({})
+    elif event == "start_array":
+      containers.append(None)
+    elif event == "end_map":
+      fields = containers.pop()
+      assert fields is not None
+      if isinstance(fields.get("id"), str) and "text" in fields:
+        arn_map[fields["id"]] = fields["text"]
+    elif event == "end_array":
+      containers.pop()
+    elif event == "map_key":
+      key = value
+    elif containers and containers[-1] is not None and key in ("id", "text"):
+      containers[-1][key] = value
+
+  return arn_map
 
-  return True
 
+def templatise_file(
+  inpath: Path, outpath: Path, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> TemplatiseResult:
+  """Replace ARNs in a contact flow file with jinja2 templated values, streaming it so memory use doesn't depend on the size of the flow.
 
-def replace_arns_with_templates(
-  parent: Any, node: Any, arn_map: dict[str, str]
-) -> bool:
-  """An operation to replace ARNs in the content with a jinja2 templated using the resource's name.
+  The file is read twice: first to collect the resource names, then to write the templatised content.  The output is identical to templatising the parsed content.
 
   Args:
-      parent (Any): The parent node
-      node (Any): The current node
-      arn_map (dict[str, str]): A map of resource ARNs to common names
+      inpath (Path): The exported flow file
+      outpath (Path): The file to write the templatised flow to
+      chunk_size (int, optional): The number of characters to read at a time. Defaults to DEFAULT_CHUNK_SIZE.
 
   Returns:
-      bool: True if the caller should continue down the content, False if it shouldn't
+      TemplatiseResult: The ARN map and a report of the replacements
   """
-  if isinstance(node, str) and node in arn_map:
-    # Find the current node's key
-    key = list(parent.keys())[list(parent.values()).index(node)]
+  with open(inpath) as infile:
+    arn_map = collect_arn_map(iter_events(infile, chunk_size))
+
+  replacer = ArnReplacer(arn_map)
 
-    # Update the value
-    parent[key] = "{{" + f"resources['{create_logical_id(arn_map[node])}']" + "}}"
-    return False
+  with open(inpath) as infile, open(outpath, "w") as outfile:
+    write_events(iter_events(infile, chunk_size), outfile.write, replacer.replace)
 
-  return True
+  return replacer.result()
 
 
-def templatise_flow(flow_name: str) -> None:
+def templatise_flow(flow_name: str, stream: bool = False) -> None:
   """Reads an exported flow file and replaces any hardcoded ARNs with jinja2 template values based on the resource's common name. Saves the result as a separate file.
 
   Args:
       flow_name (str): The name of the flow to template
+      stream (bool, optional): Whether to stream the file rather than loading it, for very large flows. Defaults to False.
   """
   logger.info(f"Templatising flow {flow_name}...")
 
+  if stream:
+    templatise_file(
+      FLOW_EXPORT_DIRECTORY.joinpath(f"{flow_name}.json"),
+      FLOW_CONTENT_DIRECTORY.joinpath(f"{flow_name}.json"),
+    ).log(flow_name)
+    logger.info("Flow templatise complete")
+    return
+
   # Load the exported file
   inpath = FLOW_EXPORT_DIRECTORY.joinpath(f"{flow_name}.json")
   with open(inpath) as infile:
-    content = json.load(infile)
+    content = json_backend.loads(infile.read())
+
+  save_templatised_flow(flow_name, content)
+
+  logger.info("Flow templatise complete")
+
+
+def save_templatised_flow(flow_name: str, content: Any) -> None:
+  """Replace the hardcoded ARNs in parsed flow content with jinja2 template values, and save it as the flow's template.
 
+  Args:
+      flow_name (str): The name of the flow
+      content (Any): The parsed contact flow content, which is updated in place
+  """
   # Replace the ARNs with the jinja2 templated values
-  arn_map: dict[str, str] = {}
-  walk_content(None, content, arn_map, update_arn_map)
-  walk_content(None, content, arn_map, replace_arns_with_templates)
+  templatise_content(content).log(flow_name)
 
   # Write the templated file
   outpath = FLOW_CONTENT_DIRECTORY.joinpath(f"{flow_name}.json")
   with open(outpath, "w") as outfile:
-    json.dump(content, outfile, indent=2)
+    outfile.write(json_backend.dumps(content, indent=True))
 
-  logger.info("Flow templatise complete")
 
+def templatise(stream: bool = False) -> None:
+  """Templatise each contact flow.
 
-def templatise() -> None:
-  """Templatise each contact flow."""
+  Args:
+      stream (bool, optional): Whether to stream the files rather than loading them, for very large flows. Defaults to False.
+  """
   # Templatise each flow
   for flow_name in FLOW_NAMES.values():
-    templatise_flow(flow_name)
+    templatise_flow(flow_name, stream)
 
   logger.info("Templatise completed successfully")
 
 
 if __name__ == "__main__":
-  templatise()
+  parser = argparse.ArgumentParser(
+    description="Replace the hardcoded ARNs in the exported flows with template values"
+  )
+  parser.add_argument(
+    "--stream",
+    action="store_true",
+    help="Stream each file in two passes rather than loading it, so memory use stays bounded for very large flows",
+  )
+  parser.add_argument(
+    "--profile",
+    action="store_true",
+    help="Profile the run, writing a report to output/profiles",
+  )
+  args = parser.parse_args()
+
+  with profiled("templatise", args.profile):
+    templatise(args.stream)
@@ -0,0 +1,58 @@
+from export.arn_matcher import ARN_REGEX, ArnMatcher
+
+
+def test_find() -> None:
+  matcher = ArnMatcher(["he", "she", "his", "hers"])
+
+  # Each word is next to a character that could continue it, so none are at a boundary
+  assert matcher.find("ushers") == []
+  assert matcher.find("u she rs") == [(2, "she")]
+  assert matcher.find("his hers") == [(0, "his"), (4, "hers")]
+  assert matcher.find("nothing") == []
+
+
+def test_find_longest() -> None:
+  instance = "arn:aws:connect:region:123456789012:instance/id"
+  queue = f"{instance}/queue/queue-id"
+
+  matcher = ArnMatcher([instance, queue])
+
+  assert matcher.find(f"{queue} {instance}") == [
+    (0, queue),
+    (len(queue) + 1, instance),
+  ]
+
+
+def test_find_boundary() -> None:
+  queue = "arn:aws:connect:region:123456789012:instance/id/queue/q1"
+
+  matcher = ArnMatcher([queue])
+
+  assert matcher.find(f'"{queue}0"') == []
+  assert matcher.find(f"{queue}/other") == []
+  assert matcher.find(f'"{queue}", {queue}') == [(1, queue), (len(queue) + 4, queue)]
+
+  # The same at the start of the ARN
+  assert matcher.find(f'"0{queue}"') == []
+  assert matcher.find(f"other/{queue}") == []
+  assert matcher.find(f"{queue}\n{queue}") == [(0, queue), (len(queue) + 1, queue)]
+  assert matcher.replace(f"{queue}0 {queue}", {queue: "{{Q1}}"}) == (
+    f"{queue}0 {{{{Q1}}}}",
+    [queue],
+  )
+
+
+def test_replace() -> None:
+  matcher = ArnMatcher(["arn:a", "arn:b"])
+
+  assert matcher.replace("x arn:a y arn:b arn:a", {"arn:a": "A", "arn:b": "B"}) == (
+    "x A y B A",
+    ["arn:a", "arn:b", "arn:a"],
+  )
+  assert matcher.replace("nothing", {"arn:a": "A"}) == ("nothing", [])
+
+
+def test_arn_regex() -> None:
+  arn = "arn:aws:connect:ap-southeast-2:123456789012:instance/id/queue/queue-id"
+
+  assert ARN_REGEX.findall(f'prefix "{arn}", suffix') == [arn]
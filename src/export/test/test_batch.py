@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+from pathlib import Path
+import pytest
+from pytest_mock import MockerFixture
+
+from export import batch
+from export.batch import MANIFEST_FILE_NAME, find_collisions, templatise_batch
+from export.templatise import TEMPLATISER_VERSION
+
+QUEUE_ARN = "arn:aws:connect:region:123456789012:instance/id/queue/queue-id"
+OTHER_ARN = "arn:aws:connect:region:123456789012:instance/id/queue/other-id"
+
+
+def write_flow(path: Path, arn: str, name: str) -> None:
+  path.write_text(
+    json.dumps({"meta": {"id": arn, "text": name}, "QueueId": arn}, indent=2)
+  )
+
+
+def test_find_collisions() -> None:
+  assert find_collisions(
+    {
+      "a.json": {QUEUE_ARN: "Callback Queue"},
+      "b.json": {QUEUE_ARN: "Callback Queue", OTHER_ARN: "Callback-Queue"},
+      "c.json": {"other": "Other"},
+    }
+  ) == {"CallbackQueue": {QUEUE_ARN: ["a.json", "b.json"], OTHER_ARN: ["b.json"]}}
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_templatise_batch(tmp_path: Path, stream: bool) -> None:
+  input_directory = tmp_path.joinpath("input")
+  output_directory = tmp_path.joinpath("output")
+  input_directory.mkdir()
+  write_flow(input_directory.joinpath("a.json"), QUEUE_ARN, "Callback Queue")
+  write_flow(input_directory.joinpath("b.json"), QUEUE_ARN, "Callback Queue")
+
+  assert templatise_batch(input_directory, output_directory, 2, stream) == ({}, [])
+
+  assert json.loads(output_directory.joinpath("a.json").read_text()) == {
+    "meta": {"id": "{{resources['CallbackQueue']}}", "text": "Callback Queue"},
+    "QueueId": "{{resources['CallbackQueue']}}",
+  }
+  manifest = json.loads(output_directory.joinpath(MANIFEST_FILE_NAME).read_text())
+  assert set(manifest) == {"a.json", "b.json"}
+  assert manifest["a.json"]["ArnMap"] == {QUEUE_ARN: "Callback Queue"}
+
+
+def test_templatise_batch_incremental(mocker: MockerFixture, tmp_path: Path) -> None:
+  # Run in threads, so the calls can be counted
+  mocker.patch.object(batch, "ProcessPoolExecutor", ThreadPoolExecutor)
+  spy = mocker.spy(batch, "templatise_path")
+
+  input_directory = tmp_path.joinpath("input")
+  output_directory = tmp_path.joinpath("output")
+  input_directory.mkdir()
+  write_flow(input_directory.joinpath("a.json"), QUEUE_ARN, "Callback Queue")
+  write_flow(input_directory.joinpath("b.json"), OTHER_ARN, "Other Queue")
+
+  templatise_batch(input_directory, output_directory, 1)
+  assert spy.call_count == 2
+
+  # Only the changed flow is templatised again, but the skipped one still counts towards collisions
+  write_flow(input_directory.joinpath("b.json"), OTHER_ARN, "Callback-Queue")
+
+  collisions, _ = templatise_batch(input_directory, output_directory, 1)
+
+  assert collisions == {"CallbackQueue": {QUEUE_ARN: ["a.json"], OTHER_ARN: ["b.json"]}}
+  assert spy.call_count == 3
+  assert spy.call_args[0][0] == input_directory.joinpath("b.json")
+
+  # A new templatiser version redoes everything
+  mocker.patch.object(batch, "TEMPLATISER_VERSION", TEMPLATISER_VERSION + 1)
+  templatise_batch(input_directory, output_directory, 1)
+
+  assert spy.call_count == 5
+
+
+def test_templatise_batch_failure(mocker: MockerFixture, tmp_path: Path) -> None:
+  mocker.patch.object(batch, "ProcessPoolExecutor", ThreadPoolExecutor)
+  spy = mocker.spy(batch, "templatise_path")
+
+  input_directory = tmp_path.joinpath("input")
+  output_directory = tmp_path.joinpath("output")
+  input_directory.mkdir()
+  write_flow(input_directory.joinpath("a.json"), QUEUE_ARN, "Callback Queue")
+  input_directory.joinpath("b.json").write_text("not json")
+
+  assert templatise_batch(input_directory, output_directory, 1) == ({}, ["b.json"])
+
+  # The flow that finished is recorded, and only the failed flow is tried again
+  manifest = json.loads(output_directory.joinpath(MANIFEST_FILE_NAME).read_text())
+  assert set(manifest) == {"a.json"}
+
+  assert templatise_batch(input_directory, output_directory, 1) == ({}, ["b.json"])
+  assert spy.call_count == 3
+  assert spy.call_args[0][0] == input_directory.joinpath("b.json")
@@ -1,58 +1,323 @@
+from collections import Counter
+from datetime import datetime
+import hashlib
 import json
+from mypy_boto3_connect.type_defs import (
+  ContactFlowModuleSummaryTypeDef,
+  ContactFlowSummaryTypeDef,
+)
+from pathlib import Path
 from pytest_mock import MockerFixture
 from typing import cast
 
-from export.export import export, export_flow
-from shared.test_helpers.helpers import MockConnectClient
+from export import export as export_module
+from export import templatise
+from export.export import (
+  SKIPPED,
+  UNCHANGED,
+  WRITTEN,
+  ExportManifest,
+  create_file_name,
+  create_unique_file_name,
+  export,
+  format_outcomes,
+  export_all,
+  export_flow,
+  export_flow_module,
+  export_templatised,
+)
+from shared.test_helpers.fake_aws import FakeAws
+from shared.test_helpers.helpers import (
+  MockConnectClient,
+  assert_call_budget,
+  patch_client,
+)
+from shared.version_store import MODULE, VersionStore
 from shared.clients import connect_client
 
+MOCK_PARAMETERS = {
+  "InstanceAlias": "alias",
+  "PrivateNumber": "private",
+  "PublicNumber": "public",
+  "AgentUsername": "agent",
+  "CustomerNumber": "customer",
+  "DefaultRoutingProfile": "routing",
+}
 
-def test_export_flow(mocker: MockerFixture) -> None:
+
+def test_export_flow(tmp_path: Path) -> None:
   mock_client = MockConnectClient("alias")
-  mock_file = mocker.mock_open(read_data="open file")
-  mocker.patch("builtins.open", mock_file)
-  mocker.patch.object(connect_client.ConnectClient, "__new__", mock_client)
+  manifest = ExportManifest(tmp_path.joinpath("manifest.json"))
+  summary: ContactFlowSummaryTypeDef = {"Name": "CallbackInbound", "Arn": "flow arn"}
+
+  outcome = export_flow(
+    cast(connect_client.ConnectClient, mock_client), manifest, summary, tmp_path
+  )
+
+  assert outcome == WRITTEN
+  assert tmp_path.joinpath("CallbackInbound.json").read_text() == json.dumps(
+    {"Message": "mock flow content"}, indent=2
+  )
+  assert manifest.get("flow arn") == {
+    "Name": "CallbackInbound",
+    "File": "CallbackInbound.json",
+    "LastModified": None,
+    "ContentHash": hashlib.sha256(
+      tmp_path.joinpath("CallbackInbound.json").read_bytes()
+    ).hexdigest(),
+  }
+  assert mock_client.calls == ["__init__", "get_contact_flow"]
 
-  mock_dump = mocker.patch.object(json, "dump")
+
+def test_export_flow_versions(tmp_path: Path) -> None:
+  mock_client = MockConnectClient("alias")
+  manifest = ExportManifest(tmp_path.joinpath("manifest.json"))
+  version_store = VersionStore(tmp_path.joinpath("versions"))
+  summary: ContactFlowSummaryTypeDef = {"Name": "CallbackInbound", "Arn": "flow arn"}
 
   export_flow(
-    cast(connect_client.ConnectClient, mock_client), "CallbackInbound", "flow arn"
+    cast(connect_client.ConnectClient, mock_client),
+    manifest,
+    summary,
+    tmp_path,
+    version_store=version_store,
   )
 
-  assert mock_dump.called
-  assert mock_dump.call_args == [
-    ({"Message": "mock flow content"}, mock_file.return_value),
-    {"indent": 2},
-  ]
-  assert mock_client.calls == ["__init__", "get_contact_flow"]
+  (timestamp,) = version_store.versions("CallbackInbound")
+  assert version_store.get("CallbackInbound", timestamp) == (
+    '{"Message":"mock flow content"}'
+  )
+
+
+def test_export_flow_module_versions(tmp_path: Path) -> None:
+  mock_client = MockConnectClient("alias")
+  manifest = ExportManifest(tmp_path.joinpath("manifest.json"))
+  version_store = VersionStore(tmp_path.joinpath("versions"))
+  summary: ContactFlowModuleSummaryTypeDef = {
+    "Name": "CallbackInbound",
+    "Arn": "module arn",
+  }
+
+  export_flow_module(
+    cast(connect_client.ConnectClient, mock_client),
+    manifest,
+    summary,
+    tmp_path,
+    version_store=version_store,
+  )
+
+  # A module is recorded separately from a flow with the same name
+  assert version_store.versions("CallbackInbound") == {}
+  (timestamp,) = version_store.versions("CallbackInbound", MODULE)
+  assert version_store.get("CallbackInbound", timestamp, MODULE) == (
+    '{"Message":"mock module content"}'
+  )
 
 
-def test_export(mocker: MockerFixture) -> None:
+def test_export_flow_unchanged(mocker: MockerFixture, tmp_path: Path) -> None:
   mock_client = MockConnectClient("alias")
-  mock_file = mocker.mock_open(read_data="open file")
-  mocker.patch("builtins.open", mock_file)
-  mocker.patch.object(connect_client.ConnectClient, "__new__", return_value=mock_client)
-  mock_dump = mocker.patch.object(json, "dump")
-  mock_mkdir = mocker.patch("pathlib.Path.mkdir")
+  manifest = ExportManifest(tmp_path.joinpath("manifest.json"))
+  summary: ContactFlowSummaryTypeDef = {"Name": "CallbackInbound", "Arn": "flow arn"}
+  client = cast(connect_client.ConnectClient, mock_client)
 
-  mock_parameters = {
-    "InstanceAlias": "alias",
-    "PrivateNumber": "private",
-    "PublicNumber": "public",
-    "AgentUsername": "agent",
-    "CustomerNumber": "customer",
-    "DefaultRoutingProfile": "routing",
+  export_flow(client, manifest, summary, tmp_path)
+  mock_open = mocker.patch("builtins.open")
+
+  # Without a last modified time, the flow is fetched but not written
+  assert export_flow(client, manifest, summary, tmp_path) == UNCHANGED
+  assert not mock_open.called
+  assert mock_client.calls == ["__init__"] + ["get_contact_flow"] * 2
+
+
+def test_export_flow_skipped(tmp_path: Path) -> None:
+  mock_client = MockConnectClient("alias")
+  manifest = ExportManifest(tmp_path.joinpath("manifest.json"))
+  summary = {
+    "Name": "CallbackInbound",
+    "Arn": "flow arn",
+    "LastModifiedTime": datetime(2024, 1, 1),
   }
+  client = cast(connect_client.ConnectClient, mock_client)
+
+  assert export_flow(client, manifest, summary, tmp_path) == WRITTEN  # type: ignore[arg-type]
+  manifest.save()
+
+  # The reloaded manifest shows the flow hasn't changed, so it isn't fetched
+  manifest = ExportManifest(tmp_path.joinpath("manifest.json"))
+  assert export_flow(client, manifest, summary, tmp_path) == SKIPPED  # type: ignore[arg-type]
+  assert mock_client.calls == ["__init__", "get_contact_flow"]
+
+  # Modified flows are fetched again
+  summary["LastModifiedTime"] = datetime(2024, 1, 2)
+  assert export_flow(client, manifest, summary, tmp_path) == UNCHANGED  # type: ignore[arg-type]
+  assert manifest.get("flow arn")["LastModified"] == "2024-01-02T00:00:00"  # type: ignore[index]
+
+
+def test_format_outcomes() -> None:
+  outcomes = Counter({WRITTEN: 3, UNCHANGED: 2, SKIPPED: 1})
 
-  mocker.patch("dotenv.dotenv_values", return_value=mock_parameters)
+  assert format_outcomes(outcomes) == "5 fetched, 3 written, 2 unchanged, 1 skipped"
+
+
+def test_export(mocker: MockerFixture, tmp_path: Path) -> None:
+  mock_client = MockConnectClient("alias")
+  mock_new = patch_client(mocker, connect_client.ConnectClient, mock_client)
+  mocker.patch.object(export_module, "FLOW_EXPORT_DIRECTORY", tmp_path)
+  mocker.patch(
+    "dotenv.dotenv_values", return_value={**MOCK_PARAMETERS, "Region": "ap-southeast-2"}
+  )
 
   export()
 
-  assert mock_mkdir.called
-  assert mock_dump.call_args == [
-    ({"Message": "mock flow content"}, mock_file.return_value),
-    {"indent": 2},
+  assert mock_new.call_args.args == ("alias", "ap-southeast-2")
+
+  assert sorted(path.name for path in tmp_path.iterdir()) == [
+    "CallbackAgentWhisper.json",
+    "CallbackInbound.json",
+    "CallbackOutbound.json",
+    "CallbackOutboundWhisper.json",
+    "manifest.json",
   ]
   assert (
     mock_client.calls == ["__init__", "get_flow_summaries"] + ["get_contact_flow"] * 4
   )
+
+
+def test_export_templatised(mocker: MockerFixture, tmp_path: Path) -> None:
+  queue_arn = "arn:aws:connect:region:123456789012:instance/id/queue/queue-id"
+  content = {
+    "meta": {"id": queue_arn, "text": "Callback Queue"},
+    "Parameters": {"QueueId": queue_arn},
+  }
+
+  mock_client = MockConnectClient("alias")
+  patch_client(mocker, connect_client.ConnectClient, mock_client)
+  mock_get = mocker.patch.object(
+    mock_client,
+    "get_contact_flow",
+    side_effect=lambda flow_arn: {"Content": json.dumps(content)},
+  )
+  mocker.patch.object(export_module, "FLOW_EXPORT_DIRECTORY", tmp_path / "export")
+  mocker.patch.object(templatise, "FLOW_CONTENT_DIRECTORY", tmp_path)
+  mocker.patch("dotenv.dotenv_values", return_value=MOCK_PARAMETERS)
+  mock_load = mocker.spy(json, "load")
+
+  export_templatised(keep_exports=True)
+
+  templated = json.dumps(
+    {
+      "meta": {"id": "{{resources['CallbackQueue']}}", "text": "Callback Queue"},
+      "Parameters": {"QueueId": "{{resources['CallbackQueue']}}"},
+    },
+    indent=2,
+  )
+  for flow_name in [
+    "CallbackInbound",
+    "CallbackOutbound",
+    "CallbackAgentWhisper",
+    "CallbackOutboundWhisper",
+  ]:
+    assert tmp_path.joinpath(f"{flow_name}.json").read_text() == templated
+    # The kept export has the original ARNs, as it's written before templatising
+    assert tmp_path.joinpath("export", f"{flow_name}.json").read_text() == json.dumps(
+      content, indent=2
+    )
+
+  # Nothing is read back from the exported files
+  assert not mock_load.called
+  assert mock_client.calls == ["__init__", "get_flow_summaries"]
+  assert mock_get.call_count == 4
+
+
+def test_create_file_name() -> None:
+  assert create_file_name("Sales/Queue: Main") == "Sales_Queue_ Main.json"
+
+
+def test_create_unique_file_name() -> None:
+  used: set[str] = set()
+
+  assert create_unique_file_name({"Name": "A/B", "Id": "id1"}, used) == "A_B.json"
+  assert create_unique_file_name({"Name": "a:b", "Id": "id2"}, used) == "a_b_id2.json"
+  assert (
+    create_unique_file_name({"Name": "A?B", "Arn": "arn/flow/0123456789"}, used)
+    == "A_B_01234567.json"
+  )
+  assert used == {"a_b.json", "a_b_id2.json", "a_b_01234567.json"}
+
+
+def test_export_all_file_name_collision(mocker: MockerFixture, tmp_path: Path) -> None:
+  mock_client = MockConnectClient("alias")
+  patch_client(mocker, connect_client.ConnectClient, mock_client)
+  mocker.patch.object(export_module, "INSTANCE_EXPORT_DIRECTORY", tmp_path)
+  mocker.patch("dotenv.dotenv_values", return_value=MOCK_PARAMETERS)
+  mocker.patch.object(
+    mock_client,
+    "list_contact_flows",
+    return_value=[
+      {"Name": "A/B", "Arn": "flow arn", "Id": "id1"},
+      {"Name": "A:B", "Arn": "flow arn", "Id": "id2"},
+    ],
+  )
+
+  assert export_all(rate=1000) == []
+
+  assert sorted(path.name for path in tmp_path.glob("flows/*")) == [
+    "A_B.json",
+    "A_B_id2.json",
+  ]
+
+
+def test_export_all(mocker: MockerFixture, tmp_path: Path) -> None:
+  mock_client = MockConnectClient("alias")
+  patch_client(mocker, connect_client.ConnectClient, mock_client)
+  mocker.patch.object(export_module, "INSTANCE_EXPORT_DIRECTORY", tmp_path)
+  mocker.patch("dotenv.dotenv_values", return_value=MOCK_PARAMETERS)
+
+  failed = export_all(rate=1000)
+
+  assert failed == []
+  assert sorted(path.name for path in tmp_path.glob("*/*")) == [
+    "CallbackInbound.json",
+    "Module.json",
+    "Sales_Queue_ Main.json",
+  ]
+  assert set(json.loads(tmp_path.joinpath("manifest.json").read_text())) == {
+    "flow arn",
+    "module arn",
+  }
+  assert json.loads(tmp_path.joinpath("modules", "Module.json").read_text()) == {
+    "Message": "mock module content"
+  }
+  assert sorted(mock_client.calls) == sorted(
+    ["__init__", "list_contact_flows", "list_contact_flow_modules"]
+    + ["get_contact_flow"] * 2
+    + ["get_contact_flow_module"]
+  )
+
+
+def test_export_all_failure(mocker: MockerFixture, tmp_path: Path) -> None:
+  mock_client = MockConnectClient("alias")
+  patch_client(mocker, connect_client.ConnectClient, mock_client)
+  mocker.patch.object(export_module, "INSTANCE_EXPORT_DIRECTORY", tmp_path)
+  mocker.patch("dotenv.dotenv_values", return_value=MOCK_PARAMETERS)
+  mocker.patch.object(
+    mock_client, "get_contact_flow_module", side_effect=Exception("throttled")
+  )
+
+  failed = export_all(rate=1000)
+
+  assert failed == ["module Module"]
+  assert len(list(tmp_path.glob("flows/*"))) == 2
+
+
+def test_export_call_budget(
+  mocker: MockerFixture, tmp_path: Path, fake_instance: FakeAws
+) -> None:
+  mocker.patch.object(export_module, "FLOW_EXPORT_DIRECTORY", tmp_path)
+
+  export()
+
+  # The flows are listed once, then each of the 4 flows is described
+  assert_call_budget(
+    fake_instance, "connect", 6, {"ListContactFlows": 1, "DescribeContactFlow": 4}
+  )
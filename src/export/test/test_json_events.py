@@ -0,0 +1,57 @@
+import io
+import json
+import pytest
+
+from export.json_events import iter_events, parse_scalar, write_events
+
+CONTENT = {
+  "a": [],
+  "b": {},
+  "c": [[], {"d": None}],
+  "e": 'quotes " and \\ backslashes, é 😀\n',
+  "f": [0, -1, 1.5, 1e30, 2**70, True, False, None],
+}
+
+
+def test_iter_events() -> None:
+  assert list(iter_events(io.StringIO('{"a": [1, "b"], "c": {}}'))) == [
+    ("start_map", None),
+    ("map_key", "a"),
+    ("start_array", None),
+    ("number", 1),
+    ("string", "b"),
+    ("end_array", None),
+    ("map_key", "c"),
+    ("start_map", None),
+    ("end_map", None),
+    ("end_map", None),
+  ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1024])
+def test_round_trip(chunk_size: int) -> None:
+  text = json.dumps(CONTENT, indent=2)
+  parts: list[str] = []
+
+  write_events(iter_events(io.StringIO(text), chunk_size), parts.append)
+
+  assert "".join(parts) == text
+
+
+def test_write_events_transform_string() -> None:
+  parts: list[str] = []
+
+  write_events(
+    iter_events(io.StringIO('{"a": ["b"]}')), parts.append, lambda value: value * 2
+  )
+
+  assert "".join(parts) == '{\n  "a": [\n    "bb"\n  ]\n}'
+
+
+def test_parse_scalar() -> None:
+  assert parse_scalar("12") == ("number", 12)
+  assert parse_scalar("-1.5e3") == ("number", -1500.0)
+  assert parse_scalar("null") == ("null", None)
+
+  with pytest.raises(ValueError):
+    parse_scalar("nope")
@@ -1,50 +1,140 @@
+import copy
+import io
 import json
+import logging
+from pathlib import Path
+import pytest
 from pytest_mock import MockerFixture
+import sys
+from typing import Any
 
+from export.json_events import iter_events
 from export.templatise import (
-  replace_arns_with_templates,
+  TemplatiseResult,
+  collect_arn_map,
+  create_template_value,
   templatise,
+  templatise_content,
+  templatise_file,
   templatise_flow,
-  update_arn_map,
-  walk_content,
 )
 
 
-def test_update_arn_map() -> None:
-  arn_map: dict[str, str] = {}
+def test_create_template_value() -> None:
+  assert create_template_value("mock text") == "{{resources['MockText']}}"
 
-  node = {"id": "mock id", "text": "mock text"}
 
-  assert not update_arn_map(None, node, arn_map)
-  assert arn_map == {"mock id": "mock text"}
+def test_templatise_content() -> None:
+  content = {
+    "meta": {"id": "mock id", "text": "mock text"},
+    "foo": "mock id",
+    "bar": "mock id",
+    "list": ["mock id", "baz", 1, None],
+    "nested": [{"other": {"id": "other id", "text": "other-text"}}],
+    "other": "other id",
+  }
+
+  result = templatise_content(content)
+
+  assert result.arn_map == {
+    "mock id": "mock text",
+    "other id": "other-text",
+  }
+  assert result.replacements == {"mock id": 4, "other id": 2}
+  assert result.unresolved == []
+  assert content == {
+    "meta": {"id": "{{resources['MockText']}}", "text": "mock text"},
+    "foo": "{{resources['MockText']}}",
+    "bar": "{{resources['MockText']}}",
+    "list": ["{{resources['MockText']}}", "baz", 1, None],
+    "nested": [{"other": {"id": "{{resources['OtherText']}}", "text": "other-text"}}],
+    "other": "{{resources['OtherText']}}",
+  }
+
+
+def test_templatise_content_deep() -> None:
+  # Deeper than the recursion limit
+  content: list[Any] = [{"id": "mock id", "text": "mock text"}]
+  node = content
+  for _ in range(sys.getrecursionlimit() * 2):
+    node.append([])
+    node = node[-1]
+  node.append("mock id")
+
+  assert templatise_content(content).arn_map == {"mock id": "mock text"}
+  assert node == ["{{resources['MockText']}}"]
+
+
+def test_templatise_content_embedded() -> None:
+  queue_arn = "arn:aws:connect:region:123456789012:instance/id/queue/queue-id"
+  prompt_arn = "arn:aws:connect:region:123456789012:instance/id/prompt/prompt-id"
+  unknown_arn = "arn:aws:connect:region:123456789012:instance/id/queue/unknown"
+
+  content = {
+    "meta": {"id": queue_arn, "text": "Callback Queue"},
+    "prompt": {"id": prompt_arn, "text": "Welcome"},
+    "Parameters": {
+      "Attribute": f"{queue_arn},{prompt_arn}",
+      "Text": f"Transfer to {queue_arn} or {unknown_arn}",
+    },
+  }
+
+  result = templatise_content(content)
+
+  assert content["Parameters"] == {
+    "Attribute": "{{resources['CallbackQueue']}},{{resources['Welcome']}}",
+    "Text": f"Transfer to {{{{resources['CallbackQueue']}}}} or {unknown_arn}",
+  }
+  assert result.replacements == {queue_arn: 3, prompt_arn: 2}
+  assert result.unresolved == [unknown_arn]
 
-  arn_map = {}
-  assert update_arn_map(None, {}, arn_map)
-  assert update_arn_map(None, "foo", arn_map)
-  assert update_arn_map(None, [], arn_map)
 
+def test_templatise_result_log(caplog: pytest.LogCaptureFixture) -> None:
+  result = TemplatiseResult({"mock id": "mock text"}, {"mock id": 2}, ["arn:other"])
 
-def test_replace_arns_with_templates() -> None:
-  arn_map = {"mock id": "mock text"}
+  with caplog.at_level(logging.INFO):
+    result.log("flow 1")
 
-  nodes = {"foo": "mock id"}
+  assert [record.getMessage() for record in caplog.records] == [
+    "Replaced 2 occurrences of {{resources['MockText']}} in flow 1",
+    "Flow flow 1 has a hardcoded ARN with no known name: arn:other",
+  ]
 
-  assert not replace_arns_with_templates(nodes, "mock id", arn_map)
-  assert nodes == {"foo": "{{resources['MockText']}}"}
 
-  assert replace_arns_with_templates(nodes, "bar", arn_map)
-  assert replace_arns_with_templates(nodes, {}, arn_map)
-  assert replace_arns_with_templates(nodes, [], arn_map)
+def test_collect_arn_map() -> None:
+  content = {
+    "meta": {"id": "mock id", "text": "mock text", "other": {"id": "x"}},
+    "list": [{"id": "other id", "text": "other text"}, {"text": "no id"}],
+  }
 
+  assert collect_arn_map(iter_events(io.StringIO(json.dumps(content)))) == {
+    "mock id": "mock text",
+    "other id": "other text",
+  }
 
-def test_walk_content() -> None:
-  arn_map = {"mock id": "mock text"}
 
-  nodes = [{"foo": "mock id"}, {"bar": "baz"}]
+def test_templatise_file(tmp_path: Path) -> None:
+  queue_arn = "arn:aws:connect:region:123456789012:instance/id/queue/queue-id"
+  content = {
+    "meta": {"id": queue_arn, "text": "Callback Queue"},
+    "Actions": [
+      {"QueueId": queue_arn, "Empty": {}},
+      {"Text": f"Transfer to {queue_arn} or arn:aws:connect:region:1:instance/x"},
+    ],
+  }
+  inpath = tmp_path.joinpath("in.json")
+  inpath.write_text(json.dumps(content, indent=2))
+
+  result = templatise_file(inpath, tmp_path.joinpath("out.json"), chunk_size=16)
 
-  walk_content(None, nodes, arn_map, replace_arns_with_templates)
+  # The output and report are the same as templatising the parsed content
+  expected = copy.deepcopy(content)
+  expected_result = templatise_content(expected)
 
-  assert nodes == [{"foo": "{{resources['MockText']}}"}, {"bar": "baz"}]
+  assert tmp_path.joinpath("out.json").read_text() == json.dumps(expected, indent=2)
+  assert result.arn_map == expected_result.arn_map
+  assert result.replacements == expected_result.replacements == {queue_arn: 3}
+  assert result.unresolved == ["arn:aws:connect:region:1:instance/x"]
 
 
 def test_templatise_flow(mocker: MockerFixture) -> None:
@@ -56,26 +146,25 @@ def test_templatise_flow(mocker: MockerFixture) -> None:
     }
   }
 
-  mock_file = mocker.mock_open(read_data="open file")
+  mock_file = mocker.mock_open(read_data=json.dumps(mock_content))
   mocker.patch("builtins.open", mock_file)
-  mock_load = mocker.patch.object(json, "load", return_value=mock_content)
-  mock_dump = mocker.patch.object(json, "dump")
 
   templatise_flow("flow 1")
 
-  assert mock_load.call_args == [(mock_file.return_value,), {}]
-  assert mock_dump.call_args == [
+  assert mock_file.return_value.write.call_args == [
     (
-      {
-        "content": {
-          "meta": {"id": "{{resources['MockText']}}", "text": "mock text"},
-          "foo": "{{resources['MockText']}}",
-          "bar": "baz",
-        }
-      },
-      mock_file.return_value,
+      json.dumps(
+        {
+          "content": {
+            "meta": {"id": "{{resources['MockText']}}", "text": "mock text"},
+            "foo": "{{resources['MockText']}}",
+            "bar": "baz",
+          }
+        },
+        indent=2,
+      ),
     ),
-    {"indent": 2},
+    {},
   ]
 
 
@@ -88,25 +177,24 @@ def test_templatise(mocker: MockerFixture) -> None:
     }
   }
 
-  mock_file = mocker.mock_open(read_data="open file")
+  mock_file = mocker.mock_open(read_data=json.dumps(mock_content))
   mocker.patch("builtins.open", mock_file)
-  mock_load = mocker.patch.object(json, "load", return_value=mock_content)
-  mock_dump = mocker.patch.object(json, "dump")
   mocker.patch("shared.utils.FLOW_NAMES", return_value=["flow 1"])
 
   templatise()
 
-  assert mock_load.call_args == [(mock_file.return_value,), {}]
-  assert mock_dump.call_args == [
+  assert mock_file.return_value.write.call_args == [
     (
-      {
-        "content": {
-          "meta": {"id": "{{resources['MockText']}}", "text": "mock text"},
-          "foo": "{{resources['MockText']}}",
-          "bar": "baz",
-        }
-      },
-      mock_file.return_value,
+      json.dumps(
+        {
+          "content": {
+            "meta": {"id": "{{resources['MockText']}}", "text": "mock text"},
+            "foo": "{{resources['MockText']}}",
+            "bar": "baz",
+          }
+        },
+        indent=2,
+      ),
     ),
-    {"indent": 2},
+    {},
   ]
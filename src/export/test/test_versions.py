@@ -0,0 +1,27 @@
+from pathlib import Path
+
+from export.versions import list_versions, restore_version
+from shared.version_store import VersionStore
+
+
+def test_list_versions(tmp_path: Path) -> None:
+  version_store = VersionStore(tmp_path)
+  second = version_store.put("flow 1", {"a": 2}, "export", "2024-01-02T00:00:00")
+  first = version_store.put("flow 1", {"a": 1}, "deploy", "2024-01-01T00:00:00")
+
+  assert list_versions(version_store, "flow 1").splitlines() == [
+    "Timestamp            Hash",
+    f"2024-01-01T00:00:00  {first}",
+    f"2024-01-02T00:00:00  {second}",
+  ]
+
+
+def test_restore_version(tmp_path: Path) -> None:
+  version_store = VersionStore(tmp_path)
+  version_store.put("flow 1", {"a": [1]}, "export", "2024-01-01T00:00:00")
+
+  restore_version(
+    version_store, "flow 1", "2024-01-01T00:00:00", tmp_path.joinpath("flow.json")
+  )
+
+  assert tmp_path.joinpath("flow.json").read_text() == '{\n  "a": [\n    1\n  ]\n}'
@@ -0,0 +1,109 @@
+import argparse
+from pathlib import Path
+import sys
+
+from export.export import create_file_name
+from shared import json_backend
+from shared.logger import logger
+from shared.utils import (
+  FLOW_EXPORT_DIRECTORY,
+  INSTANCE_EXPORT_DIRECTORY,
+  VERSION_STORE_DIRECTORY,
+  format_table,
+)
+from shared.version_store import FLOW, MODULE, VersionStore
+
+
+def list_versions(
+  version_store: VersionStore, flow_name: str, resource_type: str = FLOW
+) -> str:
+  """Format the recorded versions of a flow as a table.
+
+  Args:
+      version_store (VersionStore): The version store
+      flow_name (str): The name of the flow
+      resource_type (str, optional): FLOW or MODULE. Defaults to FLOW.
+
+  Returns:
+      str: The formatted table
+  """
+  return format_table(
+    [["Timestamp", "Hash"]]
+    + [
+      [timestamp, content_hash]
+      for timestamp, content_hash in sorted(
+        version_store.versions(flow_name, resource_type).items()
+      )
+    ]
+  )
+
+
+def restore_version(
+  version_store: VersionStore,
+  flow_name: str,
+  timestamp: str,
+  outpath: Path,
+  resource_type: str = FLOW,
+) -> None:
+  """Restore a version of a flow to a file, formatted like an export.
+
+  Args:
+      version_store (VersionStore): The version store
+      flow_name (str): The name of the flow
+      timestamp (str): The time of the version
+      outpath (Path): The file to write
+      resource_type (str, optional): FLOW or MODULE. Defaults to FLOW.
+  """
+  content = json_backend.loads(version_store.get(flow_name, timestamp, resource_type))
+
+  with open(outpath, "w") as outfile:
+    outfile.write(json_backend.dumps(content, indent=True))
+
+  logger.info(f"Restored {flow_name} at {timestamp} to {outpath}")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+    description="List and restore the flow versions recorded by the export and deploy scripts"
+  )
+  parser.add_argument("flow_name", help="The name of the flow")
+  parser.add_argument(
+    "timestamp", nargs="?", help="The version to restore, or omit to list them"
+  )
+  parser.add_argument(
+    "--output",
+    type=Path,
+    help="The file to restore to. Defaults to the flow's export file, so it can be templatised",
+  )
+  parser.add_argument(
+    "--module",
+    action="store_true",
+    help="The name is of a flow module, rather than a flow",
+  )
+  args = parser.parse_args()
+
+  version_store = VersionStore(VERSION_STORE_DIRECTORY)
+  resource_type = MODULE if args.module else FLOW
+
+  if not args.timestamp:
+    logger.info(
+      f"Versions of {args.flow_name}:\n"
+      + list_versions(version_store, args.flow_name, resource_type)
+    )
+    sys.exit(0)
+
+  if args.module:
+    outpath = INSTANCE_EXPORT_DIRECTORY.joinpath(
+      "modules", create_file_name(args.flow_name)
+    )
+  else:
+    outpath = FLOW_EXPORT_DIRECTORY.joinpath(f"{args.flow_name}.json")
+
+  outpath.parent.mkdir(exist_ok=True, parents=True)
+  restore_version(
+    version_store,
+    args.flow_name,
+    args.timestamp,
+    args.output or outpath,
+    resource_type,
+  )
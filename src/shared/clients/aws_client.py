@@ -1,21 +1,37 @@
 import boto3
+from collections import Counter
 from mypy_boto3_cloudformation.literals import CloudFormationServiceName
 from mypy_boto3_connect.literals import ConnectServiceName
 from typing import Any, Callable, cast
 
+from shared.metrics import metrics
+from shared.tracing import tracer
+
 
 class AwsClient:
   """Generic AWS client, designed for other clients to inherit from."""
 
+  api_calls: Counter[str]
+
   def __init__(
-    self, client_type: ConnectServiceName | CloudFormationServiceName
+    self,
+    client_type: ConnectServiceName | CloudFormationServiceName,
+    region_name: str | None = None,
   ) -> None:
     """Constructor.
 
     Args:
         client_type (ConnectServiceName | CloudFormationServiceName): The underlying service type ("connect" or "cloudformation")
+        region_name (str | None, optional): The AWS region. Defaults to None, which uses the default configuration.
     """
-    self.client = boto3.client(client_type)
+    # Use a dedicated session, as the default one isn't thread-safe
+    self.client = boto3.session.Session(region_name=region_name).client(client_type)
+    self._instrument()
+
+  def _instrument(self) -> None:
+    """Count the calls made by the underlying client, and record them in the shared metrics."""
+    self.api_calls = Counter()
+    metrics.register(self.client.meta.events, self.api_calls)
 
   def _get_summary(
     self,
@@ -46,26 +62,33 @@ class AwsClient:
       match_values = cast(str, match_values)
       match_values = [match_values]
 
-    # Return values for each requested item
+    # Return values for each requested item, looking up the position of each value once
     summaries = [None] * len(match_values)
+    indices: dict[str, int] = {}
+    for position, value in enumerate(match_values):
+      indices.setdefault(value, position)
     found = 0
 
-    paginator = self.client.get_paginator(list_function)  # type: ignore[call-overload]
-    for page in paginator.paginate(**paginate_args):
-      for summary in page[top_level_key]:
-        # Optional predicate to filter out results other than the name match
-        if not filter_predicate(summary):
-          continue
-
-        try:
-          index = match_values.index(summary[match_key])
-          summaries[index] = summary
-          found += 1
-
-          # All values found, exit now
-          if found == len(match_values):
-            break
-        except ValueError:
-          pass
+    with tracer.span("get_summary", operation=list_function) as span:
+      pages = 0
+      paginator = self.client.get_paginator(list_function)  # type: ignore[call-overload]
+      for page in paginator.paginate(**paginate_args):
+        pages += 1
+        for summary in page[top_level_key]:
+          # Optional predicate to filter out results other than the name match
+          if not filter_predicate(summary):
+            continue
+
+          index = indices.get(summary[match_key])
+          if index is not None and summaries[index] is None:
+            summaries[index] = summary
+            found += 1
+
+        # All values found, so don't fetch any more pages
+        if found == len(indices):
+          break
+
+      span.set_attribute("pages", pages)
+      span.set_attribute("found", found)
 
     return summaries if match_array else summaries[0]
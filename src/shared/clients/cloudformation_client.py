@@ -4,6 +4,7 @@ from mypy_boto3_cloudformation.client import (
 )
 from mypy_boto3_cloudformation.type_defs import (
   ParameterTypeDef,
+  StackEventTypeDef,
   StackSummaryTypeDef,
   ValidateTemplateOutputTypeDef,
 )
@@ -11,6 +12,7 @@ from mypy_boto3_cloudformation.waiter import (
   StackCreateCompleteWaiter,
   StackUpdateCompleteWaiter,
 )
+import time
 from typing import cast
 
 from shared.utils import DeployKwArgs, StackConfig
@@ -18,6 +20,12 @@ from shared.logger import logger
 from shared.clients.aws_client import AwsClient
 
 
+# Bounds of the delay between polls while waiting for a stack deletion, in seconds
+DELETE_MIN_DELAY = 1.0
+DELETE_MAX_DELAY = 15.0
+DELETE_TIMEOUT = 600.0
+
+
 class CloudformationClient(AwsClient):
   """A client to perform cloudformation operations.
 
@@ -27,9 +35,13 @@ class CloudformationClient(AwsClient):
 
   client: AwsCloudFormationClient
 
-  def __init__(self) -> None:
-    """Constructor."""
-    super().__init__("cloudformation")
+  def __init__(self, region_name: str | None = None) -> None:
+    """Constructor.
+
+    Args:
+        region_name (str | None, optional): The AWS region. Defaults to None, which uses the default configuration.
+    """
+    super().__init__("cloudformation", region_name)
 
   def get_stack_summary(self, stack_name: str) -> StackSummaryTypeDef:
     """Retrieve the summary of a stack matching the given name.
@@ -75,6 +87,109 @@ class CloudformationClient(AwsClient):
 
     return resource_map
 
+  def get_stack_parameters(self, stack_name: str) -> dict[str, str]:
+    """Retrieve the current parameter values of a stack.
+
+    Args:
+        stack_name (str): The name of the stack
+
+    Returns:
+        dict[str, str]: A mapping of parameter keys to values
+    """
+    stack = self.client.describe_stacks(StackName=stack_name)["Stacks"][0]
+
+    return {
+      parameter["ParameterKey"]: parameter["ParameterValue"]
+      for parameter in stack.get("Parameters", [])
+    }
+
+  def get_stack_template(self, stack_name: str) -> str:
+    """Retrieve the template that a stack was deployed with.
+
+    Args:
+        stack_name (str): The name of the stack
+
+    Returns:
+        str: The cloudformation template
+    """
+    # Only JSON templates are parsed by boto3, the YAML templates are returned as a string
+    return cast(str, self.client.get_template(StackName=stack_name)["TemplateBody"])
+
+  def update_stack_parameters(
+    self, stack_name: str, parameters: list[ParameterTypeDef], wait: bool = False
+  ) -> bool:
+    """Start an update of some of a stack's parameters, keeping its template and any other parameter values.
+
+    If a previous update of the stack is still in progress, e.g. one started by an earlier publish, it's waited for first, as another update can't start until it finishes.
+
+    Args:
+        stack_name (str): The name of the stack
+        parameters (list[ParameterTypeDef]): The parameters to update
+        wait (bool, optional): Whether to wait for the update to complete. Defaults to False.
+
+    Raises:
+        ex: botocore.client.ClientError other than "No updates are to be performed"
+        botocore.exceptions.WaiterError: The previous update or this one failed
+
+    Returns:
+        bool: True if an update was started, False if there were no changes
+    """
+    stack = self.client.describe_stacks(StackName=stack_name)["Stacks"][0]
+
+    if stack["StackStatus"] in [
+      "UPDATE_IN_PROGRESS",
+      "UPDATE_COMPLETE_CLEANUP_IN_PROGRESS",
+    ]:
+      logger.info(f"Waiting for the previous update of {stack_name} to complete...")
+      self._wait_for_update(stack_name)
+
+    updated_keys = [parameter["ParameterKey"] for parameter in parameters]
+
+    # Any parameters not being updated keep their current values
+    previous_parameters: list[ParameterTypeDef] = [
+      {"ParameterKey": parameter["ParameterKey"], "UsePreviousValue": True}
+      for parameter in stack.get("Parameters", [])
+      if parameter["ParameterKey"] not in updated_keys
+    ]
+
+    logger.info(f"Starting parameter update of {stack_name}...")
+
+    try:
+      self.client.update_stack(
+        StackName=stack_name,
+        UsePreviousTemplate=True,
+        Parameters=parameters + previous_parameters,
+      )
+    except botocore.client.ClientError as ex:
+      if ex.response["Error"]["Message"] == "No updates are to be performed.":
+        logger.info("No changes to deploy")
+        return False
+
+      raise ex
+
+    if wait:
+      self._wait_for_update(stack_name)
+      logger.info(f"Parameter update of {stack_name} complete")
+
+    return True
+
+  def _wait_for_update(self, stack_name: str) -> None:
+    """Wait for an update of a stack to complete.
+
+    Args:
+        stack_name (str): The name of the stack
+
+    Raises:
+        botocore.exceptions.WaiterError: The update failed, or didn't complete in time
+    """
+    self.client.get_waiter("stack_update_complete").wait(
+      StackName=stack_name,
+      WaiterConfig={
+        "Delay": 5,
+        "MaxAttempts": 60,  # 5 Minutes
+      },
+    )
+
   def _stack_exists(self, stack_name: str) -> bool:
     """Helper to check if a stack exists.
 
@@ -151,3 +266,100 @@ class CloudformationClient(AwsClient):
     )
 
     logger.info("Deployment complete")
+
+  def _get_new_stack_events(
+    self, stack_id: str, last_event_id: str | None
+  ) -> list[StackEventTypeDef]:
+    """Retrieve the events of a stack since the given event.
+
+    Args:
+        stack_id (str): The ID of the stack
+        last_event_id (str | None): The ID of the latest event already seen, or None to retrieve every event
+
+    Returns:
+        list[StackEventTypeDef]: The new events, oldest first
+    """
+    events: list[StackEventTypeDef] = []
+
+    # Events are returned newest first, so stop paging at the last one seen
+    paginator = self.client.get_paginator("describe_stack_events")
+    for page in paginator.paginate(StackName=stack_id):
+      for event in page["StackEvents"]:
+        if event["EventId"] == last_event_id:
+          return events[::-1]
+        events.append(event)
+
+    return events[::-1]
+
+  def delete_stack(
+    self,
+    stack_name: str,
+    min_delay: float = DELETE_MIN_DELAY,
+    max_delay: float = DELETE_MAX_DELAY,
+    timeout: float = DELETE_TIMEOUT,
+  ) -> bool:
+    """Delete a stack, logging its events as they happen until the deletion completes.
+
+    The stack is polled quickly while resources are being deleted, backing off while nothing is happening, rather than waiting a fixed interval between polls.
+
+    Args:
+        stack_name (str): The name of the stack
+        min_delay (float, optional): The delay between polls while events are arriving, in seconds. Defaults to DELETE_MIN_DELAY.
+        max_delay (float, optional): The longest delay between polls, in seconds. Defaults to DELETE_MAX_DELAY.
+        timeout (float, optional): The longest time to wait for the deletion, in seconds. Defaults to DELETE_TIMEOUT.
+
+    Raises:
+        RuntimeError: The deletion failed
+        TimeoutError: The deletion didn't complete in time
+
+    Returns:
+        bool: True if the stack was deleted, False if it didn't exist
+    """
+    summary = self.get_stack_summary(stack_name)
+    if summary is None:
+      logger.info(f"Stack {stack_name} doesn't exist")
+      return False
+
+    # The stack can only be described by ID once it's deleted
+    stack_id = summary["StackId"]
+
+    # Events are returned newest first, so only the first page is needed to find the latest, however long the stack's history is
+    previous_events = self.client.describe_stack_events(StackName=stack_id)[
+      "StackEvents"
+    ]
+    last_event_id = previous_events[0]["EventId"] if previous_events else None
+
+    logger.info(f"Starting deletion of {stack_name}...")
+    self.client.delete_stack(StackName=stack_id)
+
+    deadline = time.monotonic() + timeout
+    delay = min_delay
+
+    while True:
+      events = self._get_new_stack_events(stack_id, last_event_id)
+
+      for event in events:
+        reason = event.get("ResourceStatusReason")
+        logger.info(
+          f"{stack_name}: {event['LogicalResourceId']} {event['ResourceStatus']}"
+          + (f" ({reason})" if reason else "")
+        )
+
+        # The stack's own events mark the end of the deletion
+        if event["LogicalResourceId"] == stack_name:
+          if event["ResourceStatus"] == "DELETE_COMPLETE":
+            logger.info(f"Deletion of {stack_name} complete")
+            return True
+          if event["ResourceStatus"] == "DELETE_FAILED":
+            raise RuntimeError(f"Deletion of {stack_name} failed: {reason}")
+
+      if events:
+        last_event_id = events[-1]["EventId"]
+        delay = min_delay
+      else:
+        delay = min(delay * 2, max_delay)
+
+      if time.monotonic() + delay > deadline:
+        raise TimeoutError(f"Deletion of {stack_name} didn't complete in {timeout}s")
+
+      time.sleep(delay)
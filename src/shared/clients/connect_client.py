@@ -1,14 +1,19 @@
 from mypy_boto3_connect.type_defs import (
+  ContactFlowModuleSummaryTypeDef,
+  ContactFlowModuleTypeDef,
   ContactFlowSummaryTypeDef,
   ContactFlowTypeDef,
   InstanceSummaryTypeDef,
   ListPhoneNumbersSummaryTypeDef,
+  RoutingProfileSummaryTypeDef,
   StartOutboundVoiceContactResponseTypeDef,
+  UserSummaryTypeDef,
 )
 from mypy_boto3_connect.client import ConnectClient as AwsConnectClient
-from typing import Any, Callable, cast
+from typing import Any, Callable, Iterator, cast
 
 from shared.clients.aws_client import AwsClient
+from shared.tracing import tracer
 
 
 class ConnectClient(AwsClient):
@@ -20,13 +25,14 @@ class ConnectClient(AwsClient):
 
   client: AwsConnectClient
 
-  def __init__(self, instance_alias: str) -> None:
+  def __init__(self, instance_alias: str, region_name: str | None = None) -> None:
     """Constuctor.
 
     Args:
         instance_alias (str): The alias of the relevant Connect instance
+        region_name (str | None, optional): The AWS region. Defaults to None, which uses the default configuration.
     """
-    super().__init__("connect")
+    super().__init__("connect", region_name)
     self.instance = cast(
       InstanceSummaryTypeDef,
       super()._get_summary(
@@ -124,6 +130,50 @@ class ConnectClient(AwsClient):
       InstanceId=self.instance["Arn"], ContactFlowId=flow_arn
     )["ContactFlow"]
 
+  def list_contact_flows(self) -> Iterator[ContactFlowSummaryTypeDef]:
+    """List every contact flow in the instance, fetching each page as it's needed.
+
+    Yields:
+        Iterator[ContactFlowSummaryTypeDef]: The summary of each contact flow
+    """
+    paginator = self.client.get_paginator("list_contact_flows")
+    for page in paginator.paginate(InstanceId=self.instance["Arn"]):
+      yield from page["ContactFlowSummaryList"]
+
+  def list_contact_flow_modules(self) -> Iterator[ContactFlowModuleSummaryTypeDef]:
+    """List every contact flow module in the instance, fetching each page as it's needed.
+
+    Yields:
+        Iterator[ContactFlowModuleSummaryTypeDef]: The summary of each contact flow module
+    """
+    paginator = self.client.get_paginator("list_contact_flow_modules")
+    for page in paginator.paginate(InstanceId=self.instance["Arn"]):
+      yield from page["ContactFlowModulesSummaryList"]
+
+  def get_contact_flow_module(self, module_arn: str) -> ContactFlowModuleTypeDef:
+    """Retrieve all details of a contact flow module from the ARN.
+
+    Args:
+        module_arn (str): The ARN of the flow module
+
+    Returns:
+        ContactFlowModuleTypeDef: The contact flow module details
+    """
+    return self.client.describe_contact_flow_module(
+      InstanceId=self.instance["Arn"], ContactFlowModuleId=module_arn
+    )["ContactFlowModule"]
+
+  def update_contact_flow_content(self, flow_arn: str, content: str) -> None:
+    """Replace the content of a contact flow, publishing it immediately.
+
+    Args:
+        flow_arn (str): The ARN of the flow
+        content (str): The new content of the flow, as a JSON string
+    """
+    self.client.update_contact_flow_content(
+      InstanceId=self.instance["Arn"], ContactFlowId=flow_arn, Content=content
+    )
+
   def assign_contact_flow_number(self, flow_name: str, phone_number: str) -> None:
     """Assign a phone number to a contact flow.
 
@@ -134,10 +184,21 @@ class ConnectClient(AwsClient):
     flow_summary = self.get_flow_summaries([flow_name])[0]
     number_summary = self.get_phone_number_summaries([phone_number])[0]
 
+    self.associate_phone_number_flow(
+      number_summary["PhoneNumberId"], flow_summary["Id"]
+    )
+
+  def associate_phone_number_flow(self, phone_number_id: str, flow_id: str) -> None:
+    """Assign a phone number to a contact flow by ID, without looking either of them up.
+
+    Args:
+        phone_number_id (str): The ID of the phone number
+        flow_id (str): The ID or ARN of the contact flow
+    """
     self.client.associate_phone_number_contact_flow(
       InstanceId=self.instance["Arn"],
-      PhoneNumberId=number_summary["PhoneNumberId"],
-      ContactFlowId=flow_summary["Id"],
+      PhoneNumberId=phone_number_id,
+      ContactFlowId=flow_id,
     )
 
   def unassign_contact_flow_number(self, phone_number: str) -> None:
@@ -148,9 +209,65 @@ class ConnectClient(AwsClient):
     """
     number_summary = self.get_phone_number_summaries([phone_number])[0]
 
+    self.disassociate_phone_number_flow(number_summary["PhoneNumberId"])
+
+  def disassociate_phone_number_flow(self, phone_number_id: str) -> None:
+    """Remove a phone number from a contact flow by ID, without looking it up.
+
+    Args:
+        phone_number_id (str): The ID of the phone number
+    """
     self.client.disassociate_phone_number_contact_flow(
       InstanceId=self.instance["Arn"],
-      PhoneNumberId=number_summary["PhoneNumberId"],
+      PhoneNumberId=phone_number_id,
+    )
+
+  def get_user_summaries(self, usernames: list[str]) -> list[UserSummaryTypeDef | None]:
+    """Retrieve the summaries of instance users matching the given usernames, in a single pass over the users.
+
+    Args:
+        usernames (list[str]): A list of usernames
+
+    Returns:
+        list[UserSummaryTypeDef | None]: The summaries of the users, or None for users that don't exist
+    """
+    return cast(
+      list[UserSummaryTypeDef | None],
+      self._get_summary("list_users", "UserSummaryList", "Username", usernames),
+    )
+
+  def get_routing_profile_summary(
+    self, routing_profile_name: str
+  ) -> RoutingProfileSummaryTypeDef | None:
+    """Retrieve the summary of the instance routing profile with the given name.
+
+    Args:
+        routing_profile_name (str): The name of the routing profile
+
+    Returns:
+        RoutingProfileSummaryTypeDef | None: The summary of the routing profile, or None if it doesn't exist
+    """
+    return cast(
+      RoutingProfileSummaryTypeDef | None,
+      self._get_summary(
+        "list_routing_profiles",
+        "RoutingProfileSummaryList",
+        "Name",
+        routing_profile_name,
+      ),
+    )
+
+  def update_user_routing_profile(self, user_id: str, routing_profile_id: str) -> None:
+    """Assign a Connect user to a routing profile by ID.
+
+    Args:
+        user_id (str): The ID of the user
+        routing_profile_id (str): The ID of the routing profile
+    """
+    self.client.update_user_routing_profile(
+      InstanceId=self.instance["Arn"],
+      RoutingProfileId=routing_profile_id,
+      UserId=user_id,
     )
 
   def assign_user_to_routing_profile(
@@ -193,12 +310,14 @@ class ConnectClient(AwsClient):
     Returns:
         StartOutboundVoiceContactResponseTypeDef: The outbound voice contact response
     """
-    contact_flow_id = self.get_flow_summaries([flow_name])[0]["Id"]
-
-    return self.client.start_outbound_voice_contact(
-      InstanceId=self.instance["Id"],
-      ContactFlowId=contact_flow_id,
-      SourcePhoneNumber=source_phone_number,
-      DestinationPhoneNumber=destination_phone_number,
-      Attributes=attributes,
-    )
+    with tracer.span("resolve_flow", flow=flow_name):
+      contact_flow_id = self.get_flow_summaries([flow_name])[0]["Id"]
+
+    with tracer.span("StartOutboundVoiceContact"):
+      return self.client.start_outbound_voice_contact(
+        InstanceId=self.instance["Id"],
+        ContactFlowId=contact_flow_id,
+        SourcePhoneNumber=source_phone_number,
+        DestinationPhoneNumber=destination_phone_number,
+        Attributes=attributes,
+      )
@@ -6,7 +6,10 @@ from mypy_boto3_cloudformation.type_defs import (
   StackResourceSummaryTypeDef,
   WaiterConfigTypeDef,
 )
+from botocore.exceptions import WaiterError
+import pytest
 from pytest_mock import MockerFixture
+from typing import Any
 
 from shared.clients.cloudformation_client import CloudformationClient
 from shared.clients.test.helpers import (
@@ -263,3 +266,201 @@ def test_deploy_existing_stack_no_changes() -> None:
   # Test changes
   with not_raises():
     client.deploy_stack(stack_config, template, parameters)
+
+
+def test_get_stack_parameters() -> None:
+  mock_response = {
+    "Stacks": [
+      {
+        "StackName": "stack1",
+        "CreationTime": datetime.now(),
+        "StackStatus": "CREATE_COMPLETE",
+        "Parameters": [
+          {"ParameterKey": "key1", "ParameterValue": "value1"},
+          {"ParameterKey": "key2", "ParameterValue": "value2"},
+        ],
+      }
+    ]
+  }
+
+  client = mocked_client(
+    CloudformationClient(),
+    [AddResponseParams("describe_stacks", mock_response, {"StackName": "stack1"})],
+  )
+
+  assert client.get_stack_parameters("stack1") == {
+    "key1": "value1",
+    "key2": "value2",
+  }
+
+
+def test_update_stack_parameters() -> None:
+  mock_response = {
+    "Stacks": [
+      {
+        "StackName": "stack1",
+        "CreationTime": datetime.now(),
+        "StackStatus": "CREATE_COMPLETE",
+        "Parameters": [
+          {"ParameterKey": "key1", "ParameterValue": "value1"},
+          {"ParameterKey": "key2", "ParameterValue": "value2"},
+        ],
+      }
+    ]
+  }
+
+  client = mocked_client(
+    CloudformationClient(),
+    [
+      AddResponseParams("describe_stacks", mock_response, {"StackName": "stack1"}),
+      AddResponseParams(
+        "update_stack",
+        {},
+        {
+          "StackName": "stack1",
+          "UsePreviousTemplate": True,
+          "Parameters": [
+            {"ParameterKey": "key2", "ParameterValue": "new value2"},
+            {"ParameterKey": "key1", "UsePreviousValue": True},
+          ],
+        },
+      ),
+      AddResponseParams("describe_stacks", mock_response, {"StackName": "stack1"}),
+    ],
+    [ClientErrorParams("update_stack", "", "No updates are to be performed.")],
+  )
+
+  with not_raises():
+    client.update_stack_parameters(
+      "stack1", [{"ParameterKey": "key2", "ParameterValue": "new value2"}]
+    )
+    client.update_stack_parameters(
+      "stack1", [{"ParameterKey": "key2", "ParameterValue": "value2"}]
+    )
+
+
+def test_update_stack_parameters_wait() -> None:
+  def describe_response(status: str) -> dict[str, Any]:
+    return {
+      "Stacks": [
+        {
+          "StackName": "stack1",
+          "CreationTime": datetime.now(),
+          "StackStatus": status,
+          "Parameters": [{"ParameterKey": "key1", "ParameterValue": "value1"}],
+        }
+      ]
+    }
+
+  args = {"StackName": "stack1"}
+
+  client = mocked_client(
+    CloudformationClient(),
+    [
+      # The previous update is still in progress, so it's waited for first
+      AddResponseParams(
+        "describe_stacks", describe_response("UPDATE_IN_PROGRESS"), args
+      ),
+      AddResponseParams("describe_stacks", describe_response("UPDATE_COMPLETE"), args),
+      AddResponseParams(
+        "update_stack",
+        {},
+        {
+          "StackName": "stack1",
+          "UsePreviousTemplate": True,
+          "Parameters": [{"ParameterKey": "key1", "ParameterValue": "new value1"}],
+        },
+      ),
+      # The update fails
+      AddResponseParams(
+        "describe_stacks", describe_response("UPDATE_ROLLBACK_COMPLETE"), args
+      ),
+    ],
+  )
+
+  with pytest.raises(WaiterError):
+    client.update_stack_parameters(
+      "stack1", [{"ParameterKey": "key1", "ParameterValue": "new value1"}], wait=True
+    )
+
+
+def test_get_stack_template() -> None:
+  client = mocked_client(
+    CloudformationClient(),
+    [
+      AddResponseParams(
+        "get_template", {"TemplateBody": "template body"}, {"StackName": "stack1"}
+      )
+    ],
+  )
+
+  assert client.get_stack_template("stack1") == "template body"
+
+
+def create_stack_event(event_id: str, logical_id: str, status: str) -> dict[str, Any]:
+  return {
+    "StackId": "stack1 id",
+    "EventId": event_id,
+    "StackName": "stack1",
+    "LogicalResourceId": logical_id,
+    "Timestamp": datetime.now(),
+    "ResourceStatus": status,
+  }
+
+
+def test_delete_stack(mocker: MockerFixture) -> None:
+  mock_summary_response = {
+    "StackSummaries": [
+      {
+        "StackName": "stack1",
+        "StackId": "stack1 id",
+        "CreationTime": datetime.now(),
+        "StackStatus": "CREATE_COMPLETE",
+      }
+    ]
+  }
+  created = create_stack_event("event 1", "stack1", "CREATE_COMPLETE")
+  deleting = create_stack_event("event 2", "stack1", "DELETE_IN_PROGRESS")
+  resource = create_stack_event("event 3", "Flow", "DELETE_COMPLETE")
+  deleted = create_stack_event("event 4", "stack1", "DELETE_COMPLETE")
+  args = {"StackName": "stack1 id"}
+
+  client = mocked_client(
+    CloudformationClient(),
+    [
+      AddResponseParams("list_stacks", mock_summary_response, {}),
+      # Only the first page of the existing events is read
+      AddResponseParams(
+        "describe_stack_events",
+        {"StackEvents": [created], "NextToken": "older events"},
+        args,
+      ),
+      AddResponseParams("delete_stack", {}, args),
+      AddResponseParams(
+        "describe_stack_events", {"StackEvents": [deleting, created]}, args
+      ),
+      AddResponseParams(
+        "describe_stack_events", {"StackEvents": [deleting, created]}, args
+      ),
+      AddResponseParams(
+        "describe_stack_events",
+        {"StackEvents": [deleted, resource, deleting, created]},
+        args,
+      ),
+    ],
+  )
+  mock_sleep = mocker.patch("shared.clients.cloudformation_client.time.sleep")
+
+  assert client.delete_stack("stack1", min_delay=1, max_delay=3)
+
+  # Polls quickly after new events, then backs off while there are none
+  assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 2]
+
+
+def test_delete_stack_missing() -> None:
+  client = mocked_client(
+    CloudformationClient(),
+    [AddResponseParams("list_stacks", {"StackSummaries": []}, {})],
+  )
+
+  assert not client.delete_stack("stack1")
@@ -1,5 +1,7 @@
 import boto3
 from mypy_boto3_connect.type_defs import (
+  ContactFlowModuleSummaryTypeDef,
+  ContactFlowModuleTypeDef,
   InstanceSummaryTypeDef,
   ListPhoneNumbersSummaryTypeDef,
   ContactFlowSummaryTypeDef,
@@ -28,6 +30,7 @@ class MockConnectClient(ConnectClient):
   ) -> None:
     self.instance = instance
     self.client = boto3.client("connect")
+    self._instrument()
 
 
 def test_get_phone_number_summaries() -> None:
@@ -98,6 +101,67 @@ def test_get_contact_flow() -> None:
   assert client.get_contact_flow("arn1") == mock_flow
 
 
+def test_list_contact_flows() -> None:
+  flow1: ContactFlowSummaryTypeDef = {"Name": "flow1", "Arn": "arn1"}
+  flow2: ContactFlowSummaryTypeDef = {"Name": "flow2", "Arn": "arn2"}
+
+  client = mocked_client(
+    MockConnectClient(),
+    [
+      AddResponseParams(
+        "list_contact_flows",
+        {"ContactFlowSummaryList": [flow1], "NextToken": "token"},
+        {"InstanceId": "arn"},
+      ),
+      AddResponseParams(
+        "list_contact_flows",
+        {"ContactFlowSummaryList": [flow2]},
+        {"InstanceId": "arn", "NextToken": "token"},
+      ),
+    ],
+  )
+
+  assert list(client.list_contact_flows()) == [flow1, flow2]
+
+
+def test_list_contact_flow_modules() -> None:
+  module1: ContactFlowModuleSummaryTypeDef = {"Name": "module1", "Arn": "arn1"}
+
+  client = mocked_client(
+    MockConnectClient(),
+    [
+      AddResponseParams(
+        "list_contact_flow_modules",
+        {"ContactFlowModulesSummaryList": [module1]},
+        {"InstanceId": "arn"},
+      )
+    ],
+  )
+
+  assert list(client.list_contact_flow_modules()) == [module1]
+
+
+def test_get_contact_flow_module() -> None:
+  mock_module: ContactFlowModuleTypeDef = {
+    "Id": "id1",
+    "Arn": "arn1",
+    "Name": "module1",
+  }
+
+  client = mocked_client(
+    MockConnectClient(),
+    [
+      AddResponseParams(
+        "describe_contact_flow_module",
+        {"ContactFlowModule": mock_module},
+        {"InstanceId": "arn", "ContactFlowModuleId": "arn1"},
+      )
+    ],
+  )
+
+  assert client.get_contact_flow_module("arn1") == mock_module
+
+
 def test_assign_contact_flow_number() -> None:
   # Mocks
   mock_flow: ContactFlowSummaryTypeDef = {
@@ -206,6 +270,91 @@ def test_assign_user_to_routing_profile() -> None:
     client.assign_user_to_routing_profile("username1", "rp 1")
 
 
+def test_get_user_summaries() -> None:
+  user1: UserSummaryTypeDef = {"Id": "id1", "Username": "user1"}
+  user2: UserSummaryTypeDef = {"Id": "id2", "Username": "user2"}
+  user3: UserSummaryTypeDef = {"Id": "id3", "Username": "user3"}
+
+  client = mocked_client(
+    MockConnectClient(),
+    [
+      AddResponseParams(
+        "list_users",
+        {"UserSummaryList": [user1, user2], "NextToken": "token1"},
+        {"InstanceId": "arn"},
+      ),
+      AddResponseParams(
+        "list_users",
+        {"UserSummaryList": [user3]},
+        {"InstanceId": "arn", "NextToken": "token1"},
+      ),
+    ],
+  )
+
+  assert client.get_user_summaries(["user3", "missing", "user1"]) == [
+    user3,
+    None,
+    user1,
+  ]
+
+
+def test_get_user_summaries_stops_paging() -> None:
+  user1: UserSummaryTypeDef = {"Id": "id1", "Username": "user1"}
+  user2: UserSummaryTypeDef = {"Id": "id2", "Username": "user2"}
+
+  # Every user is on the first page, so the next page is never requested
+  client = mocked_client(
+    MockConnectClient(),
+    [
+      AddResponseParams(
+        "list_users",
+        {"UserSummaryList": [user1, user2], "NextToken": "token1"},
+        {"InstanceId": "arn"},
+      ),
+    ],
+  )
+
+  assert client.get_user_summaries(["user2", "user1", "user2"]) == [
+    user2,
+    user1,
+    None,
+  ]
+  assert client.api_calls == {"ListUsers": 1}
+
+
+def test_get_routing_profile_summary() -> None:
+  mock_routing_profile: RoutingProfileSummaryTypeDef = {"Name": "rp 1", "Id": "rp id1"}
+
+  client = mocked_client(
+    MockConnectClient(),
+    [
+      AddResponseParams(
+        "list_routing_profiles",
+        {"RoutingProfileSummaryList": [mock_routing_profile]},
+        {"InstanceId": "arn"},
+      ),
+    ],
+  )
+
+  assert client.get_routing_profile_summary("rp 1") == mock_routing_profile
+
+
+def test_update_user_routing_profile() -> None:
+  client = mocked_client(
+    MockConnectClient(),
+    [
+      AddResponseParams(
+        "update_user_routing_profile",
+        {},
+        {"InstanceId": "arn", "RoutingProfileId": "rp id1", "UserId": "user id1"},
+      ),
+    ],
+  )
+
+  with not_raises():
+    client.update_user_routing_profile("user id1", "rp id1")
+
+
 def test_start_outbound() -> None:
   # Mocks
   mock_flow: ContactFlowSummaryTypeDef = {
@@ -238,3 +387,22 @@ def test_start_outbound() -> None:
 
   with not_raises():
     client.start_outbound("flow1", "12345", "54321", {"customer": "john doe"})
+
+  # The flow is on the first page, so it's found with a single listing
+  assert client.api_calls == {"ListContactFlows": 1, "StartOutboundVoiceContact": 1}
+
+
+def test_update_contact_flow_content() -> None:
+  client = mocked_client(
+    MockConnectClient(),
+    [
+      AddResponseParams(
+        "update_contact_flow_content",
+        {},
+        {"InstanceId": "arn", "ContactFlowId": "arn1", "Content": "content"},
+      )
+    ],
+  )
+
+  with not_raises():
+    client.update_contact_flow_content("arn1", "content")
@@ -0,0 +1,196 @@
+from mypy_boto3_connect.type_defs import (
+  RoutingProfileSummaryTypeDef,
+  UserSummaryTypeDef,
+)
+
+from shared.clients.cloudformation_client import CloudformationClient
+from shared.clients.connect_client import ConnectClient
+from shared.utils import InstanceConfig, Parameters, read_parameters
+
+
+class RunContext:
+  """The state shared between the phases of a run, e.g. setup's deploy and assignments.
+
+  The clients and resource lookups are created on first use and reused by every later phase, so a run resolves each resource at most once.
+  """
+
+  parameters: Parameters
+  resources: dict[str, str]
+  _connect_client: ConnectClient | None
+  _cloudformation_client: CloudformationClient | None
+  _instance_config: InstanceConfig | None
+  _users: dict[str, UserSummaryTypeDef]
+  _routing_profiles: dict[str, RoutingProfileSummaryTypeDef]
+
+  def __init__(self, parameters: Parameters | None = None) -> None:
+    """Constructor.
+
+    Args:
+        parameters (Parameters | None, optional): The system parameters. Defaults to None, which reads them from the .env file.
+    """
+    self.parameters = parameters or read_parameters()
+
+    # Deployed stack resources, as a map of logical name to ARN
+    self.resources = {}
+
+    self._connect_client = None
+    self._cloudformation_client = None
+    self._instance_config = None
+    self._users = {}
+    self._routing_profiles = {}
+
+  @property
+  def connect_client(self) -> ConnectClient:
+    """The Connect client, which resolves the instance when it's created.
+
+    Returns:
+        ConnectClient: The Connect client
+    """
+    if self._connect_client is None:
+      self._connect_client = ConnectClient(
+        self.parameters["InstanceAlias"], self.parameters["Region"]
+      )
+
+    return self._connect_client
+
+  @property
+  def cloudformation_client(self) -> CloudformationClient:
+    """The cloudformation client.
+
+    Returns:
+        CloudformationClient: The cloudformation client
+    """
+    if self._cloudformation_client is None:
+      self._cloudformation_client = CloudformationClient(self.parameters["Region"])
+
+    return self._cloudformation_client
+
+  @property
+  def instance_config(self) -> InstanceConfig:
+    """The Connect instance and its phone numbers, resolved in a single pass over the numbers.
+
+    Returns:
+        InstanceConfig: The Connect instance configuration
+    """
+    if self._instance_config is None:
+      phone_numbers = self.connect_client.get_phone_number_summaries(
+        [self.parameters["PrivateNumber"], self.parameters["PublicNumber"]]
+      )
+      self._instance_config = InstanceConfig(
+        self.connect_client.instance, *phone_numbers
+      )
+
+    return self._instance_config
+
+  def get_flow_arn(self, flow_name: str) -> str:
+    """Get the ARN of a contact flow, preferring the deployed stack resources to listing the flows.
+
+    Args:
+        flow_name (str): The name of the contact flow
+
+    Returns:
+        str: The ARN of the contact flow
+    """
+    if flow_name not in self.resources:
+      flow_summary = self.connect_client.get_flow_summaries([flow_name])[0]
+      self.resources[flow_name] = flow_summary["Arn"]
+
+    return self.resources[flow_name]
+
+  def get_phone_number_id(self, phone_number: str) -> str:
+    """Get the ID of one of the configured phone numbers.
+
+    Args:
+        phone_number (str): The phone number in E.164 format, either the private or public number
+
+    Raises:
+        ValueError: The phone number isn't one of the configured numbers
+
+    Returns:
+        str: The ID of the phone number
+    """
+    if phone_number == self.parameters["PrivateNumber"]:
+      return self.instance_config.private_number["PhoneNumberId"]
+    if phone_number == self.parameters["PublicNumber"]:
+      return self.instance_config.public_number["PhoneNumberId"]
+
+    raise ValueError(f"Phone number {phone_number} isn't one of the configured numbers")
+
+  def get_routing_profile(
+    self, routing_profile_name: str
+  ) -> RoutingProfileSummaryTypeDef:
+    """Get the summary of a routing profile.
+
+    Args:
+        routing_profile_name (str): The name of the routing profile
+
+    Raises:
+        ValueError: The routing profile doesn't exist
+
+    Returns:
+        RoutingProfileSummaryTypeDef: The summary of the routing profile
+    """
+    if routing_profile_name not in self._routing_profiles:
+      routing_profile = self.connect_client.get_routing_profile_summary(
+        routing_profile_name
+      )
+      if routing_profile is None:
+        raise ValueError(f"Routing profile {routing_profile_name} doesn't exist")
+      self._routing_profiles[routing_profile_name] = routing_profile
+
+    return self._routing_profiles[routing_profile_name]
+
+  def get_user(self, username: str) -> UserSummaryTypeDef:
+    """Get the summary of a user.
+
+    Args:
+        username (str): The username of the user
+
+    Raises:
+        ValueError: The user doesn't exist
+
+    Returns:
+        UserSummaryTypeDef: The summary of the user
+    """
+    if username not in self._users:
+      user = self.connect_client.get_user_summaries([username])[0]
+      if user is None:
+        raise ValueError(f"User {username} doesn't exist")
+      self._users[username] = user
+
+    return self._users[username]
+
+  def assign_contact_flow_number(self, flow_name: str, phone_number: str) -> None:
+    """Assign one of the configured phone numbers to a contact flow.
+
+    Args:
+        flow_name (str): The name of the contact flow
+        phone_number (str): The phone number in E.164 format, either the private or public number
+    """
+    self.connect_client.associate_phone_number_flow(
+      self.get_phone_number_id(phone_number), self.get_flow_arn(flow_name)
+    )
+
+  def unassign_contact_flow_number(self, phone_number: str) -> None:
+    """Remove one of the configured phone numbers from its contact flow.
+
+    Args:
+        phone_number (str): The phone number in E.164 format, either the private or public number
+    """
+    self.connect_client.disassociate_phone_number_flow(
+      self.get_phone_number_id(phone_number)
+    )
+
+  def assign_user_to_routing_profile(
+    self, username: str, routing_profile_name: str
+  ) -> None:
+    """Assign a user to a routing profile.
+
+    Args:
+        username (str): The username of the user
+        routing_profile_name (str): The name of the routing profile
+    """
+    self.connect_client.update_user_routing_profile(
+      self.get_user(username)["Id"],
+      self.get_routing_profile(routing_profile_name)["Id"],
+    )
@@ -0,0 +1,215 @@
+import functools
+import json
+import os
+import re
+from typing import Any, Protocol
+
+try:
+  import orjson
+
+  HAS_ORJSON = True
+except ImportError:  # pragma: no cover
+  HAS_ORJSON = False
+
+# Environment variable to force a particular backend, e.g. to compare them
+BACKEND_VARIABLE = "JSON_BACKEND"
+
+# Characters the standard library escapes but orjson doesn't, i.e. DEL and everything outside ASCII (orjson already escapes the other control characters)
+UNESCAPED_REGEX = re.compile(r"[^\x00-\x7e]")
+
+
+class JsonBackend(Protocol):
+  """Parses and serialises JSON."""
+
+  name: str
+
+  def loads(self, data: str | bytes) -> Any:
+    """Parse a JSON document.
+
+    Args:
+        data (str | bytes): The JSON document
+
+    Returns:
+        Any: The parsed content
+    """
+    ...
+
+  def dumps(self, obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """Serialise content to JSON.
+
+    Args:
+        obj (Any): The content
+        indent (bool, optional): Whether to pretty print with an indent of 2, otherwise the output is compact. Defaults to False.
+        sort_keys (bool, optional): Whether to sort object keys. Defaults to False.
+
+    Returns:
+        str: The JSON document
+    """
+    ...
+
+
+class StdlibBackend:
+  """The standard library json module, which defines the canonical output."""
+
+  name = "json"
+
+  def loads(self, data: str | bytes) -> Any:
+    """Parse a JSON document.
+
+    Args:
+        data (str | bytes): The JSON document
+
+    Returns:
+        Any: The parsed content
+    """
+    return json.loads(data)
+
+  def dumps(self, obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """Serialise content to JSON.
+
+    Args:
+        obj (Any): The content
+        indent (bool, optional): Whether to pretty print with an indent of 2, otherwise the output is compact. Defaults to False.
+        sort_keys (bool, optional): Whether to sort object keys. Defaults to False.
+
+    Returns:
+        str: The JSON document
+    """
+    if indent:
+      return json.dumps(obj, indent=2, sort_keys=sort_keys)
+
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys)
+
+
+def _escape_non_ascii(match: re.Match[str]) -> str:
+  code = ord(match.group())
+
+  if code > 0xFFFF:
+    # Outside the basic multilingual plane, so escape as a surrogate pair
+    code -= 0x10000
+    return f"\\u{0xD800 | (code >> 10):04x}\\u{0xDC00 | (code & 0x3FF):04x}"
+
+  return f"\\u{code:04x}"
+
+
+def _contains_float(obj: Any) -> bool:
+  if isinstance(obj, float):
+    return True
+  if isinstance(obj, dict):
+    return any(_contains_float(value) for value in obj.values())
+  if isinstance(obj, list):
+    return any(_contains_float(value) for value in obj)
+  return False
+
+
+class OrjsonBackend:
+  """The orjson library, falling back to the standard library wherever their output would differ."""
+
+  name = "orjson"
+
+  def loads(self, data: str | bytes) -> Any:
+    """Parse a JSON document.
+
+    Documents orjson rejects (e.g. with NaN) or that parse to floats are parsed by the standard library, as orjson reads integers over 64 bits as floats.
+
+    Args:
+        data (str | bytes): The JSON document
+
+    Returns:
+        Any: The parsed content
+    """
+    try:
+      content = orjson.loads(data)
+    except orjson.JSONDecodeError:
+      return StdlibBackend().loads(data)
+
+    if _contains_float(content):
+      return StdlibBackend().loads(data)
+
+    return content
+
+  def dumps(self, obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """Serialise content to JSON.
+
+    DEL and non-ASCII characters are escaped like the standard library does.  Content with floats, which orjson formats differently (e.g. 1e16 rather than 1e+16, and NaN as null), or that orjson can't serialise (e.g. integers over 64 bits) falls back to the standard library.
+
+    Args:
+        obj (Any): The content
+        indent (bool, optional): Whether to pretty print with an indent of 2, otherwise the output is compact. Defaults to False.
+        sort_keys (bool, optional): Whether to sort object keys. Defaults to False.
+
+    Returns:
+        str: The JSON document
+    """
+    option = (orjson.OPT_INDENT_2 if indent else 0) | (
+      orjson.OPT_SORT_KEYS if sort_keys else 0
+    )
+
+    if _contains_float(obj):
+      return StdlibBackend().dumps(obj, indent, sort_keys)
+
+    try:
+      output = orjson.dumps(obj, option=option).decode()
+    except orjson.JSONEncodeError:
+      return StdlibBackend().dumps(obj, indent, sort_keys)
+
+    # These characters can only appear in strings, so this can't affect the structure
+    if not output.isascii() or "\x7f" in output:
+      output = UNESCAPED_REGEX.sub(_escape_non_ascii, output)
+
+    return output
+
+
+BACKENDS: dict[str, type[JsonBackend]] = {
+  StdlibBackend.name: StdlibBackend,
+}
+if HAS_ORJSON:
+  BACKENDS[OrjsonBackend.name] = OrjsonBackend
+
+
+@functools.cache
+def get_backend() -> JsonBackend:
+  """Get the JSON backend, which is the fastest one installed unless one is set by the JSON_BACKEND environment variable.
+
+  Raises:
+      ValueError: The requested backend isn't installed
+
+  Returns:
+      JsonBackend: The JSON backend
+  """
+  name = os.environ.get(
+    BACKEND_VARIABLE, OrjsonBackend.name if HAS_ORJSON else StdlibBackend.name
+  )
+
+  if name not in BACKENDS:
+    raise ValueError(
+      f"JSON backend {name} isn't installed, choose from {', '.join(BACKENDS)}"
+    )
+
+  return BACKENDS[name]()
+
+
+def loads(data: str | bytes) -> Any:
+  """Parse a JSON document with the configured backend.
+
+  Args:
+      data (str | bytes): The JSON document
+
+  Returns:
+      Any: The parsed content
+  """
+  return get_backend().loads(data)
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+  """Serialise content to JSON with the configured backend.
+
+  Args:
+      obj (Any): The content
+      indent (bool, optional): Whether to pretty print with an indent of 2, otherwise the output is compact. Defaults to False.
+      sort_keys (bool, optional): Whether to sort object keys. Defaults to False.
+
+  Returns:
+      str: The JSON document
+  """
+  return get_backend().dumps(obj, indent, sort_keys)
@@ -1,26 +1,155 @@
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import os
+import queue
 import sys
+from typing import Any, TextIO
 
+from shared import json_backend
 
-def create_logger(name: str, level: int = logging.INFO) -> logging.Logger:
+# Environment variables to choose the format and delivery of the default logger
+FORMAT_VARIABLE = "LOG_FORMAT"
+ASYNC_VARIABLE = "LOG_ASYNC"
+
+TEXT_FORMAT = "%(asctime)s %(levelname)-8s %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Attributes every log record has, so anything else was passed with extra={...}
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# The handler added to each logger, and the listener that delivers its records if it's asynchronous
+_handlers: dict[str, tuple[logging.Handler, QueueListener | None]] = {}
+
+
+class JsonFormatter(logging.Formatter):
+  """Formats each record as a single line JSON object, including any extra fields."""
+
+  def format(self, record: logging.LogRecord) -> str:
+    """Format a record.
+
+    Args:
+        record (logging.LogRecord): The record
+
+    Returns:
+        str: The record, as a JSON object
+    """
+    entry: dict[str, Any] = {
+      "time": self.formatTime(record, DATE_FORMAT),
+      "level": record.levelname,
+      "logger": record.name,
+      "message": record.getMessage(),
+    }
+
+    for key, value in vars(record).items():
+      if key not in RECORD_ATTRIBUTES:
+        entry[key] = (
+          value
+          if isinstance(value, (str, int, float, bool, type(None)))
+          else str(value)
+        )
+
+    if record.exc_info:
+      entry["exception"] = self.formatException(record.exc_info)
+
+    return json_backend.dumps(entry)
+
+
+class LazyQueueHandler(QueueHandler):
+  """Queues records without formatting them, so the message and any arguments are only formatted by the listener thread.
+
+  Arguments are formatted after the call returns, so they shouldn't be modified afterwards.
+  """
+
+  def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+    """Prepare a record to be queued, which leaves it unchanged.
+
+    Args:
+        record (logging.LogRecord): The record
+
+    Returns:
+        logging.LogRecord: The same record
+    """
+    return record
+
+
+def _stop_listeners() -> None:
+  # Deliver any queued records before exiting
+  for _, listener in _handlers.values():
+    if listener:
+      listener.stop()
+
+
+atexit.register(_stop_listeners)
+
+
+def create_logger(
+  name: str,
+  level: int = logging.INFO,
+  structured: bool = False,
+  asynchronous: bool = False,
+  stream: TextIO | None = None,
+) -> logging.Logger:
   """Create a logger with a specific format.
 
+  Creating the same logger again replaces its handler, rather than adding another one.
+
   Args:
       name (str): The name of the logger
       level (int, optional): The log level. Defaults to logging.INFO.
+      structured (bool, optional): Whether to write each record as a JSON object, otherwise as text. Defaults to False.
+      asynchronous (bool, optional): Whether to format and write records on a background thread, so logging doesn't block the caller. Defaults to False.
+      stream (TextIO | None, optional): Where to write the records. Defaults to None, which uses stdout.
 
   Returns:
       logging.Logger: The created logger
   """
-  formatter = logging.Formatter(
-    fmt="%(asctime)s %(levelname)-8s %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-  )
-  handler = logging.StreamHandler(stream=sys.stdout)
-  handler.setFormatter(formatter)
   logger = logging.getLogger(name)
   logger.setLevel(level)
+
+  if name in _handlers:
+    previous_handler, previous_listener = _handlers.pop(name)
+    logger.removeHandler(previous_handler)
+    if previous_listener:
+      previous_listener.stop()
+
+  formatter = (
+    JsonFormatter()
+    if structured
+    else logging.Formatter(fmt=TEXT_FORMAT, datefmt=DATE_FORMAT)
+  )
+  stream_handler = logging.StreamHandler(stream=stream or sys.stdout)
+  stream_handler.setFormatter(formatter)
+
+  handler: logging.Handler = stream_handler
+  listener: QueueListener | None = None
+
+  if asynchronous:
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    handler = LazyQueueHandler(records)
+    listener = QueueListener(records, stream_handler)
+    listener.start()
+
   logger.addHandler(handler)
+  _handlers[name] = (handler, listener)
+
   return logger
 
 
-logger = create_logger("default")
+def flush_logger(name: str) -> None:
+  """Wait for the queued records of an asynchronous logger to be written.
+
+  Args:
+      name (str): The name of the logger
+  """
+  _, listener = _handlers.get(name, (None, None))
+  if listener:
+    listener.stop()
+    listener.start()
+
+
+logger = create_logger(
+  "default",
+  structured=os.environ.get(FORMAT_VARIABLE) == "json",
+  asynchronous=bool(os.environ.get(ASYNC_VARIABLE)),
+)
@@ -0,0 +1,361 @@
+from collections import Counter
+from pathlib import Path
+import threading
+import time
+from typing import Any
+
+from botocore.hooks import BaseEventHooks
+
+from shared.logger import logger
+from shared.utils import METRICS_FILE, format_table
+
+# Each power of two is split into this many buckets, which bounds the relative error of the latencies
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+THROTTLE_ERROR_CODES = {
+  "Throttling",
+  "ThrottlingException",
+  "ThrottledException",
+  "TooManyRequestsException",
+  "RequestLimitExceeded",
+  "LimitExceededException",
+}
+
+# Key of the call start time in the botocore request context
+START_TIME_KEY = "metrics_start_time"
+
+
+class LatencyHistogram:
+  """A histogram of latencies with logarithmic buckets, like HdrHistogram, so percentiles are accurate to within 1/16 at any scale."""
+
+  counts: dict[int, int]
+  count: int
+  total: float
+
+  def __init__(self) -> None:
+    """Constructor."""
+    self.counts = {}
+    self.count = 0
+    self.total = 0
+
+  @staticmethod
+  def bucket_index(microseconds: int) -> int:
+    """Find the bucket of a latency.
+
+    Args:
+        microseconds (int): The latency, in microseconds
+
+    Returns:
+        int: The index of the bucket
+    """
+    if microseconds < SUB_BUCKETS:
+      return microseconds
+
+    shift = microseconds.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (microseconds >> shift) - SUB_BUCKETS
+
+  @staticmethod
+  def bucket_upper_bound(index: int) -> int:
+    """Find the largest latency in a bucket.
+
+    Args:
+        index (int): The index of the bucket
+
+    Returns:
+        int: The largest latency, in microseconds
+    """
+    if index < SUB_BUCKETS:
+      return index
+
+    shift = index // SUB_BUCKETS - 1
+    return ((index % SUB_BUCKETS + SUB_BUCKETS + 1) << shift) - 1
+
+  def record(self, seconds: float) -> None:
+    """Record a latency.
+
+    Args:
+        seconds (float): The latency, in seconds
+    """
+    index = self.bucket_index(max(0, round(seconds * 1e6)))
+    self.counts[index] = self.counts.get(index, 0) + 1
+    self.count += 1
+    self.total += seconds
+
+  def percentile(self, percent: float) -> float:
+    """Estimate a percentile of the latencies.
+
+    Args:
+        percent (float): The percentile, from 0 to 100
+
+    Returns:
+        float: The latency at the percentile, in seconds, or 0 if there are no latencies
+    """
+    target = percent / 100 * self.count
+    seen = 0
+
+    for index in sorted(self.counts):
+      seen += self.counts[index]
+      if seen >= target:
+        return self.bucket_upper_bound(index) / 1e6
+
+    return 0
+
+  def cumulative_buckets(self) -> list[tuple[float, int]]:
+    """List the number of latencies up to the upper bound of each non-empty bucket.
+
+    Returns:
+        list[tuple[float, int]]: The upper bound of each bucket, in seconds, with the number of latencies up to it
+    """
+    buckets: list[tuple[float, int]] = []
+    seen = 0
+
+    for index in sorted(self.counts):
+      seen += self.counts[index]
+      buckets.append((self.bucket_upper_bound(index) / 1e6, seen))
+
+    return buckets
+
+
+class OperationMetrics:
+  """The recorded calls to a single AWS operation."""
+
+  service: str
+  operation: str
+  calls: int
+  errors: int
+  retries: int
+  throttles: int
+  latency: LatencyHistogram
+
+  def __init__(self, service: str, operation: str) -> None:
+    """Constructor.
+
+    Args:
+        service (str): The service, e.g. "connect"
+        operation (str): The operation, e.g. "ListUsers"
+    """
+    self.service = service
+    self.operation = operation
+    self.calls = 0
+    self.errors = 0
+    self.retries = 0
+    self.throttles = 0
+    self.latency = LatencyHistogram()
+
+
+class ApiMetrics:
+  """Records the count, latency, retries and throttles of every AWS call, using botocore event hooks."""
+
+  operations: dict[tuple[str, str], OperationMetrics]
+  lock: threading.Lock
+
+  def __init__(self) -> None:
+    """Constructor."""
+    self.operations = {}
+    self.lock = threading.Lock()
+
+  def register(
+    self, events: BaseEventHooks, api_calls: Counter[str] | None = None
+  ) -> None:
+    """Record the calls made by a botocore client.
+
+    Args:
+        events (BaseEventHooks): The client's event hooks, i.e. client.meta.events
+        api_calls (Counter[str] | None, optional): Also counts the client's own calls by operation, e.g. for call budgets. Defaults to None.
+    """
+
+    def before_call(event_name: str, context: dict[str, Any], **kwargs: Any) -> None:
+      self._before_call(event_name, context, api_calls)
+
+    # Registered first, as a stubbed response stops any later handlers being called
+    events.register_first("before-call.*.*", before_call)
+    events.register("after-call", self._after_call)
+    events.register("after-call-error", self._after_call_error)
+    events.register("needs-retry", self._needs_retry)
+
+  def _get_operation(self, service: str, operation: str) -> OperationMetrics:
+    # Must be called with the lock held
+    key = (service, operation)
+    if key not in self.operations:
+      self.operations[key] = OperationMetrics(service, operation)
+    return self.operations[key]
+
+  def _before_call(
+    self, event_name: str, context: dict[str, Any], api_calls: Counter[str] | None
+  ) -> None:
+    context[START_TIME_KEY] = time.perf_counter()
+
+    # Each page of a listing is a separate call.  A client can be shared between threads, so the count is updated under the lock like the histograms
+    if api_calls is not None:
+      with self.lock:
+        api_calls[event_name.split(".", 2)[2]] += 1
+
+  def _record(
+    self,
+    event_name: str,
+    context: dict[str, Any],
+    failed: bool,
+    retries: int = 0,
+  ) -> None:
+    end = time.perf_counter()
+    duration = end - context.pop(START_TIME_KEY, end)
+    _, service, operation = event_name.split(".", 2)
+
+    with self.lock:
+      metrics = self._get_operation(service, operation)
+      metrics.calls += 1
+      metrics.errors += failed
+      metrics.retries += retries
+      metrics.latency.record(duration)
+
+  def _after_call(
+    self,
+    event_name: str,
+    http_response: Any,
+    parsed: dict[str, Any],
+    context: dict[str, Any],
+    **kwargs: Any,
+  ) -> None:
+    self._record(
+      event_name,
+      context,
+      http_response.status_code >= 300,
+      parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0),
+    )
+
+  def _after_call_error(
+    self, event_name: str, context: dict[str, Any], **kwargs: Any
+  ) -> None:
+    self._record(event_name, context, True)
+
+  def _needs_retry(self, event_name: str, response: Any = None, **kwargs: Any) -> None:
+    # Called after every attempt, so throttles are counted even if a retry succeeds
+    if response is None:
+      return
+
+    _, parsed = response
+    if parsed.get("Error", {}).get("Code") in THROTTLE_ERROR_CODES:
+      _, service, operation = event_name.split(".", 2)
+      with self.lock:
+        self._get_operation(service, operation).throttles += 1
+
+  def reset(self) -> None:
+    """Forget every recorded call."""
+    with self.lock:
+      self.operations = {}
+
+  def snapshot(self) -> list[OperationMetrics]:
+    """List the recorded operations.
+
+    Returns:
+        list[OperationMetrics]: The metrics of each operation, by service then operation name
+    """
+    with self.lock:
+      return [self.operations[key] for key in sorted(self.operations)]
+
+  def format_summary(self) -> str:
+    """Format the recorded operations as a table.
+
+    Returns:
+        str: The formatted table
+    """
+    rows = [
+      [
+        "Operation",
+        "Calls",
+        "Errors",
+        "Retries",
+        "Throttles",
+        "p50 (ms)",
+        "p99 (ms)",
+        "Total (s)",
+      ]
+    ]
+
+    for metrics in self.snapshot():
+      rows.append(
+        [
+          f"{metrics.service}.{metrics.operation}",
+          str(metrics.calls),
+          str(metrics.errors),
+          str(metrics.retries),
+          str(metrics.throttles),
+          f"{metrics.latency.percentile(50) * 1e3:.1f}",
+          f"{metrics.latency.percentile(99) * 1e3:.1f}",
+          f"{metrics.latency.total:.2f}",
+        ]
+      )
+
+    return format_table(rows)
+
+  def to_prometheus(self) -> str:
+    """Format the recorded operations in the Prometheus text exposition format.
+
+    Returns:
+        str: The metrics
+    """
+    operations = self.snapshot()
+    lines: list[str] = []
+
+    counters = [
+      (
+        "aws_api_calls_total",
+        "AWS API calls, counting each page of a listing",
+        "calls",
+      ),
+      ("aws_api_errors_total", "AWS API calls that failed", "errors"),
+      ("aws_api_retries_total", "Retries of AWS API calls", "retries"),
+      ("aws_api_throttles_total", "Throttled AWS API call attempts", "throttles"),
+    ]
+    for name, description, attribute in counters:
+      lines += [f"# HELP {name} {description}", f"# TYPE {name} counter"]
+      for metrics in operations:
+        labels = f'service="{metrics.service}",operation="{metrics.operation}"'
+        lines.append(f"{name}{{{labels}}} {getattr(metrics, attribute)}")
+
+    name = "aws_api_latency_seconds"
+    lines += [
+      f"# HELP {name} Latency of AWS API calls, including retries",
+      f"# TYPE {name} histogram",
+    ]
+    for metrics in operations:
+      labels = f'service="{metrics.service}",operation="{metrics.operation}"'
+      for upper_bound, count in metrics.latency.cumulative_buckets():
+        lines.append(f'{name}_bucket{{{labels},le="{upper_bound:g}"}} {count}')
+      lines += [
+        f'{name}_bucket{{{labels},le="+Inf"}} {metrics.latency.count}',
+        f"{name}_sum{{{labels}}} {metrics.latency.total:g}",
+        f"{name}_count{{{labels}}} {metrics.latency.count}",
+      ]
+
+    return "\n".join(lines) + "\n"
+
+  def write_prometheus(self, path: Path) -> None:
+    """Write the recorded operations to a Prometheus text format file, e.g. for the node exporter's textfile collector.
+
+    Args:
+        path (Path): The file to write
+    """
+    path.parent.mkdir(exist_ok=True, parents=True)
+
+    # Write to a temporary file first, so a collector never reads a partial file
+    temp_path = path.with_suffix(".tmp")
+    temp_path.write_text(self.to_prometheus())
+    temp_path.replace(path)
+
+
+metrics = ApiMetrics()
+
+
+def report_metrics(path: Path = METRICS_FILE) -> None:
+  """Log a summary of the AWS calls made so far, and write them to a Prometheus file.
+
+  Args:
+      path (Path, optional): The Prometheus file. Defaults to METRICS_FILE.
+  """
+  if not metrics.snapshot():
+    return
+
+  logger.info("AWS API calls:\n" + metrics.format_summary())
+  metrics.write_prometheus(path)
@@ -0,0 +1,140 @@
+import cProfile
+from contextlib import contextmanager
+import os
+from pathlib import Path
+import pstats
+import time
+from typing import Iterator
+
+from shared.logger import logger
+from shared.metrics import metrics
+from shared.utils import PROFILE_DIRECTORY
+
+# Environment variable to profile any entry point, without passing --profile
+PROFILE_VARIABLE = "PROFILE"
+
+# The number of functions listed in the report
+REPORT_LINES = 40
+
+
+class TimeSplit:
+  """The split of a run's wall time between local CPU and waiting, e.g. on the network."""
+
+  wall: float
+  cpu: float
+  api: float
+  api_calls: int
+
+  def __init__(self, wall: float, cpu: float, api: float, api_calls: int) -> None:
+    """Constructor.
+
+    Args:
+        wall (float): The elapsed time, in seconds
+        cpu (float): The CPU time of the process across all threads, in seconds
+        api (float): The total latency of the AWS calls, in seconds
+        api_calls (int): The number of AWS calls
+    """
+    self.wall = wall
+    self.cpu = cpu
+    self.api = api
+    self.api_calls = api_calls
+
+  @property
+  def waiting(self) -> float:
+    """The time spent off the CPU, e.g. waiting on the network or sleeping between polls.
+
+    Returns:
+        float: The waiting time, in seconds
+    """
+    return max(0, self.wall - self.cpu)
+
+  def format(self) -> str:
+    """Format the split as a short summary.
+
+    Returns:
+        str: The summary
+    """
+    share = self.wall or 1
+    return "\n".join(
+      [
+        f"Wall time: {self.wall:.2f}s",
+        f"Local CPU: {self.cpu:.2f}s ({self.cpu / share:.0%})",
+        f"Waiting: {self.waiting:.2f}s ({self.waiting / share:.0%})",
+        # Concurrent calls overlap, so this can be more than the wall time
+        f"AWS calls: {self.api_calls} calls, {self.api:.2f}s in total",
+      ]
+    )
+
+
+def _api_totals() -> tuple[float, int]:
+  operations = metrics.snapshot()
+  return (
+    sum(operation.latency.total for operation in operations),
+    sum(operation.calls for operation in operations),
+  )
+
+
+def profile_enabled(flag: bool = False) -> bool:
+  """Check whether a run should be profiled.
+
+  Args:
+      flag (bool, optional): Whether --profile was passed. Defaults to False.
+
+  Returns:
+      bool: True if the flag or the PROFILE environment variable is set
+  """
+  return flag or bool(os.environ.get(PROFILE_VARIABLE))
+
+
+@contextmanager
+def profiled(
+  name: str, enabled: bool = False, directory: Path = PROFILE_DIRECTORY
+) -> Iterator[None]:
+  """Profile a run with cProfile, writing a report sorted by cumulative time and a .pstats file for tools like snakeviz.
+
+  Only the calling thread's functions are profiled on Python versions before 3.12, so time in worker threads shows up as waiting on their futures.
+
+  Args:
+      name (str): The name of the run, which names the files, e.g. "deploy"
+      enabled (bool, optional): Whether --profile was passed, otherwise the PROFILE environment variable is checked. Defaults to False.
+      directory (Path, optional): Where to write the files. Defaults to PROFILE_DIRECTORY.
+
+  Returns:
+      Iterator[None]: The context, which does nothing if profiling isn't enabled
+  """
+  if not profile_enabled(enabled):
+    yield
+    return
+
+  profiler = cProfile.Profile()
+  api_start, api_calls_start = _api_totals()
+  cpu_start = time.process_time()
+  wall_start = time.perf_counter()
+
+  profiler.enable()
+  try:
+    yield
+  finally:
+    profiler.disable()
+
+    api_end, api_calls_end = _api_totals()
+    split = TimeSplit(
+      time.perf_counter() - wall_start,
+      time.process_time() - cpu_start,
+      api_end - api_start,
+      api_calls_end - api_calls_start,
+    )
+
+    directory.mkdir(exist_ok=True, parents=True)
+    stats_path = directory.joinpath(f"{name}.pstats")
+    report_path = directory.joinpath(f"{name}.txt")
+
+    profiler.dump_stats(stats_path)
+    with open(report_path, "w") as outfile:
+      outfile.write(split.format() + "\n\n")
+      pstats.Stats(profiler, stream=outfile).sort_stats("cumulative").print_stats(
+        REPORT_LINES
+      )
+
+    logger.info(f"Profile of {name}:\n{split.format()}")
+    logger.info(f"Profile written to {report_path} and {stats_path}")
@@ -0,0 +1,31 @@
+import threading
+import time
+
+
+class RateLimiter:
+  """Spaces out calls shared between threads so they don't exceed a fixed rate."""
+
+  interval: float
+  next_time: float
+  lock: threading.Lock
+
+  def __init__(self, rate: float) -> None:
+    """Constructor.
+
+    Args:
+        rate (float): The maximum number of calls per second
+    """
+    self.interval = 1 / rate
+    self.next_time = time.monotonic()
+    self.lock = threading.Lock()
+
+  def wait(self) -> None:
+    """Block until the next call is allowed."""
+    # Reserve a slot under the lock, but sleep outside it so other threads can reserve theirs
+    with self.lock:
+      now = time.monotonic()
+      slot = max(self.next_time, now)
+      self.next_time = slot + self.interval
+
+    if slot > now:
+      time.sleep(slot - now)
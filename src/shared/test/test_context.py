@@ -0,0 +1,73 @@
+import pytest
+from pytest_mock import MockerFixture
+from typing import cast
+
+from shared.clients import connect_client
+from shared.context import RunContext
+from shared.test_helpers.helpers import MockConnectClient, patch_client
+from shared.utils import Parameters
+
+MOCK_PARAMETERS = cast(
+  Parameters,
+  {
+    "InstanceAlias": "alias",
+    "PrivateNumber": "private",
+    "PublicNumber": "public",
+    "AgentUsername": "agent",
+    "CustomerNumber": "customer",
+    "DefaultRoutingProfile": "routing",
+    "Region": None,
+  },
+)
+
+
+def test_run_context_resolves_once(mocker: MockerFixture) -> None:
+  mock_client = MockConnectClient("alias")
+  mock_new = patch_client(mocker, connect_client.ConnectClient, mock_client)
+
+  context = RunContext(MOCK_PARAMETERS)
+
+  for _ in range(2):
+    assert context.get_phone_number_id("private") == "private id"
+    assert context.get_phone_number_id("public") == "public id"
+    assert context.get_user("agent")["Id"] == "agent id"
+    assert context.get_routing_profile("routing")["Id"] == "routing profile id"
+
+  with pytest.raises(ValueError):
+    context.get_phone_number_id("other")
+
+  assert mock_new.call_count == 1
+  assert mock_client.calls == [
+    "__init__",
+    "get_phone_number_summaries",
+    "get_user_summaries",
+    "get_routing_profile_summary",
+  ]
+
+
+def test_run_context_flow_arn(mocker: MockerFixture) -> None:
+  mock_client = MockConnectClient("alias")
+  patch_client(mocker, connect_client.ConnectClient, mock_client)
+
+  context = RunContext(MOCK_PARAMETERS)
+  context.resources["CallbackInbound"] = "deployed arn"
+
+  # Deployed resources are used without listing the flows
+  assert context.get_flow_arn("CallbackInbound") == "deployed arn"
+  assert mock_client.calls == ["__init__"]
+
+
+def test_run_context_missing(mocker: MockerFixture) -> None:
+  mock_client = MockConnectClient("alias")
+  patch_client(mocker, connect_client.ConnectClient, mock_client)
+
+  context = RunContext(MOCK_PARAMETERS)
+
+  # Missing resources raise every time rather than caching None
+  for _ in range(2):
+    with pytest.raises(ValueError, match="User missing doesn't exist"):
+      context.get_user("missing")
+    with pytest.raises(ValueError, match="Routing profile missing doesn't exist"):
+      context.get_routing_profile("missing")
+
+  assert mock_client.calls.count("get_routing_profile_summary") == 2
@@ -0,0 +1,98 @@
+import json
+import math
+import pytest
+from typing import Any
+
+from shared import json_backend
+from shared.json_backend import (
+  BACKENDS,
+  HAS_ORJSON,
+  OrjsonBackend,
+  StdlibBackend,
+  get_backend,
+)
+from shared.utils import FLOW_CONTENT_DIRECTORY
+
+CONTENT: dict[str, Any] = {
+  "b": 'text with "quotes", \\ and non-ASCII: é 😀',
+  "a": [1, 2.5, -3, None, True, False, {}, []],
+  "c": {"nested": {"big": 2**70}},
+}
+
+FLOATS = [1e16, 1.5e-7, -0.0, float("nan"), float("inf")]
+
+requires_orjson = pytest.mark.skipif(not HAS_ORJSON, reason="orjson isn't installed")
+
+
+@requires_orjson
+@pytest.mark.parametrize("indent", [True, False])
+@pytest.mark.parametrize("sort_keys", [True, False])
+def test_orjson_backend_matches_stdlib(indent: bool, sort_keys: bool) -> None:
+  assert OrjsonBackend().dumps(CONTENT, indent, sort_keys) == StdlibBackend().dumps(
+    CONTENT, indent, sort_keys
+  )
+
+
+@requires_orjson
+@pytest.mark.parametrize("value", FLOATS)
+def test_orjson_backend_matches_stdlib_floats(value: float) -> None:
+  content = {"a": [1, {"b": value}]}
+
+  assert OrjsonBackend().dumps(content) == StdlibBackend().dumps(content)
+
+
+@requires_orjson
+def test_orjson_backend_escapes_like_stdlib() -> None:
+  # Every control character, DEL, and a sample of non-ASCII characters, including outside the basic multilingual plane
+  characters = [chr(code) for code in range(0x100)] + ["\u2028", "\ufeff", "😀"]
+
+  for character in characters:
+    assert OrjsonBackend().dumps({"a": character}) == json.dumps(
+      {"a": character}, separators=(",", ":")
+    )
+
+  text = "".join(characters)
+  assert OrjsonBackend().dumps([text], indent=True) == json.dumps([text], indent=2)
+
+
+@requires_orjson
+def test_orjson_backend_loads_like_stdlib() -> None:
+  assert OrjsonBackend().loads('{"big": 1234567890123456789012345}') == {
+    "big": 1234567890123456789012345
+  }
+  assert math.isnan(OrjsonBackend().loads('{"a": NaN}')["a"])
+  assert OrjsonBackend().loads("[1e400]") == [math.inf]
+
+  with pytest.raises(ValueError):
+    OrjsonBackend().loads("{")
+
+
+@requires_orjson
+def test_backends_match_flow_files() -> None:
+  for path in FLOW_CONTENT_DIRECTORY.glob("*.json"):
+    text = path.read_text()
+    content = StdlibBackend().loads(text)
+
+    assert OrjsonBackend().loads(text) == content
+    assert OrjsonBackend().dumps(content, indent=True) == text.rstrip("\n")
+
+
+def test_get_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+  get_backend.cache_clear()
+  monkeypatch.setenv("JSON_BACKEND", "json")
+
+  assert isinstance(get_backend(), StdlibBackend)
+  assert json_backend.dumps({"a": [1]}) == '{"a":[1]}'
+  assert json_backend.loads('{"a": [1]}') == {"a": [1]}
+
+  get_backend.cache_clear()
+  monkeypatch.setenv("JSON_BACKEND", "other")
+
+  with pytest.raises(ValueError):
+    get_backend()
+
+  get_backend.cache_clear()
+  monkeypatch.delenv("JSON_BACKEND")
+
+  assert get_backend().name == ("orjson" if "orjson" in BACKENDS else "json")
+  get_backend.cache_clear()
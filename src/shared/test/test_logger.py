@@ -1,9 +1,63 @@
+import io
+import json
 import logging
+import threading
 
-from shared.logger import create_logger
+from shared.logger import create_logger, flush_logger
 
 
 def test_create_logger() -> None:
   logger = create_logger("test_logger")
   assert logger
   assert logger.level == logging.INFO
+
+
+def test_create_logger_idempotent() -> None:
+  stream = io.StringIO()
+
+  create_logger("test_idempotent", stream=stream)
+  logger = create_logger("test_idempotent", stream=stream)
+  logger.propagate = False
+  logger.info("message")
+
+  assert len(logger.handlers) == 1
+  assert stream.getvalue().count("message") == 1
+
+
+def test_structured_logger() -> None:
+  stream = io.StringIO()
+  logger = create_logger("test_structured", structured=True, stream=stream)
+  logger.propagate = False
+
+  logger.info("Started %s", "flow", extra={"contact": "12345"})
+
+  entry = json.loads(stream.getvalue())
+  assert entry["level"] == "INFO"
+  assert entry["logger"] == "test_structured"
+  assert entry["message"] == "Started flow"
+  assert entry["contact"] == "12345"
+
+
+def test_async_logger() -> None:
+  class Argument:
+    thread: threading.Thread | None = None
+
+    def __str__(self) -> str:
+      self.thread = threading.current_thread()
+      return "argument"
+
+  stream = io.StringIO()
+  logger = create_logger("test_async", asynchronous=True, stream=stream)
+  logger.propagate = False
+
+  argument = Argument()
+  logger.info("Logged %s", argument)
+  flush_logger("test_async")
+
+  assert stream.getvalue().endswith("Logged argument\n")
+
+  # The message is only formatted by the listener, not the caller
+  assert argument.thread is not threading.current_thread()
+
+  # Replacing the handler stops the listener thread
+  create_logger("test_async", stream=stream)
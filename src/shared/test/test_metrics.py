@@ -0,0 +1,136 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from shared.clients.cloudformation_client import CloudformationClient
+from shared.clients.connect_client import ConnectClient
+from shared.clients.test.helpers import (
+  AddResponseParams,
+  ClientErrorParams,
+  mocked_client,
+)
+from shared.metrics import LatencyHistogram, metrics, report_metrics
+from shared.test_helpers.fake_aws import FakeAws
+from shared.test_helpers.helpers import not_raises
+
+
+def test_histogram_buckets() -> None:
+  # Every latency is in a bucket that contains it, and the buckets don't overlap
+  previous_upper_bound = -1
+  for microseconds in range(100000):
+    index = LatencyHistogram.bucket_index(microseconds)
+    upper_bound = LatencyHistogram.bucket_upper_bound(index)
+    assert microseconds <= upper_bound
+    assert upper_bound >= previous_upper_bound
+    assert upper_bound - microseconds <= microseconds / 16
+    previous_upper_bound = upper_bound
+
+
+def test_histogram_percentiles() -> None:
+  histogram = LatencyHistogram()
+  for milliseconds in range(1, 101):
+    histogram.record(milliseconds / 1e3)
+
+  assert histogram.count == 100
+  assert abs(histogram.percentile(50) - 0.050) <= 0.050 / 16
+  assert abs(histogram.percentile(99) - 0.099) <= 0.099 / 16
+  assert histogram.cumulative_buckets()[-1][1] == 100
+
+
+def test_api_metrics(tmp_path: Path) -> None:
+  metrics.reset()
+
+  client = mocked_client(
+    CloudformationClient(),
+    [
+      AddResponseParams(
+        "list_stacks",
+        {
+          "StackSummaries": [
+            {
+              "StackName": "stack1",
+              "CreationTime": datetime.now(),
+              "StackStatus": "CREATE_COMPLETE",
+            }
+          ],
+          "NextToken": "token",
+        },
+        {},
+      ),
+      AddResponseParams(
+        "list_stacks",
+        {
+          "StackSummaries": [],
+          "ResponseMetadata": {"RetryAttempts": 2},
+        },
+        {"NextToken": "token"},
+      ),
+    ],
+    [ClientErrorParams("get_template", "ValidationError", "Stack does not exist")],
+  )
+
+  # Every page of the listing is counted
+  assert client.get_stack_summary("missing") is None
+
+  with not_raises():
+    try:
+      client.get_stack_template("missing")
+    except client.client.exceptions.ClientError:
+      pass
+
+  # Retried throttles are only seen by the retry hook, which stubbed calls skip
+  metrics._needs_retry(
+    "needs-retry.cloudformation.ListStacks",
+    response=(None, {"Error": {"Code": "Throttling"}}),
+  )
+
+  operations = {
+    operation_metrics.operation: operation_metrics
+    for operation_metrics in metrics.snapshot()
+  }
+  assert operations["ListStacks"].calls == 2
+  assert operations["ListStacks"].retries == 2
+  assert operations["ListStacks"].throttles == 1
+  assert operations["ListStacks"].latency.count == 2
+  assert operations["GetTemplate"].calls == 1
+  assert operations["GetTemplate"].errors == 1
+
+  # The same hook counts the client's own calls
+  assert client.api_calls == {"ListStacks": 2, "GetTemplate": 1}
+
+  assert metrics.format_summary().splitlines()[2].split()[:5] == [
+    "cloudformation.ListStacks",
+    "2",
+    "0",
+    "2",
+    "1",
+  ]
+
+  path = tmp_path.joinpath("metrics.prom")
+  report_metrics(path)
+  prometheus = path.read_text()
+  assert (
+    'aws_api_calls_total{service="cloudformation",operation="ListStacks"} 2'
+    in prometheus
+  )
+  assert (
+    'aws_api_latency_seconds_count{service="cloudformation",operation="ListStacks"} 2'
+    in prometheus
+  )
+  assert "# TYPE aws_api_latency_seconds histogram" in prometheus
+
+  metrics.reset()
+
+
+def test_api_calls_shared_client(fake_aws: FakeAws) -> None:
+  fake_aws.add_user("agent")
+  client = ConnectClient("alias")
+
+  # Every call from the threads sharing the client is counted
+  with ThreadPoolExecutor(max_workers=8) as executor:
+    list(executor.map(lambda _: client.get_user_summaries(["agent"]), range(400)))
+
+  assert client.api_calls == {"ListInstances": 1, "ListUsers": 400}
+  assert fake_aws.calls == client.api_calls
+
+  metrics.reset()
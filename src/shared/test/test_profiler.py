@@ -0,0 +1,72 @@
+from pathlib import Path
+import pstats
+from pytest_mock import MockerFixture
+
+from shared.metrics import metrics
+from shared.profiler import TimeSplit, profile_enabled, profiled
+
+
+def busy_work() -> int:
+  return sum(i * i for i in range(10000))
+
+
+def test_profile_enabled(mocker: MockerFixture) -> None:
+  mocker.patch.dict("os.environ", {}, clear=True)
+  assert not profile_enabled()
+  assert profile_enabled(True)
+
+  mocker.patch.dict("os.environ", {"PROFILE": "1"})
+  assert profile_enabled()
+
+
+def test_profiled_disabled(mocker: MockerFixture, tmp_path: Path) -> None:
+  mocker.patch.dict("os.environ", {}, clear=True)
+
+  with profiled("run", directory=tmp_path):
+    busy_work()
+
+  assert list(tmp_path.iterdir()) == []
+
+
+def test_profiled(tmp_path: Path) -> None:
+  with profiled("run", True, tmp_path):
+    busy_work()
+
+  report = tmp_path.joinpath("run.txt").read_text()
+  assert report.startswith("Wall time: ")
+  assert "Local CPU: " in report
+  assert "busy_work" in report
+
+  stats = pstats.Stats(str(tmp_path.joinpath("run.pstats")))
+  assert any(function == "busy_work" for _, _, function in stats.stats)  # type: ignore[attr-defined]
+
+
+def test_profiled_api_calls(mocker: MockerFixture, tmp_path: Path) -> None:
+  metrics.reset()
+  context: dict[str, float] = {}
+
+  with profiled("run", True, tmp_path):
+    metrics._before_call("before-call.connect.ListUsers", context, None)
+    metrics._after_call(
+      "after-call.connect.ListUsers",
+      mocker.Mock(status_code=200),
+      {},
+      context,
+    )
+
+  assert "AWS calls: 1 calls" in tmp_path.joinpath("run.txt").read_text()
+  metrics.reset()
+
+
+def test_time_split() -> None:
+  split = TimeSplit(10, 2.5, 9, 4)
+
+  assert split.waiting == 7.5
+  assert split.format().splitlines() == [
+    "Wall time: 10.00s",
+    "Local CPU: 2.50s (25%)",
+    "Waiting: 7.50s (75%)",
+    "AWS calls: 4 calls, 9.00s in total",
+  ]
+  # CPU time across threads can exceed the wall time
+  assert TimeSplit(1, 2, 0, 0).waiting == 0
@@ -0,0 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from shared.rate_limiter import RateLimiter
+
+
+def test_rate_limiter() -> None:
+  limiter = RateLimiter(100)
+
+  start = time.monotonic()
+  with ThreadPoolExecutor(max_workers=4) as executor:
+    list(executor.map(lambda _: limiter.wait(), range(11)))
+
+  # The first call is immediate, and the others are spaced 10ms apart
+  assert time.monotonic() - start >= 0.1
@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+from pytest_mock import MockerFixture
+from typing import Any
+
+import pytest
+
+from shared.tracing import (
+  NOOP_SPAN,
+  STATUS_ERROR,
+  Tracer,
+  create_tracer,
+  summarise_traces,
+)
+
+
+def read_spans(lines: list[str]) -> list[dict[str, Any]]:
+  return [
+    span
+    for line in lines
+    for span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+  ]
+
+
+def test_tracer_disabled() -> None:
+  lines: list[str] = []
+  tracer = Tracer(0, lines.append)
+
+  with tracer.span("root") as span:
+    span.set_attribute("key", "value")
+    assert tracer.span("child") is NOOP_SPAN
+
+  assert span is NOOP_SPAN
+  assert lines == []
+
+
+def test_tracer() -> None:
+  lines: list[str] = []
+  tracer = Tracer(1, lines.append)
+
+  with tracer.span("root", flow="CallbackOutbound") as root:
+    root.set_attribute("pages", 2)
+    with tracer.span("child"):
+      pass
+    with pytest.raises(ValueError):
+      with tracer.span("failed"):
+        raise ValueError("broken")
+
+  # The whole trace is exported once the root span ends
+  assert len(lines) == 1
+  child, failed, root_span = read_spans(lines)
+
+  assert root_span["name"] == "root"
+  assert root_span["parentSpanId"] == ""
+  assert root_span["attributes"] == [
+    {"key": "flow", "value": {"stringValue": "CallbackOutbound"}},
+    {"key": "pages", "value": {"intValue": "2"}},
+  ]
+  assert child["parentSpanId"] == root_span["spanId"]
+  assert child["traceId"] == root_span["traceId"]
+  assert int(child["startTimeUnixNano"]) >= int(root_span["startTimeUnixNano"])
+  assert failed["status"]["code"] == STATUS_ERROR
+
+
+def test_tracer_unsampled(mocker: MockerFixture) -> None:
+  lines: list[str] = []
+  tracer = Tracer(0.5, lines.append)
+  mocker.patch("shared.tracing.random.random", return_value=0.9)
+
+  with tracer.span("root"):
+    assert tracer.span("child") is NOOP_SPAN
+
+  assert lines == []
+
+
+def test_summarise_traces(tmp_path: Path) -> None:
+  path = tmp_path.joinpath("traces.jsonl")
+  tracer = create_tracer(1, path)
+
+  for _ in range(3):
+    with tracer.span("root"):
+      with tracer.span("child"):
+        pass
+
+  rows = summarise_traces(path).splitlines()
+  assert [row.split()[:2] for row in rows[1:]] == [["child", "3"], ["root", "3"]]
@@ -4,7 +4,12 @@ from mypy_boto3_connect.type_defs import (
 )
 from pytest_mock import MockerFixture
 
-from shared.utils import create_logical_id, read_parameters, InstanceConfig
+from shared.utils import (
+  create_logical_id,
+  format_table,
+  read_parameters,
+  InstanceConfig,
+)
 
 
 def test_read_parameters(mocker: MockerFixture) -> None:
@@ -51,3 +56,13 @@ def test_instance_config() -> None:
   assert config.instance == mock_instance_summery
   assert config.private_number == mock_private_number
   assert config.public_number == mock_public_number
+
+
+def test_format_table() -> None:
+  assert format_table(
+    [["Name", "Value", "Note"], ["first", "1", ""], ["second", "22", "note"]]
+  ).splitlines() == [
+    "Name    Value  Note",
+    "first   1",
+    "second  22     note",
+  ]
@@ -0,0 +1,96 @@
+from pathlib import Path
+import pytest
+
+from shared.version_store import INDEX_FILE_NAME, MODULE, VersionStore
+
+CONTENT = {"Version": "2019-10-30", "Actions": [{"Identifier": "action-1"}]}
+
+
+def test_put_and_get(tmp_path: Path) -> None:
+  version_store = VersionStore(tmp_path, ".gz")
+
+  content_hash = version_store.put("flow 1", CONTENT, "export", "2024-01-01T00:00:00")
+
+  assert version_store.versions("flow 1") == {"2024-01-01T00:00:00": content_hash}
+  assert (
+    version_store.get("flow 1", "2024-01-01T00:00:00")
+    == '{"Version":"2019-10-30","Actions":[{"Identifier":"action-1"}]}'
+  )
+  assert tmp_path.joinpath("objects", content_hash[:2], f"{content_hash}.gz").exists()
+
+  with pytest.raises(KeyError):
+    version_store.get("flow 1", "2024-01-02T00:00:00")
+
+
+def test_deduplication(tmp_path: Path) -> None:
+  version_store = VersionStore(tmp_path, ".gz")
+
+  first = version_store.put("flow 1", CONTENT, "export", "2024-01-01T00:00:00")
+  second = version_store.put("flow 2", CONTENT, "deploy", "2024-01-02T00:00:00")
+  third = version_store.put("flow 1", {"Version": "2"}, "export", "2024-01-03T00:00:00")
+
+  assert first == second != third
+  assert len(list(tmp_path.glob("objects/*/*"))) == 2
+
+  # The index is reloaded from disk
+  reloaded = VersionStore(tmp_path)
+  assert reloaded.versions("flow 1") == {
+    "2024-01-01T00:00:00": first,
+    "2024-01-03T00:00:00": third,
+  }
+  assert reloaded.get("flow 2", "2024-01-02T00:00:00") == reloaded.get(
+    "flow 1", "2024-01-01T00:00:00"
+  )
+
+
+def test_same_timestamp(tmp_path: Path) -> None:
+  version_store = VersionStore(tmp_path, ".gz")
+
+  first = version_store.put("flow 1", CONTENT, "export", "2024-01-01T00:00:00")
+  second = version_store.put(
+    "flow 1", {"Version": "2"}, "export", "2024-01-01T00:00:00"
+  )
+
+  # The second version is moved on a microsecond rather than replacing the first
+  assert version_store.versions("flow 1") == {
+    "2024-01-01T00:00:00": first,
+    "2024-01-01T00:00:00.000001": second,
+  }
+
+
+def test_resource_types(tmp_path: Path) -> None:
+  version_store = VersionStore(tmp_path, ".gz")
+
+  flow = version_store.put("shared", CONTENT, "export", "2024-01-01T00:00:00")
+  module = version_store.put(
+    "shared", {"Version": "2"}, "export", "2024-01-01T00:00:00", MODULE
+  )
+
+  reloaded = VersionStore(tmp_path)
+  assert reloaded.versions("shared") == {"2024-01-01T00:00:00": flow}
+  assert reloaded.versions("shared", MODULE) == {"2024-01-01T00:00:00": module}
+  assert reloaded.get("shared", "2024-01-01T00:00:00", MODULE) == '{"Version":"2"}'
+
+
+def test_unchanged(tmp_path: Path) -> None:
+  version_store = VersionStore(tmp_path, ".gz")
+
+  first = version_store.put("flow 1", CONTENT, "export", "2024-01-01T00:00:00")
+  version_store.put("flow 1", CONTENT, "deploy", "2024-01-02T00:00:00")
+  second = version_store.put(
+    "flow 1", {"Version": "2"}, "deploy", "2024-01-03T00:00:00"
+  )
+  # Going back to earlier content is a new version
+  version_store.put("flow 1", CONTENT, "deploy", "2024-01-04T00:00:00")
+
+  assert VersionStore(tmp_path).versions("flow 1") == {
+    "2024-01-01T00:00:00": first,
+    "2024-01-03T00:00:00": second,
+    "2024-01-04T00:00:00": first,
+  }
+  assert len(tmp_path.joinpath(INDEX_FILE_NAME).read_text().splitlines()) == 3
+
+
+def test_unsupported_compression(tmp_path: Path) -> None:
+  with pytest.raises(ValueError):
+    VersionStore(tmp_path, ".bz2")
@@ -0,0 +1,965 @@
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import json
+import re
+import threading
+import time
+from typing import Any, Callable, Iterator
+from unittest import mock
+from xml.sax.saxutils import escape
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.client import BaseClient
+from botocore.compat import HTTPHeaders
+from botocore.model import OperationModel, Shape
+
+REGION = "us-east-1"
+ACCOUNT_ID = "123456789012"
+
+# The default page size of each listing, where the caller doesn't pass MaxResults
+PAGE_SIZES = {
+  "ListInstances": 10,
+  "ListPhoneNumbersV2": 100,
+  "ListContactFlows": 100,
+  "ListContactFlowModules": 100,
+  "ListUsers": 100,
+  "ListRoutingProfiles": 100,
+  "ListStacks": 100,
+  "ListStackResources": 100,
+  "DescribeStackEvents": 100,
+}
+
+# The error code and HTTP status of a throttled call to each service
+THROTTLING_ERRORS = {
+  "connect": ("ThrottlingException", 429),
+  "cloudformation": ("Throttling", 400),
+}
+
+TEMPLATE_SECTION_REGEX = re.compile(r"^(\w+):", re.MULTILINE)
+TEMPLATE_KEY_REGEX = re.compile(r"^  (\w+):", re.MULTILINE)
+
+
+class FakeAwsError(Exception):
+  """An error returned by the fake, which is converted to an AWS error response."""
+
+  code: str
+  message: str
+  status: int
+
+  def __init__(self, code: str, message: str, status: int = 400) -> None:
+    """Constructor.
+
+    Args:
+        code (str): The AWS error code, e.g. "ResourceNotFoundException"
+        message (str): The error message
+        status (int, optional): The HTTP status. Defaults to 400.
+    """
+    super().__init__(message)
+    self.code = code
+    self.message = message
+    self.status = status
+
+
+class TokenBucket:
+  """Allows calls at a steady rate, with bursts up to a limit, like the AWS API quotas."""
+
+  rate: float
+  burst: int
+  tokens: float
+  updated: float
+
+  def __init__(self, rate: float, burst: int, now: float) -> None:
+    """Constructor.
+
+    Args:
+        rate (float): The number of calls allowed per second
+        burst (int): The most calls allowed at once
+        now (float): The current time, in seconds
+    """
+    self.rate = rate
+    self.burst = burst
+    self.tokens = burst
+    self.updated = now
+
+  def take(self, now: float) -> bool:
+    """Try to make a call.
+
+    Args:
+        now (float): The current time, in seconds
+
+    Returns:
+        bool: True if the call is allowed, False if it's throttled
+    """
+    self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+    self.updated = now
+
+    if self.tokens < 1:
+      return False
+
+    self.tokens -= 1
+    return True
+
+
+class FakeStack:
+  """The state of a stack in the fake."""
+
+  stack_id: str
+  name: str
+  status: str
+  template: str
+  parameters: dict[str, str]
+  resources: dict[str, str]
+  events: list[dict[str, Any]]
+  creation_time: datetime
+  complete_at: float
+  fail: bool
+
+  def __init__(
+    self, stack_id: str, name: str, template: str, parameters: dict[str, str]
+  ) -> None:
+    """Constructor.
+
+    Args:
+        stack_id (str): The ARN of the stack
+        name (str): The name of the stack
+        template (str): The template body
+        parameters (dict[str, str]): The parameter values, by key
+    """
+    self.stack_id = stack_id
+    self.name = name
+    self.status = "CREATE_IN_PROGRESS"
+    self.template = template
+    self.parameters = parameters
+    self.resources = {}
+    self.events = []
+    self.creation_time = datetime.now(timezone.utc)
+    self.complete_at = 0
+    self.fail = False
+
+
+def _template_keys(template: str, section: str) -> list[str]:
+  """Find the keys of a top level section of a JSON or YAML template, without a YAML parser.
+
+  Args:
+      template (str): The template body
+      section (str): The section, e.g. "Resources"
+
+  Returns:
+      list[str]: The keys in the section
+  """
+  try:
+    return list(json.loads(template).get(section, {}))
+  except ValueError:
+    pass
+
+  sections = list(TEMPLATE_SECTION_REGEX.finditer(template))
+  for index, match in enumerate(sections):
+    if match.group(1) == section:
+      end = sections[index + 1].start() if index + 1 < len(sections) else None
+      return TEMPLATE_KEY_REGEX.findall(template[match.end() : end])
+
+  return []
+
+
+def _json_value(shape: Shape, value: Any) -> Any:
+  # Serialise a value in the rest-json protocol, e.g. for Connect
+  if shape.type_name == "structure":
+    return {
+      key: _json_value(shape.members[key], member_value)  # type: ignore[attr-defined]
+      for key, member_value in value.items()
+    }
+  if shape.type_name == "list":
+    return [_json_value(shape.member, item) for item in value]  # type: ignore[attr-defined]
+  if shape.type_name == "map":
+    return {key: _json_value(shape.value, item) for key, item in value.items()}  # type: ignore[attr-defined]
+  if shape.type_name == "timestamp":
+    return value.timestamp()
+  return value
+
+
+def _xml_value(shape: Shape, value: Any) -> str:
+  # Serialise a value in the query protocol, e.g. for CloudFormation
+  if shape.type_name == "structure":
+    elements = []
+    for key, member_value in value.items():
+      member = shape.members[key]  # type: ignore[attr-defined]
+      name = member.serialization.get("name", key)
+      elements.append(f"<{name}>{_xml_value(member, member_value)}</{name}>")
+    return "".join(elements)
+  if shape.type_name == "list":
+    name = shape.member.serialization.get("name", "member")  # type: ignore[attr-defined]
+    return "".join(
+      f"<{name}>{_xml_value(shape.member, item)}</{name}>"  # type: ignore[attr-defined]
+      for item in value
+    )
+  if shape.type_name == "map":
+    return "".join(
+      f"<entry><key>{escape(key)}</key><value>{_xml_value(shape.value, item)}</value></entry>"  # type: ignore[attr-defined]
+      for key, item in value.items()
+    )
+  if shape.type_name == "timestamp":
+    return str(value.isoformat())
+  if shape.type_name == "boolean":
+    return "true" if value else "false"
+  return escape(str(value))
+
+
+class _RawResponse:
+  """The body of a fake HTTP response."""
+
+  def __init__(self, body: bytes) -> None:
+    """Constructor.
+
+    Args:
+        body (bytes): The body
+    """
+    self.body = body
+
+  def stream(self, **kwargs: Any) -> Iterator[bytes]:
+    """Read the body.
+
+    Args:
+        **kwargs (Any): Ignored streaming options
+
+    Returns:
+        Iterator[bytes]: The body, in one chunk
+    """
+    yield self.body
+
+
+class FakeAws:
+  """An in-process stand-in for the Connect and CloudFormation APIs used by the scripts, for tests and offline benchmarks.
+
+  Responses are serialised to the wire format and returned from botocore's before-send event, so the real clients parse them, paginate, retry, wait and record metrics as they would against AWS.  Listings are paginated with the AWS default page sizes, every call can be delayed to model network latency, operations can be throttled with AWS style token buckets, and stacks move through the in-progress states before completing.
+  """
+
+  latency: float | dict[str, float]
+  rate_limits: dict[str, tuple[float, int]]
+  page_sizes: dict[str, int]
+  stack_transition_time: float
+  clock: Callable[[], float]
+  sleep: Callable[[float], None]
+  calls: Counter[str]
+  service_calls: Counter[str]
+  throttles: Counter[str]
+
+  def __init__(
+    self,
+    instance_alias: str = "alias",
+    latency: float | dict[str, float] = 0,
+    rate_limits: dict[str, tuple[float, int]] = {},
+    page_sizes: dict[str, int] = {},
+    stack_transition_time: float = 0,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+  ) -> None:
+    """Constructor.
+
+    Args:
+        instance_alias (str, optional): The alias of the Connect instance. Defaults to "alias".
+        latency (float | dict[str, float], optional): The delay added to every call, or to each operation by name, in seconds. Defaults to 0.
+        rate_limits (dict[str, tuple[float, int]], optional): The rate and burst limit of each operation by name, with "*" applying to every other operation. Defaults to {}, which never throttles.
+        page_sizes (dict[str, int], optional): Page sizes to use instead of the defaults in PAGE_SIZES. Defaults to {}.
+        stack_transition_time (float, optional): How long stacks stay in progress, in seconds. Defaults to 0, which completes them by the next poll.
+        clock (Callable[[], float], optional): The time used for throttling and stack transitions. Defaults to time.monotonic.
+        sleep (Callable[[float], None], optional): Waits for the latency. Defaults to time.sleep.
+    """
+    self.latency = latency
+    self.rate_limits = rate_limits
+    self.page_sizes = {**PAGE_SIZES, **page_sizes}
+    self.stack_transition_time = stack_transition_time
+    self.clock = clock
+    self.sleep = sleep
+    self.calls = Counter()
+    self.service_calls = Counter()
+    self.throttles = Counter()
+
+    self._lock = threading.Lock()
+    self._params = threading.local()
+    self._buckets: dict[str, TokenBucket] = {}
+    self._next_id = 0
+
+    instance_id = self._new_id()
+    self.instance = {
+      "Id": instance_id,
+      "Arn": f"arn:aws:connect:{REGION}:{ACCOUNT_ID}:instance/{instance_id}",
+      "IdentityManagementType": "CONNECT_MANAGED",
+      "InstanceAlias": instance_alias,
+      "InstanceStatus": "ACTIVE",
+    }
+
+    # Connect resources, in the order they're listed
+    self.phone_numbers: list[dict[str, Any]] = []
+    self.flows: list[dict[str, Any]] = []
+    self.flow_modules: list[dict[str, Any]] = []
+    self.users: list[dict[str, Any]] = []
+    self.routing_profiles: list[dict[str, Any]] = []
+
+    self.content: dict[str, str] = {}
+    self.phone_number_flows: dict[str, str] = {}
+    self.user_routing_profiles: dict[str, str] = {}
+    self.contacts: list[dict[str, Any]] = []
+
+    # Every stack created, including deleted ones, as ListStacks returns them too
+    self.stacks: list[FakeStack] = []
+
+    self._handlers: dict[str, Callable[[dict[str, Any]], dict[str, Any]]] = {
+      "ListInstances": self._list_instances,
+      "ListPhoneNumbersV2": self._list_phone_numbers,
+      "ListContactFlows": self._list_contact_flows,
+      "ListContactFlowModules": self._list_contact_flow_modules,
+      "ListUsers": self._list_users,
+      "ListRoutingProfiles": self._list_routing_profiles,
+      "DescribeContactFlow": self._describe_contact_flow,
+      "DescribeContactFlowModule": self._describe_contact_flow_module,
+      "UpdateContactFlowContent": self._update_contact_flow_content,
+      "AssociatePhoneNumberContactFlow": self._associate_phone_number_contact_flow,
+      "DisassociatePhoneNumberContactFlow": self._disassociate_phone_number_contact_flow,
+      "UpdateUserRoutingProfile": self._update_user_routing_profile,
+      "StartOutboundVoiceContact": self._start_outbound_voice_contact,
+      "ListStacks": self._list_stacks,
+      "ListStackResources": self._list_stack_resources,
+      "DescribeStacks": self._describe_stacks,
+      "DescribeStackEvents": self._describe_stack_events,
+      "GetTemplate": self._get_template,
+      "ValidateTemplate": self._validate_template,
+      "CreateStack": self._create_stack,
+      "UpdateStack": self._update_stack,
+      "DeleteStack": self._delete_stack,
+    }
+
+  def _new_id(self) -> str:
+    # Sequential IDs in the UUID format, so generated instances are deterministic
+    self._next_id += 1
+    return f"{self._next_id:08x}-0000-4000-8000-{self._next_id:012x}"
+
+  def _connect_arn(self, resource: str, resource_id: str) -> str:
+    return f"{self.instance['Arn']}/{resource}/{resource_id}"
+
+  def add_phone_number(
+    self, phone_number: str, number_type: str = "DID"
+  ) -> dict[str, Any]:
+    """Claim a phone number for the instance.
+
+    Args:
+        phone_number (str): The phone number in E.164 format
+        number_type (str, optional): The type of number. Defaults to "DID".
+
+    Returns:
+        dict[str, Any]: The summary of the phone number
+    """
+    phone_number_id = self._new_id()
+    summary = {
+      "PhoneNumberId": phone_number_id,
+      "PhoneNumberArn": f"arn:aws:connect:{REGION}:{ACCOUNT_ID}:phone-number/{phone_number_id}",
+      "PhoneNumber": phone_number,
+      "PhoneNumberCountryCode": "US",
+      "PhoneNumberType": number_type,
+      "TargetArn": self.instance["Arn"],
+      "InstanceId": self.instance["Id"],
+    }
+    self.phone_numbers.append(summary)
+    return summary
+
+  def add_flow(
+    self, name: str, content: str = "{}", flow_type: str = "CONTACT_FLOW"
+  ) -> dict[str, Any]:
+    """Create a contact flow.
+
+    Args:
+        name (str): The name of the flow
+        content (str, optional): The flow content. Defaults to "{}".
+        flow_type (str, optional): The type of flow. Defaults to "CONTACT_FLOW".
+
+    Returns:
+        dict[str, Any]: The summary of the flow
+    """
+    flow_id = self._new_id()
+    summary = {
+      "Id": flow_id,
+      "Arn": self._connect_arn("contact-flow", flow_id),
+      "Name": name,
+      "ContactFlowType": flow_type,
+      "ContactFlowState": "ACTIVE",
+      "ContactFlowStatus": "PUBLISHED",
+    }
+    self.flows.append(summary)
+    self.content[flow_id] = content
+    return summary
+
+  def add_flow_module(self, name: str, content: str = "{}") -> dict[str, Any]:
+    """Create a contact flow module.
+
+    Args:
+        name (str): The name of the module
+        content (str, optional): The module content. Defaults to "{}".
+
+    Returns:
+        dict[str, Any]: The summary of the module
+    """
+    module_id = self._new_id()
+    summary = {
+      "Id": module_id,
+      "Arn": self._connect_arn("flow-module", module_id),
+      "Name": name,
+      "State": "ACTIVE",
+    }
+    self.flow_modules.append(summary)
+    self.content[module_id] = content
+    return summary
+
+  def add_user(self, username: str) -> dict[str, Any]:
+    """Create a user.
+
+    Args:
+        username (str): The username
+
+    Returns:
+        dict[str, Any]: The summary of the user
+    """
+    user_id = self._new_id()
+    summary = {
+      "Id": user_id,
+      "Arn": self._connect_arn("agent", user_id),
+      "Username": username,
+    }
+    self.users.append(summary)
+    return summary
+
+  def add_routing_profile(self, name: str) -> dict[str, Any]:
+    """Create a routing profile.
+
+    Args:
+        name (str): The name of the routing profile
+
+    Returns:
+        dict[str, Any]: The summary of the routing profile
+    """
+    routing_profile_id = self._new_id()
+    summary = {
+      "Id": routing_profile_id,
+      "Arn": self._connect_arn("routing-profile", routing_profile_id),
+      "Name": name,
+    }
+    self.routing_profiles.append(summary)
+    return summary
+
+  def fail_deletion(self, stack_name: str) -> None:
+    """Make the next deletion of a stack fail.
+
+    Args:
+        stack_name (str): The name of the stack
+    """
+    with self._lock:
+      self._get_stack(stack_name).fail = True
+
+  def install(self, client: BaseClient) -> None:
+    """Send a client's calls to the fake rather than AWS.
+
+    Args:
+        client (BaseClient): The boto3 client
+    """
+    service = client.meta.service_model.service_name
+    service_model = client.meta.service_model
+
+    def capture_params(params: dict[str, Any], **kwargs: Any) -> None:
+      # The request is already serialised by before-send, so keep the parameters for it
+      self._params.value = dict(params)
+
+    def send(event_name: str, **kwargs: Any) -> Any:
+      operation = event_name.split(".")[-1]
+      return self._send(
+        service, service_model.operation_model(operation), self._params.value
+      )
+
+    client.meta.events.register(f"before-parameter-build.{service}.*", capture_params)
+    client.meta.events.register(f"before-send.{service}.*", send)
+
+  @contextmanager
+  def patch(self) -> Iterator["FakeAws"]:
+    """Send the calls of every boto3 client created in the context to the fake, e.g. the clients created by the scripts.
+
+    Returns:
+        Iterator[FakeAws]: The context, with the fake
+    """
+    create_client = boto3.session.Session.client
+
+    def client(
+      session: boto3.session.Session, service_name: str, *args: Any, **kwargs: Any
+    ) -> BaseClient:
+      # Fake credentials, so the requests can be signed without any configuration
+      kwargs.setdefault("region_name", session.region_name or REGION)
+      kwargs.setdefault("aws_access_key_id", "fake")
+      kwargs.setdefault("aws_secret_access_key", "fake")
+      new_client: BaseClient = create_client(session, service_name, *args, **kwargs)  # type: ignore[call-overload]
+      self.install(new_client)
+      return new_client
+
+    with mock.patch.object(boto3.session.Session, "client", client):
+      yield self
+
+  def _throttled(self, operation: str) -> bool:
+    # Must be called with the lock held
+    limit = self.rate_limits.get(operation) or self.rate_limits.get("*")
+    if limit is None:
+      return False
+
+    now = self.clock()
+    if operation not in self._buckets:
+      self._buckets[operation] = TokenBucket(*limit, now)
+
+    return not self._buckets[operation].take(now)
+
+  def _send(
+    self, service: str, operation_model: OperationModel, params: dict[str, Any]
+  ) -> AWSResponse:
+    operation = operation_model.name
+    latency = (
+      self.latency.get(operation, 0) if isinstance(self.latency, dict) else self.latency
+    )
+    if latency:
+      # Outside the lock, so concurrent calls overlap like they would over the network
+      self.sleep(latency)
+
+    with self._lock:
+      self.calls[operation] += 1
+      self.service_calls[service] += 1
+
+      try:
+        if self._throttled(operation):
+          self.throttles[operation] += 1
+          code, status = THROTTLING_ERRORS[service]
+          raise FakeAwsError(code, "Rate exceeded", status)
+        if operation not in self._handlers:
+          raise FakeAwsError(
+            "InvalidAction", f"{operation} isn't supported by the fake"
+          )
+
+        result = self._handlers[operation](params)
+      except FakeAwsError as error:
+        return self._error_response(service, operation_model, error)
+
+    return self._response(service, operation_model, result)
+
+  def _response(
+    self, service: str, operation_model: OperationModel, result: dict[str, Any]
+  ) -> AWSResponse:
+    request_id = self._new_id()
+    output_shape = operation_model.output_shape
+
+    if operation_model.metadata["protocol"] == "query":
+      name = operation_model.name
+      namespace = operation_model.metadata.get("xmlNamespace", "")
+      body = f'<{name}Response xmlns="{namespace}">'
+      if output_shape is not None:
+        wrapper = output_shape.serialization.get("resultWrapper", f"{name}Result")
+        body += f"<{wrapper}>{_xml_value(output_shape, result)}</{wrapper}>"
+      body += f"<ResponseMetadata><RequestId>{request_id}</RequestId></ResponseMetadata></{name}Response>"
+      headers = {"Content-Type": "text/xml", "x-amzn-RequestId": request_id}
+    else:
+      body = json.dumps(_json_value(output_shape, result) if output_shape else {})
+      headers = {"Content-Type": "application/json", "x-amzn-RequestId": request_id}
+
+    return AWSResponse(
+      f"https://{service}.{REGION}.amazonaws.com/",
+      200,
+      HTTPHeaders.from_dict(headers),
+      _RawResponse(body.encode()),
+    )
+
+  def _error_response(
+    self, service: str, operation_model: OperationModel, error: FakeAwsError
+  ) -> AWSResponse:
+    request_id = self._new_id()
+
+    if operation_model.metadata["protocol"] == "query":
+      namespace = operation_model.metadata.get("xmlNamespace", "")
+      body = (
+        f'<ErrorResponse xmlns="{namespace}"><Error><Type>Sender</Type>'
+        f"<Code>{error.code}</Code><Message>{escape(error.message)}</Message></Error>"
+        f"<RequestId>{request_id}</RequestId></ErrorResponse>"
+      )
+      headers = {"Content-Type": "text/xml", "x-amzn-RequestId": request_id}
+    else:
+      body = json.dumps({"Message": error.message})
+      headers = {
+        "Content-Type": "application/json",
+        "x-amzn-RequestId": request_id,
+        "x-amzn-ErrorType": error.code,
+      }
+
+    return AWSResponse(
+      f"https://{service}.{REGION}.amazonaws.com/",
+      error.status,
+      HTTPHeaders.from_dict(headers),
+      _RawResponse(body.encode()),
+    )
+
+  def _paginate(
+    self,
+    operation: str,
+    params: dict[str, Any],
+    items: list[dict[str, Any]],
+    key: str,
+  ) -> dict[str, Any]:
+    page_size = min(
+      params.get("MaxResults", self.page_sizes[operation]),
+      self.page_sizes[operation],
+    )
+    start = int(params.get("NextToken", 0))
+    end = start + page_size
+
+    page: dict[str, Any] = {key: items[start:end]}
+    if end < len(items):
+      page["NextToken"] = str(end)
+    return page
+
+  def _check_instance(self, params: dict[str, Any]) -> None:
+    instance = params.get("InstanceId") or params.get("TargetArn")
+    if instance not in (self.instance["Id"], self.instance["Arn"]):
+      raise FakeAwsError(
+        "ResourceNotFoundException", f"Instance {instance} not found", 404
+      )
+
+  def _find(
+    self, resources: list[dict[str, Any]], key: str, value: str
+  ) -> dict[str, Any]:
+    for resource in resources:
+      if value in (resource[key], resource.get("Arn")):
+        return resource
+
+    raise FakeAwsError("ResourceNotFoundException", f"{value} not found", 404)
+
+  # Connect operations
+
+  def _list_instances(self, params: dict[str, Any]) -> dict[str, Any]:
+    return self._paginate(
+      "ListInstances",
+      params,
+      [{**self.instance, "CreatedTime": datetime.now(timezone.utc)}],
+      "InstanceSummaryList",
+    )
+
+  def _list_phone_numbers(self, params: dict[str, Any]) -> dict[str, Any]:
+    self._check_instance(params)
+    return self._paginate(
+      "ListPhoneNumbersV2", params, self.phone_numbers, "ListPhoneNumbersSummaryList"
+    )
+
+  def _list_contact_flows(self, params: dict[str, Any]) -> dict[str, Any]:
+    self._check_instance(params)
+    return self._paginate(
+      "ListContactFlows", params, self.flows, "ContactFlowSummaryList"
+    )
+
+  def _list_contact_flow_modules(self, params: dict[str, Any]) -> dict[str, Any]:
+    self._check_instance(params)
+    return self._paginate(
+      "ListContactFlowModules",
+      params,
+      self.flow_modules,
+      "ContactFlowModulesSummaryList",
+    )
+
+  def _list_users(self, params: dict[str, Any]) -> dict[str, Any]:
+    self._check_instance(params)
+    return self._paginate("ListUsers", params, self.users, "UserSummaryList")
+
+  def _list_routing_profiles(self, params: dict[str, Any]) -> dict[str, Any]:
+    self._check_instance(params)
+    return self._paginate(
+      "ListRoutingProfiles",
+      params,
+      self.routing_profiles,
+      "RoutingProfileSummaryList",
+    )
+
+  def _describe_contact_flow(self, params: dict[str, Any]) -> dict[str, Any]:
+    self._check_instance(params)
+    flow = self._find(self.flows, "Id", params["ContactFlowId"])
+    return {
+      "ContactFlow": {
+        "Arn": flow["Arn"],
+        "Id": flow["Id"],
+        "Name": flow["Name"],
+        "Type": flow["ContactFlowType"],
+        "State": flow["ContactFlowState"],
+        "Status": flow["ContactFlowStatus"],
+        "Content": self.content[flow["Id"]],
+      }
+    }
+
+  def _describe_contact_flow_module(self, params: dict[str, Any]) -> dict[str, Any]:
+    self._check_instance(params)
+    module = self._find(self.flow_modules, "Id", params["ContactFlowModuleId"])
+    return {
+      "ContactFlowModule": {
+        "Arn": module["Arn"],
+        "Id": module["Id"],
+        "Name": module["Name"],
+        "State": module["State"],
+        "Status": "PUBLISHED",
+        "Content": self.content[module["Id"]],
+      }
+    }
+
+  def _update_contact_flow_content(self, params: dict[str, Any]) -> dict[str, Any]:
+    self._check_instance(params)
+    flow = self._find(self.flows, "Id", params["ContactFlowId"])
+    self.content[flow["Id"]] = params["Content"]
+    return {}
+
+  def _associate_phone_number_contact_flow(
+    self, params: dict[str, Any]
+  ) -> dict[str, Any]:
+    self._check_instance(params)
+    number = self._find(self.phone_numbers, "PhoneNumberId", params["PhoneNumberId"])
+    flow = self._find(self.flows, "Id", params["ContactFlowId"])
+    self.phone_number_flows[number["PhoneNumberId"]] = flow["Id"]
+    return {}
+
+  def _disassociate_phone_number_contact_flow(
+    self, params: dict[str, Any]
+  ) -> dict[str, Any]:
+    self._check_instance(params)
+    number = self._find(self.phone_numbers, "PhoneNumberId", params["PhoneNumberId"])
+    self.phone_number_flows.pop(number["PhoneNumberId"], None)
+    return {}
+
+  def _update_user_routing_profile(self, params: dict[str, Any]) -> dict[str, Any]:
+    self._check_instance(params)
+    user = self._find(self.users, "Id", params["UserId"])
+    routing_profile = self._find(
+      self.routing_profiles, "Id", params["RoutingProfileId"]
+    )
+    self.user_routing_profiles[user["Id"]] = routing_profile["Id"]
+    return {}
+
+  def _start_outbound_voice_contact(self, params: dict[str, Any]) -> dict[str, Any]:
+    self._check_instance(params)
+    self._find(self.flows, "Id", params["ContactFlowId"])
+    contact = {**params, "ContactId": self._new_id()}
+    self.contacts.append(contact)
+    return {"ContactId": contact["ContactId"]}
+
+  # CloudFormation operations
+
+  def _get_stack(self, stack_name: str) -> FakeStack:
+    # Deleted stacks can only be found by ID
+    for stack in reversed(self.stacks):
+      if stack.stack_id == stack_name or (
+        stack.name == stack_name and stack.status != "DELETE_COMPLETE"
+      ):
+        self._refresh(stack)
+        return stack
+
+    raise FakeAwsError("ValidationError", f"Stack with id {stack_name} does not exist")
+
+  def _add_event(
+    self,
+    stack: FakeStack,
+    logical_id: str,
+    status: str,
+    reason: str | None = None,
+  ) -> None:
+    event = {
+      "StackId": stack.stack_id,
+      "EventId": self._new_id(),
+      "StackName": stack.name,
+      "LogicalResourceId": logical_id,
+      "PhysicalResourceId": stack.resources.get(logical_id, stack.stack_id),
+      "ResourceType": "AWS::CloudFormation::Stack"
+      if logical_id == stack.name
+      else "AWS::Connect::ContactFlow",
+      "Timestamp": datetime.now(timezone.utc),
+      "ResourceStatus": status,
+    }
+    if reason:
+      event["ResourceStatusReason"] = reason
+
+    # Events are listed newest first
+    stack.events.insert(0, event)
+
+  def _start_transition(self, stack: FakeStack, status: str, reason: str) -> None:
+    stack.status = status
+    stack.complete_at = self.clock() + self.stack_transition_time
+    self._add_event(stack, stack.name, status, reason)
+
+  def _refresh(self, stack: FakeStack) -> None:
+    # Complete an in-progress operation once its time has passed
+    if not stack.status.endswith("_IN_PROGRESS") or self.clock() < stack.complete_at:
+      return
+
+    operation = stack.status.removesuffix("_IN_PROGRESS")
+
+    if operation == "DELETE" and stack.fail:
+      stack.fail = False
+      stack.status = "DELETE_FAILED"
+      self._add_event(
+        stack, stack.name, stack.status, "The following resource(s) failed to delete"
+      )
+      return
+
+    for logical_id in stack.resources:
+      self._add_event(stack, logical_id, f"{operation}_IN_PROGRESS")
+      self._add_event(stack, logical_id, f"{operation}_COMPLETE")
+
+    stack.status = f"{operation}_COMPLETE"
+    self._add_event(stack, stack.name, stack.status)
+
+  def _list_stacks(self, params: dict[str, Any]) -> dict[str, Any]:
+    status_filter = params.get("StackStatusFilter")
+    summaries = []
+
+    for stack in reversed(self.stacks):
+      self._refresh(stack)
+      if status_filter and stack.status not in status_filter:
+        continue
+
+      summary: dict[str, Any] = {
+        "StackId": stack.stack_id,
+        "StackName": stack.name,
+        "CreationTime": stack.creation_time,
+        "StackStatus": stack.status,
+      }
+      if stack.status == "DELETE_COMPLETE":
+        summary["DeletionTime"] = stack.events[0]["Timestamp"]
+      summaries.append(summary)
+
+    return self._paginate("ListStacks", params, summaries, "StackSummaries")
+
+  def _list_stack_resources(self, params: dict[str, Any]) -> dict[str, Any]:
+    stack = self._get_stack(params["StackName"])
+    resources = [
+      {
+        "LogicalResourceId": logical_id,
+        "PhysicalResourceId": physical_id,
+        "ResourceType": "AWS::Connect::ContactFlow",
+        "LastUpdatedTimestamp": stack.creation_time,
+        "ResourceStatus": stack.status,
+      }
+      for logical_id, physical_id in stack.resources.items()
+    ]
+    return self._paginate(
+      "ListStackResources", params, resources, "StackResourceSummaries"
+    )
+
+  def _describe_stacks(self, params: dict[str, Any]) -> dict[str, Any]:
+    stacks = (
+      [self._get_stack(params["StackName"])]
+      if params.get("StackName")
+      else [stack for stack in self.stacks if stack.status != "DELETE_COMPLETE"]
+    )
+
+    return {
+      "Stacks": [
+        {
+          "StackId": stack.stack_id,
+          "StackName": stack.name,
+          "CreationTime": stack.creation_time,
+          "StackStatus": stack.status,
+          "Parameters": [
+            {"ParameterKey": key, "ParameterValue": value}
+            for key, value in stack.parameters.items()
+          ],
+        }
+        for stack in stacks
+      ]
+    }
+
+  def _describe_stack_events(self, params: dict[str, Any]) -> dict[str, Any]:
+    stack = self._get_stack(params["StackName"])
+    return self._paginate(
+      "DescribeStackEvents", params, list(stack.events), "StackEvents"
+    )
+
+  def _get_template(self, params: dict[str, Any]) -> dict[str, Any]:
+    return {"TemplateBody": self._get_stack(params["StackName"]).template}
+
+  def _validate_template(self, params: dict[str, Any]) -> dict[str, Any]:
+    return {
+      "Parameters": [
+        {"ParameterKey": key, "NoEcho": False}
+        for key in _template_keys(params["TemplateBody"], "Parameters")
+      ],
+      "Capabilities": [],
+    }
+
+  def _stack_parameters(
+    self, params: dict[str, Any], previous: dict[str, str]
+  ) -> dict[str, str]:
+    return {
+      parameter["ParameterKey"]: previous[parameter["ParameterKey"]]
+      if parameter.get("UsePreviousValue")
+      else parameter["ParameterValue"]
+      for parameter in params.get("Parameters", [])
+    }
+
+  def _set_resources(self, stack: FakeStack) -> None:
+    # Every resource is modelled as a contact flow named after it, so the scripts can use the flows they deploy
+    stack.resources = {
+      logical_id: stack.resources.get(logical_id) or self.add_flow(logical_id)["Arn"]
+      for logical_id in _template_keys(stack.template, "Resources")
+    }
+
+  def _create_stack(self, params: dict[str, Any]) -> dict[str, Any]:
+    try:
+      self._get_stack(params["StackName"])
+    except FakeAwsError:
+      pass
+    else:
+      raise FakeAwsError(
+        "AlreadyExistsException", f"Stack [{params['StackName']}] already exists"
+      )
+
+    stack_id = f"arn:aws:cloudformation:{REGION}:{ACCOUNT_ID}:stack/{params['StackName']}/{self._new_id()}"
+    stack = FakeStack(
+      stack_id,
+      params["StackName"],
+      params["TemplateBody"],
+      self._stack_parameters(params, {}),
+    )
+    self._set_resources(stack)
+    self.stacks.append(stack)
+    self._start_transition(stack, "CREATE_IN_PROGRESS", "User Initiated")
+
+    return {"StackId": stack_id}
+
+  def _update_stack(self, params: dict[str, Any]) -> dict[str, Any]:
+    stack = self._get_stack(params["StackName"])
+    if stack.status.endswith("_IN_PROGRESS"):
+      raise FakeAwsError(
+        "ValidationError",
+        f"Stack:{stack.stack_id} is in {stack.status} state and can not be updated.",
+      )
+
+    template = (
+      stack.template
+      if params.get("UsePreviousTemplate")
+      else params.get("TemplateBody", stack.template)
+    )
+    parameters = self._stack_parameters(params, stack.parameters)
+
+    if template == stack.template and parameters == stack.parameters:
+      raise FakeAwsError("ValidationError", "No updates are to be performed.")
+
+    stack.template = template
+    stack.parameters = parameters
+    self._set_resources(stack)
+    self._start_transition(stack, "UPDATE_IN_PROGRESS", "User Initiated")
+
+    return {"StackId": stack.stack_id}
+
+  def _delete_stack(self, params: dict[str, Any]) -> dict[str, Any]:
+    try:
+      stack = self._get_stack(params["StackName"])
+    except FakeAwsError:
+      # Deleting a stack that doesn't exist succeeds
+      return {}
+
+    if stack.status not in ("DELETE_IN_PROGRESS", "DELETE_COMPLETE"):
+      self._start_transition(stack, "DELETE_IN_PROGRESS", "User Initiated")
+
+    return {}
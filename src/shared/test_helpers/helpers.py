@@ -1,19 +1,40 @@
 from contextlib import contextmanager
-from typing import Any, Callable
+from datetime import datetime
+import sys
+from typing import Any, Callable, Iterator
+from unittest.mock import MagicMock
 from mypy_boto3_cloudformation.type_defs import (
   ParameterTypeDef,
+  StackSummaryTypeDef,
   ValidateTemplateOutputTypeDef,
 )
 from mypy_boto3_connect.type_defs import (
+  ContactFlowModuleSummaryTypeDef,
+  ContactFlowModuleTypeDef,
   InstanceSummaryTypeDef,
   ListPhoneNumbersSummaryTypeDef,
   ContactFlowTypeDef,
+  RoutingProfileSummaryTypeDef,
+  UserSummaryTypeDef,
   ContactFlowSummaryTypeDef,
   StartOutboundVoiceContactResponseTypeDef,
 )
 
+from pytest_mock import MockerFixture
+
+from shared.test_helpers.fake_aws import FakeAws
 from shared.utils import StackConfig
 
+# Parameters from the .env file
+MOCK_PARAMETERS = {
+  "InstanceAlias": "alias",
+  "PrivateNumber": "private",
+  "PublicNumber": "public",
+  "AgentUsername": "agent",
+  "CustomerNumber": "customer",
+  "DefaultRoutingProfile": "routing",
+}
+
 
 @contextmanager
 def not_raises() -> Any:
@@ -31,6 +52,56 @@ def not_raises() -> Any:
     raise AssertionError(f"An unexpected exception {error} raised.")
 
 
+def assert_call_budget(
+  fake: FakeAws, service: str, max_api_calls: int, max_calls: dict[str, int] = {}
+) -> None:
+  """Check a script didn't make more AWS calls than expected, e.g. after a refactor that repeats a listing.
+
+  Args:
+      fake (FakeAws): The fake the script's clients sent their calls to
+      service (str): The service, e.g. "connect"
+      max_api_calls (int): The most calls the script should have made to the service
+      max_calls (dict[str, int], optional): The most calls of specific operations, e.g. {"ListUsers": 1}. Defaults to {}.
+
+  Raises:
+      AssertionError: The script made more calls than the budget allows
+  """
+  api_calls = fake.service_calls[service]
+  assert api_calls <= max_api_calls, (
+    f"{api_calls} {service} calls exceeds the budget of {max_api_calls}: {fake.calls}"
+  )
+
+  for operation, max_count in max_calls.items():
+    count = fake.calls[operation]
+    assert count <= max_count, (
+      f"{operation} called {count} times, exceeding the budget of {max_count}"
+    )
+
+
+def patch_client(
+  mocker: MockerFixture, client_class: type, mock_client: object
+) -> MagicMock:
+  """Make every client of a type that's created return a mock client instead.
+
+  The class is replaced in each module that has imported it, rather than patching its __new__, which Python can't fully undo for a class that doesn't define __new__ itself.
+
+  Args:
+      mocker (MockerFixture): The mocker
+      client_class (type): The client class, e.g. ConnectClient
+      mock_client (object): The mock client
+
+  Returns:
+      MagicMock: The replacement class, which records the arguments each client is created with
+  """
+  factory = MagicMock(return_value=mock_client)
+
+  for module in list(sys.modules.values()):
+    if getattr(module, "__dict__", {}).get(client_class.__name__) is client_class:
+      mocker.patch.object(module, client_class.__name__, factory)
+
+  return factory
+
+
 class MockCloudformationClient:
   """Mocks a cloudformation client."""
 
@@ -93,7 +164,7 @@ class MockCloudformationClient:
         {"ParameterKey": "PublicNumberArn", "ParameterValue": "public arn"},
       ]
       assert parameters[-1]["ParameterKey"] == "CallbackInboundContent"
-      assert parameters[-1]["ParameterValue"].startswith('{\n  "Version":')
+      assert parameters[-1]["ParameterValue"].startswith('{"Version":')
     self.calls.append("deploy_stack")
 
   def get_stack_resource_mapping(self, stack_name: str) -> dict[str, str]:
@@ -110,6 +181,89 @@ class MockCloudformationClient:
     self.calls.append("get_stack_resource_mapping")
     return {"new resource 1": "new arn1", "new resource 2": "new arn2"}
 
+  def get_stack_summary(self, stack_name: str) -> StackSummaryTypeDef:
+    """Retrieve the summary of a stack matching the given name.
+
+    Args:
+        stack_name (str): The name of the stack
+
+    Returns:
+        StackSummaryTypeDef: The summary of the stack
+    """
+    self.calls.append("get_stack_summary")
+    return {
+      "StackName": stack_name,
+      "CreationTime": datetime(2024, 1, 1),
+      "StackStatus": "CREATE_COMPLETE",
+    }
+
+  def get_stack_parameters(self, stack_name: str) -> dict[str, str]:
+    """Retrieve the current parameter values of a stack.
+
+    Args:
+        stack_name (str): The name of the stack
+
+    Returns:
+        dict[str, str]: A mapping of parameter keys to values
+    """
+    if self.assert_parameters:
+      assert stack_name == "stack1"
+    self.calls.append("get_stack_parameters")
+    return {
+      "InstanceArn": "instance arn",
+      "PrivateNumberArn": "private arn",
+      "PublicNumberArn": "public arn",
+    }
+
+  def get_stack_template(self, stack_name: str) -> str:
+    """Retrieve the template that a stack was deployed with.
+
+    Args:
+        stack_name (str): The name of the stack
+
+    Returns:
+        str: The cloudformation template
+    """
+    if self.assert_parameters:
+      assert stack_name == "stack1"
+    self.calls.append("get_stack_template")
+    return "template body"
+
+  def update_stack_parameters(
+    self, stack_name: str, parameters: list[ParameterTypeDef], wait: bool = False
+  ) -> bool:
+    """Start an update of some of a stack's parameters, keeping its template and any other parameter values.
+
+    Args:
+        stack_name (str): The name of the stack
+        parameters (list[ParameterTypeDef]): The parameters to update
+        wait (bool, optional): Whether to wait for the update to complete. Defaults to False.
+
+    Returns:
+        bool: True, as an update is always started
+    """
+    if self.assert_parameters:
+      assert stack_name == "stack1"
+    self.calls.append("update_stack_parameters")
+    return True
+
+  def delete_stack(self, stack_name: str) -> bool:
+    """Delete a stack, waiting for the deletion to complete.
+
+    Args:
+        stack_name (str): The name of the stack
+
+    Raises:
+        RuntimeError: The stack is named "broken"
+
+    Returns:
+        bool: True if the stack was deleted, False if it didn't exist
+    """
+    if "broken" in stack_name:
+      raise RuntimeError("delete failed")
+    self.calls.append(f"delete_stack {stack_name}")
+    return True
+
   def _get_summary(
     self,
     list_function: str,
@@ -161,6 +315,53 @@ class MockConnectClient:
     assert routing_profile_name in ["routing", "Callback Routing Profile"]
     self.calls.append("assign_user_to_routing_profile")
 
+  def get_user_summaries(self, usernames: list[str]) -> list[UserSummaryTypeDef | None]:
+    """Retrieve the summaries of instance users matching the given usernames.
+
+    Args:
+        usernames (list[str]): A list of usernames
+
+    Returns:
+        list[UserSummaryTypeDef | None]: The summaries of the users, or None for users that don't exist
+    """
+    self.calls.append("get_user_summaries")
+
+    return [
+      None if username == "missing" else {"Id": f"{username} id", "Username": username}
+      for username in usernames
+    ]
+
+  def get_routing_profile_summary(
+    self, routing_profile_name: str
+  ) -> RoutingProfileSummaryTypeDef | None:
+    """Retrieve the summary of the instance routing profile with the given name.
+
+    Args:
+        routing_profile_name (str): The name of the routing profile
+
+    Returns:
+        RoutingProfileSummaryTypeDef | None: The summary of the routing profile, or None if it doesn't exist
+    """
+    assert routing_profile_name in ["routing", "Callback Routing Profile", "missing"]
+    self.calls.append("get_routing_profile_summary")
+
+    if routing_profile_name == "missing":
+      return None
+
+    return {"Id": "routing profile id", "Name": routing_profile_name}
+
+  def update_user_routing_profile(self, user_id: str, routing_profile_id: str) -> None:
+    """Assign a Connect user to a routing profile by ID.
+
+    Args:
+        user_id (str): The ID of the user
+        routing_profile_id (str): The ID of the routing profile
+    """
+    assert routing_profile_id == "routing profile id"
+    if user_id == "broken id":
+      raise Exception("update failed")
+    self.calls.append("update_user_routing_profile")
+
   def assign_contact_flow_number(self, flow_name: str, phone_number: str) -> None:
     """Assign a phone number to a contact flow.
 
@@ -172,6 +373,26 @@ class MockConnectClient:
     assert phone_number == "private"
     self.calls.append("assign_contact_flow_number")
 
+  def associate_phone_number_flow(self, phone_number_id: str, flow_id: str) -> None:
+    """Assign a phone number to a contact flow by ID.
+
+    Args:
+        phone_number_id (str): The ID of the phone number
+        flow_id (str): The ID or ARN of the contact flow
+    """
+    assert phone_number_id == "private id"
+    assert flow_id == "flow arn"
+    self.calls.append("associate_phone_number_flow")
+
+  def disassociate_phone_number_flow(self, phone_number_id: str) -> None:
+    """Remove a phone number from a contact flow by ID.
+
+    Args:
+        phone_number_id (str): The ID of the phone number
+    """
+    assert phone_number_id == "private id"
+    self.calls.append("disassociate_phone_number_flow")
+
   def get_phone_number_summaries(
     self, phone_numbers: list[str]
   ) -> list[ListPhoneNumbersSummaryTypeDef]:
@@ -190,10 +411,12 @@ class MockConnectClient:
       {
         "PhoneNumber": "number 1",
         "PhoneNumberArn": "private arn",
+        "PhoneNumberId": "private id",
       },
       {
         "PhoneNumber": "number 2",
         "PhoneNumberArn": "public arn",
+        "PhoneNumberId": "public id",
       },
     ]
 
@@ -252,6 +475,52 @@ class MockConnectClient:
       "Content": '{"Message":"mock flow content"}',
     }
 
+  def update_contact_flow_content(self, flow_arn: str, content: str) -> None:
+    """Replace the content of a contact flow, publishing it immediately.
+
+    Args:
+        flow_arn (str): The ARN of the flow
+        content (str): The new content of the flow, as a JSON string
+    """
+    assert flow_arn == "flow arn"
+    self.calls.append("update_contact_flow_content")
+
+  def list_contact_flows(self) -> Iterator[ContactFlowSummaryTypeDef]:
+    """List every contact flow in the instance.
+
+    Yields:
+        Iterator[ContactFlowSummaryTypeDef]: The summary of each contact flow
+    """
+    self.calls.append("list_contact_flows")
+    yield {"Name": "CallbackInbound", "Arn": "flow arn"}
+    yield {"Name": "Sales/Queue: Main", "Arn": "flow arn"}
+
+  def list_contact_flow_modules(self) -> Iterator[ContactFlowModuleSummaryTypeDef]:
+    """List every contact flow module in the instance.
+
+    Yields:
+        Iterator[ContactFlowModuleSummaryTypeDef]: The summary of each contact flow module
+    """
+    self.calls.append("list_contact_flow_modules")
+    yield {"Name": "Module", "Arn": "module arn"}
+
+  def get_contact_flow_module(self, module_arn: str) -> ContactFlowModuleTypeDef:
+    """Retrieve all details of a contact flow module from the ARN.
+
+    Args:
+        module_arn (str): The ARN of the flow module
+
+    Returns:
+        ContactFlowModuleTypeDef: The contact flow module details
+    """
+    assert module_arn == "module arn"
+    self.calls.append("get_contact_flow_module")
+    return {
+      "Arn": "module arn",
+      "Name": "Module",
+      "Content": '{"Message":"mock module content"}',
+    }
+
   def start_outbound(
     self,
     flow_name: str,
@@ -0,0 +1,105 @@
+import random
+from typing import Any
+
+from shared.test_helpers.fake_aws import FakeAws
+from shared.utils import FLOW_NAMES
+
+# The size of a large customer instance
+DEFAULT_USERS = 50000
+DEFAULT_FLOWS = 5000
+DEFAULT_PHONE_NUMBERS = 10000
+DEFAULT_ROUTING_PROFILES = 500
+
+DEPARTMENTS = ["Sales", "Support", "Billing", "Claims", "Retention", "Onboarding"]
+SITES = ["London", "Sydney", "Austin", "Dublin", "Toronto"]
+
+
+class SyntheticInstance:
+  """A generated Connect instance in a fake, with the names of its resources in the order they're listed."""
+
+  fake: FakeAws
+  usernames: list[str]
+  flow_names: list[str]
+  phone_numbers: list[str]
+  routing_profile_names: list[str]
+
+  def __init__(
+    self,
+    fake: FakeAws,
+    usernames: list[str],
+    flow_names: list[str],
+    phone_numbers: list[str],
+    routing_profile_names: list[str],
+  ) -> None:
+    """Constructor.
+
+    Args:
+        fake (FakeAws): The fake, holding the instance
+        usernames (list[str]): The usernames, in listing order
+        flow_names (list[str]): The contact flow names, in listing order
+        phone_numbers (list[str]): The phone numbers, in listing order
+        routing_profile_names (list[str]): The routing profile names, in listing order
+    """
+    self.fake = fake
+    self.usernames = usernames
+    self.flow_names = flow_names
+    self.phone_numbers = phone_numbers
+    self.routing_profile_names = routing_profile_names
+
+
+def generate_instance(
+  users: int = DEFAULT_USERS,
+  flows: int = DEFAULT_FLOWS,
+  phone_numbers: int = DEFAULT_PHONE_NUMBERS,
+  routing_profiles: int = DEFAULT_ROUTING_PROFILES,
+  seed: int = 0,
+  **fake_options: Any,
+) -> SyntheticInstance:
+  """Generate a large Connect instance in a fake, which is the same every time for the same arguments.
+
+  The instance includes the system's contact flows at random positions in the listing, as they would be in a customer instance.
+
+  Args:
+      users (int, optional): The number of users. Defaults to DEFAULT_USERS.
+      flows (int, optional): The number of contact flows, including the system's flows. Defaults to DEFAULT_FLOWS.
+      phone_numbers (int, optional): The number of phone numbers. Defaults to DEFAULT_PHONE_NUMBERS.
+      routing_profiles (int, optional): The number of routing profiles. Defaults to DEFAULT_ROUTING_PROFILES.
+      seed (int, optional): The seed of the generated names and order. Defaults to 0.
+      **fake_options (Any): Options for the fake, e.g. latency or page_sizes
+
+  Returns:
+      SyntheticInstance: The generated instance
+  """
+  rng = random.Random(seed)
+  fake = FakeAws(**fake_options)
+
+  usernames = [
+    f"{rng.choice(DEPARTMENTS).lower()}.agent{index:05d}" for index in range(users)
+  ]
+  rng.shuffle(usernames)
+
+  flow_names = [
+    f"{rng.choice(DEPARTMENTS)} {rng.choice(SITES)} Flow {index:04d}"
+    for index in range(flows - len(FLOW_NAMES))
+  ]
+  for flow_name in FLOW_NAMES.values():
+    flow_names.insert(rng.randrange(len(flow_names) + 1), flow_name)
+
+  numbers = [f"+1555{index:07d}" for index in range(phone_numbers)]
+  rng.shuffle(numbers)
+
+  routing_profile_names = [
+    f"{rng.choice(DEPARTMENTS)} {rng.choice(SITES)} Profile {index:03d}"
+    for index in range(routing_profiles)
+  ]
+
+  for username in usernames:
+    fake.add_user(username)
+  for flow_name in flow_names:
+    fake.add_flow(flow_name)
+  for number in numbers:
+    fake.add_phone_number(number)
+  for routing_profile_name in routing_profile_names:
+    fake.add_routing_profile(routing_profile_name)
+
+  return SyntheticInstance(fake, usernames, flow_names, numbers, routing_profile_names)
@@ -0,0 +1,205 @@
+from botocore.exceptions import ClientError
+from pytest_mock import MockerFixture
+
+import pytest
+
+from shared.clients.cloudformation_client import CloudformationClient
+from shared.clients.connect_client import ConnectClient
+from deploy.teardown import teardown
+from shared.test_helpers.fake_aws import FakeAws
+from shared.utils import StackConfig
+
+TEMPLATE = """AWSTemplateFormatVersion: "2010-09-09"
+
+Parameters:
+  InstanceArn:
+    Type: String
+
+Resources:
+  CallbackInbound:
+    Type: "AWS::Connect::ContactFlow"
+    Properties:
+      InstanceArn: !Ref InstanceArn
+  CallbackOutbound:
+    Type: "AWS::Connect::ContactFlow"
+"""
+
+
+class ManualClock:
+  def __init__(self) -> None:
+    self.now = 0.0
+
+  def __call__(self) -> float:
+    return self.now
+
+  def advance(self, seconds: float) -> None:
+    self.now += seconds
+
+
+def test_connect_pagination() -> None:
+  fake = FakeAws(page_sizes={"ListUsers": 2})
+  for index in range(5):
+    fake.add_user(f"user{index}")
+
+  with fake.patch():
+    client = ConnectClient("alias")
+
+    summaries = client.get_user_summaries(["user3", "user0"])
+
+  assert [summary["Username"] for summary in summaries] == ["user3", "user0"]  # type: ignore[index]
+  # The fourth user is on the second page, so the third page isn't requested
+  assert client.api_calls == {"ListInstances": 1, "ListUsers": 2}
+  assert fake.calls == client.api_calls
+
+
+def test_connect_operations() -> None:
+  fake = FakeAws()
+  flow = fake.add_flow("CallbackOutbound", '{"Actions": []}')
+  number = fake.add_phone_number("+15550000001")
+  user = fake.add_user("agent")
+  routing_profile = fake.add_routing_profile("routing")
+
+  with fake.patch():
+    client = ConnectClient("alias")
+
+    client.assign_contact_flow_number("CallbackOutbound", "+15550000001")
+    client.assign_user_to_routing_profile("agent", "routing")
+    response = client.start_outbound(
+      "CallbackOutbound", "+15550000001", "+15550000002", {"CallbackId": "1"}
+    )
+
+    assert client.get_contact_flow(flow["Arn"])["Content"] == '{"Actions": []}'
+    with pytest.raises(ClientError, match="ResourceNotFoundException"):
+      client.get_contact_flow("missing")
+
+  assert fake.phone_number_flows == {number["PhoneNumberId"]: flow["Id"]}
+  assert fake.user_routing_profiles == {user["Id"]: routing_profile["Id"]}
+  assert fake.contacts[0]["ContactId"] == response["ContactId"]
+  assert fake.contacts[0]["DestinationPhoneNumber"] == "+15550000002"
+
+
+def test_latency() -> None:
+  delays: list[float] = []
+  fake = FakeAws(latency={"ListContactFlows": 0.25}, sleep=delays.append)
+  fake.add_flow("CallbackOutbound")
+
+  with fake.patch():
+    ConnectClient("alias").get_flow_summaries(["CallbackOutbound"])
+
+  assert delays == [0.25]
+
+
+def test_throttling(mocker: MockerFixture) -> None:
+  clock = ManualClock()
+  fake = FakeAws(rate_limits={"ListUsers": (1, 1)}, clock=clock)
+  fake.add_user("agent")
+
+  # Each retry waits long enough for the rate limit to allow another call
+  mock_sleep = mocker.patch(
+    "botocore.endpoint.time.sleep", side_effect=lambda delay: clock.advance(1)
+  )
+
+  with fake.patch():
+    client = ConnectClient("alias")
+    client.get_user_summaries(["agent"])
+    client.get_user_summaries(["agent"])
+
+  assert fake.throttles == {"ListUsers": 1}
+  assert fake.calls["ListUsers"] == 3
+  assert mock_sleep.call_count == 1
+  # The retry is hidden from the caller, as it is by AWS
+  assert client.api_calls["ListUsers"] == 2
+
+
+def test_stack_transitions(mocker: MockerFixture) -> None:
+  clock = ManualClock()
+  fake = FakeAws(stack_transition_time=10, clock=clock)
+  mocker.patch("botocore.waiter.time.sleep", side_effect=clock.advance)
+  mocker.patch(
+    "shared.clients.cloudformation_client.time.sleep", side_effect=clock.advance
+  )
+  mocker.patch("shared.clients.cloudformation_client.time.monotonic", clock)
+
+  with fake.patch():
+    client = CloudformationClient()
+    stack_config = StackConfig("stack1", "template.yaml")
+
+    assert [
+      parameter["ParameterKey"] for parameter in client.validate(TEMPLATE)["Parameters"]
+    ] == ["InstanceArn"]
+
+    # The waiter polls until the stack has been in progress for the transition time
+    client.deploy_stack(
+      stack_config, TEMPLATE, [{"ParameterKey": "InstanceArn", "ParameterValue": "a"}]
+    )
+    assert clock.now >= 10
+    assert client.get_stack_summary("stack1")["StackStatus"] == "CREATE_COMPLETE"
+    assert list(client.get_stack_resource_mapping("stack1")) == [
+      "CallbackInbound",
+      "CallbackOutbound",
+    ]
+
+    # Updating to the same parameters does nothing
+    client.update_stack_parameters(
+      "stack1", [{"ParameterKey": "InstanceArn", "ParameterValue": "a"}]
+    )
+    assert fake.calls["UpdateStack"] == 1
+    assert fake.stacks[0].status == "CREATE_COMPLETE"
+
+    client.update_stack_parameters(
+      "stack1", [{"ParameterKey": "InstanceArn", "ParameterValue": "b"}]
+    )
+    assert client.get_stack_summary("stack1")["StackStatus"] == "UPDATE_IN_PROGRESS"
+    assert client.get_stack_parameters("stack1") == {"InstanceArn": "b"}
+
+    clock.advance(10)
+    assert client.delete_stack("stack1")
+    assert client.get_stack_summary("stack1") is None
+
+
+def test_stack_deletion_failure(mocker: MockerFixture) -> None:
+  mocker.patch("shared.clients.cloudformation_client.time.sleep")
+  fake = FakeAws()
+
+  with fake.patch():
+    client = CloudformationClient()
+    client.deploy_stack(StackConfig("stack1", "template.yaml"), TEMPLATE, [])
+    fake.fail_deletion("stack1")
+
+    with pytest.raises(RuntimeError, match="failed to delete"):
+      client.delete_stack("stack1")
+
+  assert fake.stacks[0].status == "DELETE_FAILED"
+
+
+def test_template_keys() -> None:
+  fake = FakeAws()
+
+  with fake.patch():
+    client = CloudformationClient()
+    parameters = client.validate('{"Parameters": {"Key": {"Type": "String"}}}')
+
+  assert parameters["Parameters"] == [{"ParameterKey": "Key", "NoEcho": False}]
+
+
+def test_teardown(
+  mocker: MockerFixture, mock_parameters: dict[str, str], fake_aws: FakeAws
+) -> None:
+  mocker.patch("shared.clients.cloudformation_client.time.sleep")
+  flow = fake_aws.add_flow("CallbackInbound")
+  number = fake_aws.add_phone_number(mock_parameters["PrivateNumber"])
+  user = fake_aws.add_user(mock_parameters["AgentUsername"])
+  routing_profile = fake_aws.add_routing_profile(
+    mock_parameters["DefaultRoutingProfile"]
+  )
+  fake_aws.phone_number_flows[number["PhoneNumberId"]] = flow["Id"]
+
+  client = CloudformationClient()
+  for stack_name in ["sicq-main-stack", "sicq-callback-flow-stack"]:
+    client.deploy_stack(StackConfig(stack_name, "template.yaml"), TEMPLATE, [])
+
+  assert teardown(delete=True)
+
+  assert fake_aws.phone_number_flows == {}
+  assert fake_aws.user_routing_profiles == {user["Id"]: routing_profile["Id"]}
+  assert [stack.status for stack in fake_aws.stacks] == ["DELETE_COMPLETE"] * 2
@@ -0,0 +1,37 @@
+from shared.clients.connect_client import ConnectClient
+from shared.test_helpers.synthetic_instance import generate_instance
+from shared.utils import FLOW_NAMES
+
+
+def test_generate_instance() -> None:
+  instance = generate_instance(
+    users=250, flows=40, phone_numbers=30, routing_profiles=5, seed=1
+  )
+
+  assert len(instance.usernames) == len(set(instance.usernames)) == 250
+  assert len(instance.flow_names) == 40
+  assert set(FLOW_NAMES.values()) <= set(instance.flow_names)
+  assert len(instance.phone_numbers) == 30
+  assert len(instance.routing_profile_names) == 5
+  assert [user["Username"] for user in instance.fake.users] == instance.usernames
+
+  # The same arguments always generate the same instance
+  again = generate_instance(
+    users=250, flows=40, phone_numbers=30, routing_profiles=5, seed=1
+  )
+  assert again.fake.users == instance.fake.users
+  assert again.fake.flows == instance.fake.flows
+  assert again.fake.phone_numbers == instance.fake.phone_numbers
+  assert generate_instance(users=250, seed=2).usernames != instance.usernames
+
+
+def test_generated_instance_lookup() -> None:
+  instance = generate_instance(users=250, flows=10, phone_numbers=1, routing_profiles=1)
+
+  with instance.fake.patch():
+    client = ConnectClient("alias")
+    summaries = client.get_user_summaries([instance.usernames[150]])
+
+  assert summaries[0]["Username"] == instance.usernames[150]  # type: ignore[index]
+  # The user is on the second page of 100
+  assert client.api_calls["ListUsers"] == 2
@@ -0,0 +1,370 @@
+import argparse
+from contextvars import ContextVar, Token
+import os
+from pathlib import Path
+import random
+import sys
+import threading
+import time
+from types import TracebackType
+from typing import Any, Callable
+
+from shared import json_backend
+from shared.logger import logger
+from shared.metrics import LatencyHistogram
+from shared.utils import format_table
+
+# Environment variables to configure the default tracer
+SAMPLE_RATE_VARIABLE = "TRACE_SAMPLE_RATE"
+TRACE_FILE_VARIABLE = "TRACE_FILE"
+
+SERVICE_NAME = "sicq"
+
+# OTLP span status codes
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+  if isinstance(value, bool):
+    return {"boolValue": value}
+  if isinstance(value, int):
+    return {"intValue": str(value)}
+  if isinstance(value, float):
+    return {"doubleValue": value}
+  return {"stringValue": str(value)}
+
+
+class Span:
+  """A timed operation within a trace, following the OpenTelemetry data model."""
+
+  tracer: "Tracer"
+  trace_id: str
+  span_id: str
+  parent_span_id: str
+  name: str
+  attributes: dict[str, Any]
+  start_time: int
+  end_time: int
+  status: int
+  token: "Token[Span | UnsampledSpan | None]"
+
+  def __init__(
+    self,
+    tracer: "Tracer",
+    name: str,
+    attributes: dict[str, Any],
+    parent: "Span | None",
+  ) -> None:
+    """Constructor.
+
+    Args:
+        tracer (Tracer): The tracer that exports the span
+        name (str): The name of the operation
+        attributes (dict[str, Any]): Details of the operation
+        parent (Span | None): The enclosing span, or None if this is the root of a new trace
+    """
+    self.tracer = tracer
+    self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+    self.span_id = f"{random.getrandbits(64):016x}"
+    self.parent_span_id = parent.span_id if parent else ""
+    self.name = name
+    self.attributes = attributes
+    self.start_time = 0
+    self.end_time = 0
+    self.status = STATUS_UNSET
+
+  def set_attribute(self, key: str, value: Any) -> None:
+    """Add a detail of the operation.
+
+    Args:
+        key (str): The name of the attribute
+        value (Any): The value, which is exported as a bool, int, float or string
+    """
+    self.attributes[key] = value
+
+  def __enter__(self) -> "Span":
+    """Start the span, making it the current span.
+
+    Returns:
+        Span: The span
+    """
+    self.token = _current_span.set(self)
+    self.start_time = time.time_ns()
+    return self
+
+  def __exit__(
+    self,
+    exc_type: type[BaseException] | None,
+    exc: BaseException | None,
+    traceback: TracebackType | None,
+  ) -> None:
+    """End the span, recording any exception.
+
+    Args:
+        exc_type (type[BaseException] | None): The type of the exception raised in the span, if any
+        exc (BaseException | None): The exception raised in the span, if any
+        traceback (TracebackType | None): The traceback of the exception, if any
+    """
+    self.end_time = time.time_ns()
+    _current_span.reset(self.token)
+
+    if exc is not None:
+      self.status = STATUS_ERROR
+      self.attributes["exception.type"] = type(exc).__name__
+      self.attributes["exception.message"] = str(exc)
+
+    self.tracer.finish(self)
+
+  def to_otlp(self) -> dict[str, Any]:
+    """Convert the span to the OTLP JSON format.
+
+    Returns:
+        dict[str, Any]: The span
+    """
+    return {
+      "traceId": self.trace_id,
+      "spanId": self.span_id,
+      "parentSpanId": self.parent_span_id,
+      "name": self.name,
+      "kind": 1,
+      "startTimeUnixNano": str(self.start_time),
+      "endTimeUnixNano": str(self.end_time),
+      "attributes": [
+        {"key": key, "value": _otlp_value(value)}
+        for key, value in self.attributes.items()
+      ],
+      "status": {"code": self.status},
+    }
+
+
+class NoopSpan:
+  """A span that isn't recorded, so tracing costs almost nothing when it's disabled or a trace isn't sampled."""
+
+  def set_attribute(self, key: str, value: Any) -> None:
+    """Ignore a detail of the operation.
+
+    Args:
+        key (str): The name of the attribute
+        value (Any): The value
+    """
+
+  def __enter__(self) -> "NoopSpan":
+    """Do nothing.
+
+    Returns:
+        NoopSpan: The span
+    """
+    return self
+
+  def __exit__(
+    self,
+    exc_type: type[BaseException] | None,
+    exc: BaseException | None,
+    traceback: TracebackType | None,
+  ) -> None:
+    """Do nothing.
+
+    Args:
+        exc_type (type[BaseException] | None): The type of the exception raised in the span, if any
+        exc (BaseException | None): The exception raised in the span, if any
+        traceback (TracebackType | None): The traceback of the exception, if any
+    """
+    return None
+
+
+class UnsampledSpan(NoopSpan):
+  """The root of a trace that isn't sampled, which stops its child spans being recorded."""
+
+  token: "Token[Span | UnsampledSpan | None]"
+
+  def __enter__(self) -> "UnsampledSpan":
+    """Start the trace without recording it.
+
+    Returns:
+        UnsampledSpan: The span
+    """
+    self.token = _current_span.set(self)
+    return self
+
+  def __exit__(
+    self,
+    exc_type: type[BaseException] | None,
+    exc: BaseException | None,
+    traceback: TracebackType | None,
+  ) -> None:
+    """End the trace.
+
+    Args:
+        exc_type (type[BaseException] | None): The type of the exception raised in the span, if any
+        exc (BaseException | None): The exception raised in the span, if any
+        traceback (TracebackType | None): The traceback of the exception, if any
+    """
+    _current_span.reset(self.token)
+
+
+NOOP_SPAN = NoopSpan()
+
+_current_span: ContextVar[Span | UnsampledSpan | None] = ContextVar(
+  "current_span", default=None
+)
+
+
+class Tracer:
+  """Creates spans and exports each sampled trace once its root span ends."""
+
+  sample_rate: float
+  export: Callable[[str], object]
+  pending: dict[str, list[Span]]
+  lock: threading.Lock
+
+  def __init__(self, sample_rate: float, export: Callable[[str], object]) -> None:
+    """Constructor.
+
+    Args:
+        sample_rate (float): The fraction of traces to record, from 0 to 1
+        export (Callable[[str], object]): Writes each trace, as a line of OTLP JSON
+    """
+    self.sample_rate = sample_rate
+    self.export = export
+    self.pending = {}
+    self.lock = threading.Lock()
+
+  def span(self, name: str, **attributes: Any) -> Span | NoopSpan:
+    """Start a span, to be used as a context manager.
+
+    The span is a child of the current span, otherwise it starts a new trace which is sampled at the sample rate.
+
+    Args:
+        name (str): The name of the operation
+        **attributes (Any): Details of the operation
+
+    Returns:
+        Span | NoopSpan: The span, which does nothing if the trace isn't sampled
+    """
+    if not self.sample_rate:
+      return NOOP_SPAN
+
+    parent = _current_span.get()
+    if isinstance(parent, UnsampledSpan):
+      return NOOP_SPAN
+
+    if parent is None and random.random() >= self.sample_rate:
+      return UnsampledSpan()
+
+    return Span(self, name, attributes, parent)
+
+  def finish(self, span: Span) -> None:
+    """Record an ended span, exporting its trace if it's the root span.
+
+    Args:
+        span (Span): The span
+    """
+    with self.lock:
+      spans = self.pending.setdefault(span.trace_id, [])
+      spans.append(span)
+      if span.parent_span_id:
+        return
+      del self.pending[span.trace_id]
+
+    self.export(
+      json_backend.dumps(
+        {
+          "resourceSpans": [
+            {
+              "resource": {
+                "attributes": [
+                  {"key": "service.name", "value": _otlp_value(SERVICE_NAME)}
+                ]
+              },
+              "scopeSpans": [
+                {
+                  "scope": {"name": __name__},
+                  "spans": [span.to_otlp() for span in spans],
+                }
+              ],
+            }
+          ]
+        }
+      )
+    )
+
+
+def create_tracer(sample_rate: float | None = None, path: Path | None = None) -> Tracer:
+  """Create a tracer that writes each trace as a line of OTLP JSON, e.g. for the OpenTelemetry collector's file receiver.
+
+  Args:
+      sample_rate (float | None, optional): The fraction of traces to record. Defaults to None, which reads the TRACE_SAMPLE_RATE environment variable, otherwise doesn't trace.
+      path (Path | None, optional): The file to append the traces to. Defaults to None, which reads the TRACE_FILE environment variable, otherwise writes to stdout.
+
+  Returns:
+      Tracer: The tracer
+  """
+  if sample_rate is None:
+    sample_rate = float(os.environ.get(SAMPLE_RATE_VARIABLE) or 0)
+
+  if path is None and os.environ.get(TRACE_FILE_VARIABLE):
+    path = Path(os.environ[TRACE_FILE_VARIABLE])
+
+  if path is None:
+
+    def export(line: str) -> None:
+      sys.stdout.write(line + "\n")
+
+  else:
+    trace_file = path
+
+    def export(line: str) -> None:
+      with open(trace_file, "a") as outfile:
+        outfile.write(line + "\n")
+
+  return Tracer(sample_rate, export)
+
+
+def summarise_traces(path: Path) -> str:
+  """Summarise the duration of each span in a trace file.
+
+  Args:
+      path (Path): The trace file, with a line of OTLP JSON for each trace
+
+  Returns:
+      str: A table of the count and duration percentiles of each span name
+  """
+  histograms: dict[str, LatencyHistogram] = {}
+
+  with open(path) as infile:
+    for line in infile:
+      for resource_spans in json_backend.loads(line)["resourceSpans"]:
+        for scope_spans in resource_spans["scopeSpans"]:
+          for span in scope_spans["spans"]:
+            histograms.setdefault(span["name"], LatencyHistogram()).record(
+              (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e9
+            )
+
+  return format_table(
+    [["Span", "Count", "p50 (ms)", "p99 (ms)", "Max (ms)"]]
+    + [
+      [
+        name,
+        str(histogram.count),
+        f"{histogram.percentile(50) * 1e3:.1f}",
+        f"{histogram.percentile(99) * 1e3:.1f}",
+        f"{histogram.percentile(100) * 1e3:.1f}",
+      ]
+      for name, histogram in histograms.items()
+    ]
+  )
+
+
+tracer = create_tracer()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(
+    description="Summarise the duration of each span in a trace file"
+  )
+  parser.add_argument("trace_file", type=Path, help="The trace file")
+  args = parser.parse_args()
+
+  logger.info("Span durations:\n" + summarise_traces(args.trace_file))
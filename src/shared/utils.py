@@ -14,6 +14,12 @@ def _relative_to_file(relative_path: str) -> Path:
 
 FLOW_CONTENT_DIRECTORY = _relative_to_file("../../cloudformation/flow_content")
 FLOW_EXPORT_DIRECTORY = Path("../../output/flow_content")
+INSTANCE_EXPORT_DIRECTORY = Path("../../output/instance")
+INSTANCE_TEMPLATE_DIRECTORY = Path("../../output/instance_templates")
+VERSION_STORE_DIRECTORY = Path("../../output/versions")
+METRICS_FILE = Path("../../output/metrics.prom")
+PROFILE_DIRECTORY = Path("../../output/profiles")
+FLOW_TEMPLATE_MODULE_DIRECTORY = _relative_to_file("../../build/flow_content")
 
 FLOW_NAMES = {
   "inbound": "CallbackInbound",
@@ -34,6 +40,7 @@ class Parameters(TypedDict):
   CustomerNumber: str
   CallerId: str
   DefaultRoutingProfile: str
+  Region: str | None
 
 
 class DeployKwArgs(TypedDict):
@@ -49,16 +56,28 @@ class StackConfig:
 
   stack_name: str
   stack_template_file: str
+  flow_names: list[str]
+  dependencies: list["StackConfig"]
 
-  def __init__(self, stack_name: str, stack_template_file: str) -> None:
+  def __init__(
+    self,
+    stack_name: str,
+    stack_template_file: str,
+    flow_names: list[str] = [],
+    dependencies: list["StackConfig"] = [],
+  ) -> None:
     """Constructor.
 
     Args:
         stack_name (str): The name of the stack
         stack_template_file (str): The location of the stack's template file
+        flow_names (list[str], optional): The names of the contact flows the stack contains. Defaults to [].
+        dependencies (list[StackConfig], optional): The stacks whose resources this stack references. Defaults to [].
     """
     self.stack_name = stack_name
     self.stack_template_file = stack_template_file
+    self.flow_names = flow_names
+    self.dependencies = dependencies
 
 
 class InstanceConfig:
@@ -88,25 +107,48 @@ class InstanceConfig:
 
 # Stack config
 
-MAIN_STACK_CONFIG = StackConfig("sicq-main-stack", "../cloudformation/main.yaml")
-CALLBACK_FLOW_STACK_CONFIG = StackConfig(
-  "sicq-callback-flow-stack", "../cloudformation/callback_flows.yaml"
-)
 WHISPER_FLOW_STACK_CONFIG = StackConfig(
-  "sicq-whisper-flow-stack", "../cloudformation/whisper_flows.yaml"
+  "sicq-whisper-flow-stack",
+  "../cloudformation/whisper_flows.yaml",
+  [FLOW_NAMES["agent_whisper"], FLOW_NAMES["outbound_whisper"]],
+)
+MAIN_STACK_CONFIG = StackConfig(
+  "sicq-main-stack",
+  "../cloudformation/main.yaml",
+  dependencies=[WHISPER_FLOW_STACK_CONFIG],
+)
+CALLBACK_FLOW_STACK_CONFIG = StackConfig(
+  "sicq-callback-flow-stack",
+  "../cloudformation/callback_flows.yaml",
+  [FLOW_NAMES["inbound"], FLOW_NAMES["outbound"]],
+  [WHISPER_FLOW_STACK_CONFIG, MAIN_STACK_CONFIG],
 )
 
+# In deployment order
+STACK_CONFIGS = [
+  WHISPER_FLOW_STACK_CONFIG,
+  MAIN_STACK_CONFIG,
+  CALLBACK_FLOW_STACK_CONFIG,
+]
 
-def read_parameters() -> Parameters:
+
+def read_parameters(env_file: str | None = None) -> Parameters:
   """Load parameters from the .env file.
 
+  Args:
+      env_file (str | None, optional): The path of the .env file. Defaults to None, which searches for the default file.
+
   Returns:
       Parameters: The loaded parameters
   """
-  params = dotenv.dotenv_values()
+  params = dotenv.dotenv_values(env_file)
   if "CallerId" not in params:
     params["CallerId"] = params["PublicNumber"]
 
+  # Blank or missing region falls back to the default AWS configuration
+  if not params.get("Region"):
+    params["Region"] = None
+
   return cast(Parameters, params)
 
 
@@ -130,3 +172,20 @@ def create_logical_id(name: str) -> str:
     )
 
   return logical_id
+
+
+def format_table(rows: list[list[str]]) -> str:
+  """Format rows of values as a plain-text table, with the first row as the header.
+
+  Args:
+      rows (list[list[str]]): The rows of the table, each with the same number of columns
+
+  Returns:
+      str: The formatted table, with each column padded to the widest value
+  """
+  widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+
+  return "\n".join(
+    "  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip()
+    for row in rows
+  )
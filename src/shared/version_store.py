@@ -0,0 +1,201 @@
+from datetime import datetime, timedelta, timezone
+import gzip
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+import threading
+from typing import Any, Callable, TypedDict
+
+from shared import json_backend
+
+try:
+  import zstandard  # type: ignore[import-not-found, unused-ignore]
+
+  HAS_ZSTD = True
+except ImportError:  # pragma: no cover
+  HAS_ZSTD = False
+
+INDEX_FILE_NAME = "index.jsonl"
+
+# Resource types, as flows and modules can share a name
+FLOW = "flow"
+MODULE = "module"
+
+# Object file extensions, with the functions to compress and decompress them, in order of preference
+CODECS: dict[str, tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {}
+if HAS_ZSTD:  # pragma: no cover
+  CODECS[".zst"] = (
+    lambda data: zstandard.ZstdCompressor().compress(data),
+    lambda data: zstandard.ZstdDecompressor().decompress(data),
+  )
+CODECS[".gz"] = (lambda data: gzip.compress(data, mtime=0), gzip.decompress)
+
+
+class VersionRecord(TypedDict):
+  """An entry in the version store index."""
+
+  Type: str
+  Flow: str
+  Timestamp: str
+  Hash: str
+  Source: str
+
+
+def create_timestamp() -> str:
+  """Create a timestamp for a new version.
+
+  Returns:
+      str: The current UTC time, in ISO format with microseconds
+  """
+  return datetime.now(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _next_timestamp(timestamp: str) -> str:
+  return (datetime.fromisoformat(timestamp) + timedelta(microseconds=1)).isoformat(
+    timespec="microseconds"
+  )
+
+
+class VersionStore:
+  """A content-addressed store of compressed flow versions.
+
+  Each distinct flow content is stored once, compressed, under its hash.  An append-only index maps each resource type, name and timestamp to the hash of its content at that time.
+  """
+
+  root: Path
+  extension: str
+  index: dict[tuple[str, str], dict[str, str]]
+  lock: threading.Lock
+
+  def __init__(self, root: Path, extension: str | None = None) -> None:
+    """Constructor.
+
+    Args:
+        root (Path): The directory of the store, which is created if it doesn't exist
+        extension (str | None, optional): The file extension of the compression to use, either ".zst" or ".gz". Defaults to None, which uses zstd if it's installed, otherwise gzip.
+
+    Raises:
+        ValueError: The compression isn't supported
+    """
+    self.root = root
+    self.extension = extension or next(iter(CODECS))
+    if self.extension not in CODECS:
+      raise ValueError(f"Unsupported version store compression {self.extension}")
+
+    self.index = {}
+    self.lock = threading.Lock()
+
+    self.root.joinpath("objects").mkdir(exist_ok=True, parents=True)
+
+    index_path = self.root.joinpath(INDEX_FILE_NAME)
+    if index_path.exists():
+      with open(index_path) as infile:
+        for line in infile:
+          record: VersionRecord = json_backend.loads(line)
+          self.index.setdefault((record["Type"], record["Flow"]), {})[
+            record["Timestamp"]
+          ] = record["Hash"]
+
+  def _object_path(self, content_hash: str, extension: str) -> Path:
+    # Split the objects into subdirectories, to keep the directories small
+    return self.root.joinpath("objects", content_hash[:2], f"{content_hash}{extension}")
+
+  def put(
+    self,
+    flow_name: str,
+    content: Any,
+    source: str,
+    timestamp: str | None = None,
+    resource_type: str = FLOW,
+  ) -> str:
+    """Record a version of a flow, unless it's the same as the latest version, only storing the content if it isn't already in the store.
+
+    Args:
+        flow_name (str): The name of the flow
+        content (Any): The parsed flow content
+        source (str): What produced the version, e.g. "export"
+        timestamp (str | None, optional): The time of the version, which is moved on by a microsecond at a time if there's already a version at that time. Defaults to None, which uses the current time.
+        resource_type (str, optional): FLOW or MODULE. Defaults to FLOW.
+
+    Returns:
+        str: The hash of the content
+    """
+    # Store the compact form, so formatting differences don't create new versions
+    canonical = json_backend.dumps(content).encode()
+    content_hash = hashlib.sha256(canonical).hexdigest()
+
+    if not any(
+      self._object_path(content_hash, extension).exists() for extension in CODECS
+    ):
+      path = self._object_path(content_hash, self.extension)
+      path.parent.mkdir(exist_ok=True)
+
+      # Write to a temporary file first, so a partially written object is never visible
+      compress, _ = CODECS[self.extension]
+      fd, temp_path = tempfile.mkstemp(dir=path.parent)
+      with os.fdopen(fd, "wb") as outfile:
+        outfile.write(compress(canonical))
+      os.replace(temp_path, path)
+
+    with self.lock:
+      versions = self.index.setdefault((resource_type, flow_name), {})
+
+      # Repeated deploys and exports of an unchanged flow aren't new versions
+      if versions and versions[max(versions)] == content_hash:
+        return content_hash
+
+      # Concurrent workers can record versions of the same flow at the same time, which would replace each other
+      timestamp = timestamp or create_timestamp()
+      while timestamp in versions:
+        timestamp = _next_timestamp(timestamp)
+
+      record: VersionRecord = {
+        "Type": resource_type,
+        "Flow": flow_name,
+        "Timestamp": timestamp,
+        "Hash": content_hash,
+        "Source": source,
+      }
+      with open(self.root.joinpath(INDEX_FILE_NAME), "a") as outfile:
+        outfile.write(json_backend.dumps(record) + "\n")
+      versions[timestamp] = content_hash
+
+    return content_hash
+
+  def versions(self, flow_name: str, resource_type: str = FLOW) -> dict[str, str]:
+    """List the recorded versions of a flow.
+
+    Args:
+        flow_name (str): The name of the flow
+        resource_type (str, optional): FLOW or MODULE. Defaults to FLOW.
+
+    Returns:
+        dict[str, str]: The content hash of each version, by timestamp
+    """
+    return dict(self.index.get((resource_type, flow_name), {}))
+
+  def get(self, flow_name: str, timestamp: str, resource_type: str = FLOW) -> str:
+    """Retrieve a version of a flow.
+
+    Args:
+        flow_name (str): The name of the flow
+        timestamp (str): The time of the version
+        resource_type (str, optional): FLOW or MODULE. Defaults to FLOW.
+
+    Raises:
+        KeyError: There's no version of the flow at that time
+
+    Returns:
+        str: The flow content, as a compact JSON string
+    """
+    content_hash = self.index.get((resource_type, flow_name), {}).get(timestamp)
+    if content_hash is None:
+      raise KeyError(f"No version of {flow_name} at {timestamp}")
+
+    for extension, (_, decompress) in CODECS.items():
+      path = self._object_path(content_hash, extension)
+      if path.exists():
+        return decompress(path.read_bytes()).decode()
+
+    raise KeyError(f"The content of {flow_name} at {timestamp} is missing")
@@ -1,30 +1,52 @@
+import argparse
+
 from shared.clients.connect_client import ConnectClient
 from shared.logger import logger
+from shared.metrics import report_metrics
+from shared.profiler import profiled
+from shared.tracing import tracer
 from shared.utils import FLOW_NAMES, read_parameters
 
 
 def start_outbound() -> None:
   """Start an outbound call using parameters from the .env file."""
-  # Read parameters and retrieve values
-  parameters = read_parameters()
-
-  connect_client = ConnectClient(parameters["InstanceAlias"])
-
-  logger.info("Starting outbound call")
-
-  response = connect_client.start_outbound(
-    FLOW_NAMES["outbound"],
-    parameters["PublicNumber"],
-    parameters["PrivateNumber"],
-    {
-      "CallbackId": "12345",
-      "CallbackNumber": parameters["CustomerNumber"],
-      "CallerId": parameters["CallerId"],
-    },
-  )
+  with tracer.span("start_outbound") as span:
+    # Read parameters and retrieve values
+    with tracer.span("load_config"):
+      parameters = read_parameters()
+
+    with tracer.span("create_client"):
+      connect_client = ConnectClient(parameters["InstanceAlias"], parameters["Region"])
+
+    logger.info("Starting outbound call")
 
-  logger.info(f"Outbound call started with ContactID={response['ContactId']}")
+    response = connect_client.start_outbound(
+      FLOW_NAMES["outbound"],
+      parameters["PublicNumber"],
+      parameters["PrivateNumber"],
+      {
+        "CallbackId": "12345",
+        "CallbackNumber": parameters["CustomerNumber"],
+        "CallerId": parameters["CallerId"],
+      },
+    )
+    span.set_attribute("contact_id", response["ContactId"])
+
+    with tracer.span("log_result"):
+      logger.info("Outbound call started with ContactID=%s", response["ContactId"])
 
 
 if __name__ == "__main__":
-  start_outbound()
+  parser = argparse.ArgumentParser(
+    description="Start an outbound call using parameters from the .env file"
+  )
+  parser.add_argument(
+    "--profile",
+    action="store_true",
+    help="Profile the run, writing a report to output/profiles",
+  )
+  args = parser.parse_args()
+
+  with profiled("start_outbound", args.profile):
+    start_outbound()
+  report_metrics()
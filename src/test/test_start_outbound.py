@@ -1,7 +1,14 @@
+import json
 from pytest_mock import MockerFixture
 
-from shared.test_helpers.helpers import MockConnectClient
+from shared.test_helpers.fake_aws import FakeAws
+from shared.test_helpers.helpers import (
+  MockConnectClient,
+  assert_call_budget,
+  patch_client,
+)
 from shared.clients import connect_client
+from shared.tracing import Tracer
 from start_outbound import start_outbound
 
 
@@ -13,12 +20,57 @@ def test_start_outbound(mocker: MockerFixture) -> None:
     "AgentUsername": "agent",
     "CustomerNumber": "customer",
     "DefaultRoutingProfile": "routing",
+    "Region": "ap-southeast-2",
   }
 
   mocker.patch("dotenv.dotenv_values", return_value=mock_parameters)
   mock_client = MockConnectClient("alias")
-  mocker.patch.object(connect_client.ConnectClient, "__new__", return_value=mock_client)
+  mock_new = patch_client(mocker, connect_client.ConnectClient, mock_client)
 
   start_outbound()
 
+  assert mock_new.call_args.args == ("alias", "ap-southeast-2")
   assert mock_client.calls == ["__init__", "start_outbound"]
+
+
+def test_start_outbound_spans(mocker: MockerFixture) -> None:
+  mock_parameters = {
+    "InstanceAlias": "alias",
+    "PrivateNumber": "private",
+    "PublicNumber": "public",
+    "AgentUsername": "agent",
+    "CustomerNumber": "customer",
+    "DefaultRoutingProfile": "routing",
+  }
+
+  mocker.patch("dotenv.dotenv_values", return_value=mock_parameters)
+  mock_client = MockConnectClient("alias")
+  patch_client(mocker, connect_client.ConnectClient, mock_client)
+
+  lines: list[str] = []
+  mocker.patch("start_outbound.tracer", Tracer(1, lines.append))
+
+  start_outbound()
+
+  spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+  assert [span["name"] for span in spans] == [
+    "load_config",
+    "create_client",
+    "log_result",
+    "start_outbound",
+  ]
+  assert spans[-1]["attributes"] == [
+    {"key": "contact_id", "value": {"stringValue": "foo"}}
+  ]
+
+
+def test_start_outbound_call_budget(fake_instance: FakeAws) -> None:
+  start_outbound()
+
+  # Listing the instances, listing the flows to resolve the outbound flow, then starting the contact
+  assert_call_budget(
+    fake_instance,
+    "connect",
+    3,
+    {"ListInstances": 1, "StartOutboundVoiceContact": 1},
+  )